@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark Sherlock investigations offline.
+
+Runs investigations against local stub MCP servers that mimic the EKS,
+CloudWatch and DynamoDB tool catalogs, with a scripted model in place of
+Bedrock, so no cluster, AWS credentials or docker images are needed. Reports
+latency by phase, throughput under concurrency and memory use, either for
+the orchestrator directly or for the `sherlock` MCP tool.
+
+Usage:
+    python scripts/benchmark_orchestrator.py
+    python scripts/benchmark_orchestrator.py --mode parallel --investigations 20 --concurrency 4
+    python scripts/benchmark_orchestrator.py --target mcp-server --tool-latency-ms 500 --payload-kb 32
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+from sherlock.benchmark.runner import BENCHMARK_TARGETS, StubConfig, run_benchmark
+from sherlock.benchmark.scripted_model import ScriptedModel
+from sherlock.config import Config
+from sherlock.orchestrator import INVESTIGATION_MODES
+
+# Keep benchmark output readable
+Config.setup_logging(log_level="WARNING")
+
+
+async def main():
+    """Run the benchmark and print the report."""
+    parser = argparse.ArgumentParser(description="Benchmark Sherlock with stub MCP servers and a scripted model")
+    parser.add_argument("--target", choices=BENCHMARK_TARGETS, default="orchestrator", help="What to benchmark (default: orchestrator)")
+    parser.add_argument("--mode", choices=INVESTIGATION_MODES, default="swarm", help="Investigation mode (default: swarm)")
+    parser.add_argument("--investigations", type=int, default=10, help="Measured investigations (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Investigations in flight at once (default: 2)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured investigations run first; 0 measures cold starts (default: 1)")
+    parser.add_argument("--tool-latency-ms", type=float, default=200, help="Average stub tool latency (default: 200)")
+    parser.add_argument("--payload-kb", type=float, default=4, help="Size of each stub tool result in KB (default: 4)")
+    parser.add_argument("--tool-calls", type=int, default=3, help="Tool calls per specialist (default: 3)")
+    parser.add_argument("--model-latency-ms", type=float, default=800, help="Scripted model latency per turn (default: 800)")
+    parser.add_argument("--output-tokens", type=int, default=300, help="Scripted output tokens per turn (default: 300)")
+    parser.add_argument("--trace-memory", action="store_true", help="Track the Python heap peak with tracemalloc (slower)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"\n🏋️  Sherlock Offline Benchmark")
+        print(f"🎯 {args.target}, {args.mode} mode: {args.investigations} investigations, concurrency {args.concurrency}")
+        print(f"🧪 Stub tools {args.tool_latency_ms:.0f}ms / {args.payload_kb:g}KB, model {args.model_latency_ms:.0f}ms per turn, {args.tool_calls} tool calls per agent\n")
+
+    # Agents print their streamed output; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = await run_benchmark(
+            target=args.target,
+            mode=args.mode,
+            investigations=args.investigations,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            stub_config=StubConfig(latency_ms=args.tool_latency_ms, payload_kb=args.payload_kb),
+            model=ScriptedModel(tool_calls=args.tool_calls, turn_latency_ms=args.model_latency_ms, output_tokens=args.output_tokens),
+            trace_memory=args.trace_memory,
+        )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    latency = report["latency"]
+    print(f"✅ Statuses: {report['statuses']}")
+    print(f"⏱️  Latency: mean {latency['mean']:.2f}s, p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s, max {latency['max']:.2f}s")
+    print(f"⚡ Throughput: {report['throughput_per_minute']:.1f} investigations/min ({report['wall_seconds']:.1f}s wall clock)")
+    if "phases" in report:
+        print("\nMean phase latency:")
+        for phase, seconds in report["phases"].items():
+            print(f"   {phase:<12} {seconds:>8.2f}s")
+        print(f"\n🪙 Tokens per investigation: {report['tokens_per_investigation']:.0f}")
+        print(f"🔧 Tool calls per investigation: {report['tool_calls_per_investigation']:.1f}")
+    else:
+        first = report["first_progress"]
+        if first:
+            print(f"📣 First progress notification: p50 {first['p50']:.2f}s, max {first['max']:.2f}s")
+        print(f"📣 Notifications per investigation: {report['notifications_per_investigation']:.1f}")
+
+    memory = report["memory"]
+    print(f"\n💾 Peak RSS: {memory['process_max_rss_mb']:.0f} MB (largest stub server {memory['stub_server_max_rss_mb']:.0f} MB)")
+    if memory["python_heap_peak_mb"] is not None:
+        print(f"💾 Python heap peak: {memory['python_heap_peak_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Inspect the cached MCP tool schemas used by Sherlock.
+
+Reports the size of each server's tool catalog (the context it costs every
+agent cycle) and, with --refresh, re-lists the tools from the live servers and
+reports any drift from the cached catalog.
+
+Usage:
+    python scripts/check_tool_schemas.py
+    python scripts/check_tool_schemas.py --refresh
+"""
+import argparse
+from sherlock.config import Config
+from sherlock.mcp_pool import SERVER_FACTORIES, get_pool, server_image
+from sherlock.tool_schema_cache import get_tool_schema_cache, list_all_tools, schema_drift, schema_size
+
+
+def main():
+    """Print schema size and drift for every MCP server."""
+    parser = argparse.ArgumentParser(description="Check cached MCP tool schemas")
+    parser.add_argument(
+        "--server",
+        choices=sorted(SERVER_FACTORIES),
+        action="append",
+        help="Server to check (default: all)"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="List tools from the live servers, report drift and update the cache"
+    )
+    args = parser.parse_args()
+
+    Config.setup_environment()
+    cache = get_tool_schema_cache()
+
+    for server in args.server or sorted(SERVER_FACTORIES):
+        cached = cache.load(server)
+        print(f"\n🔧 {server}")
+
+        if server_image(server) is None:
+            print("   ℹ️  Not cached: reached over http or run as a local process, so its tools are listed every session")
+        elif cached:
+            size = schema_size(cached["tools"])
+            print(f"   Image: {cached['image']} ({cached['fingerprint'][:19]})")
+            print(f"   Cached tools: {size['tools']}, {size['bytes']} bytes, ~{size['approx_tokens']} tokens")
+        else:
+            print("   ⚠️  No cached schemas for the current image")
+
+        if args.refresh:
+            with get_pool(server).session() as client:
+                live = [tool.mcp_tool.model_dump(mode="json", exclude_none=True) for tool in list_all_tools(client)]
+            if cached:
+                drift = schema_drift(cached["tools"], live)
+                if any(drift.values()):
+                    print(f"   ❗ Drift: added={drift['added']} removed={drift['removed']} changed={drift['changed']}")
+                else:
+                    print("   ✅ No drift from cached schemas")
+            cache.store(server, live)
+            print(f"   Refreshed: {schema_size(live)['tools']} tools, ~{schema_size(live)['approx_tokens']} tokens")
+
+
+if __name__ == "__main__":
+    main()
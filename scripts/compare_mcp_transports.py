@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare MCP session establishment latency across transports.
+
+For every server and transport, starts a number of fresh MCP sessions one
+after another and measures how long each takes to be ready (process or
+container start plus the initialize handshake) and to list its tools:
+
+- docker: `docker run` of the server image for every session (the default)
+- http: connect to an already running server over streamable HTTP
+  (SHERLOCK_<SERVER>_MCP_URL)
+- process: start the server as a local process (SHERLOCK_<SERVER>_MCP_COMMAND,
+  default `uvx <package>@latest`)
+
+With --stub, the local stub servers stand in for the real ones, so the
+transports can be compared without AWS access or docker images (docker is
+skipped in that case).
+
+Usage:
+    python scripts/compare_mcp_transports.py --transports docker process
+    SHERLOCK_EKS_MCP_URL=http://localhost:8001/mcp python scripts/compare_mcp_transports.py --servers eks-mcp --transports docker http
+    python scripts/compare_mcp_transports.py --stub --sessions 10
+"""
+import argparse
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, List
+
+from sherlock.config import Config
+from sherlock.mcp_pool import SERVER_SPECS
+from sherlock.tool_schema_cache import list_all_tools
+from sherlock.transports import MCP_TRANSPORTS, create_mcp_client
+
+# Keep the comparison output readable
+Config.setup_logging(log_level="WARNING")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=1):
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f"Stub server on port {port} did not start within {timeout:.0f}s")
+
+
+@contextlib.contextmanager
+def stub_servers(servers: List[str], transports: List[str]) -> Iterator[None]:
+    """Point the process and http transports at stub servers, starting one HTTP stub per server."""
+    processes = []
+    try:
+        for server in servers:
+            prefix = SERVER_SPECS[server].env_prefix
+            stub_command = f"{sys.executable} -m sherlock.benchmark.stub_server {server}"
+            os.environ[f"{prefix}_MCP_COMMAND"] = stub_command
+            if "http" in transports:
+                port = free_port()
+                processes.append(subprocess.Popen(
+                    [*stub_command.split(), "--transport", "streamable-http", "--port", str(port)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                ))
+                wait_for_port(port)
+                os.environ[f"{prefix}_MCP_URL"] = f"http://127.0.0.1:{port}/mcp"
+        yield
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def measure(server: str, transport: str, sessions: int) -> Dict[str, List[float]]:
+    """Start ``sessions`` fresh sessions and time their startup and tool listing."""
+    timings = {"start": [], "list_tools": []}
+    for _ in range(sessions):
+        client = create_mcp_client(SERVER_SPECS[server], transport)
+        start_time = time.monotonic()
+        client.start()
+        timings["start"].append(time.monotonic() - start_time)
+        try:
+            list_start = time.monotonic()
+            list_all_tools(client)
+            timings["list_tools"].append(time.monotonic() - list_start)
+        finally:
+            client.stop(None, None, None)
+    return timings
+
+
+def main():
+    """Measure every server and transport and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare MCP session establishment latency across transports")
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVER_SPECS), default=sorted(SERVER_SPECS), help="Servers to measure (default: all)")
+    parser.add_argument("--transports", nargs="+", choices=MCP_TRANSPORTS, default=list(MCP_TRANSPORTS), help="Transports to compare (default: all)")
+    parser.add_argument("--sessions", type=int, default=5, help="Sessions started per server and transport (default: 5)")
+    parser.add_argument("--stub", action="store_true", help="Use the local stub servers instead of the real MCP servers")
+    args = parser.parse_args()
+
+    transports = [transport for transport in args.transports if not (args.stub and transport == "docker")]
+
+    print(f"\n🔌 MCP Transport Comparison")
+    print(f"🧪 {', '.join(args.servers)} over {', '.join(transports)}: {args.sessions} sessions each" + (" (stub servers)" if args.stub else "") + "\n")
+
+    results = {}
+    with stub_servers(args.servers, transports) if args.stub else contextlib.nullcontext():
+        for server in args.servers:
+            for transport in transports:
+                print(f"▶️  {server} over {transport}...")
+                try:
+                    results[(server, transport)] = measure(server, transport, args.sessions)
+                except Exception as e:
+                    print(f"❌ {server} over {transport} failed: {e}")
+
+    print(f"\n{'Server':<12} {'Transport':<10} {'First start':>12} {'Start p50':>10} {'Start min':>10} {'Start max':>10} {'List tools p50':>15}")
+    for (server, transport), timings in results.items():
+        start = timings["start"]
+        print(
+            f"{server:<12} {transport:<10} {start[0]:>11.2f}s {statistics.median(start):>9.2f}s "
+            f"{min(start):>9.2f}s {max(start):>9.2f}s {statistics.median(timings['list_tools']):>14.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Compare a single model for every agent with per-agent and per-phase model routes.
+
+Runs the query with every agent on --model-id, then with the given routes
+(bypassing the investigation cache both times), and reports wall-clock
+time, execution time, tokens and estimated cost side by side, plus the
+model and tokens of every agent.
+
+Routes map agents (diagnostic_agent, observability_agent, persistence_agent,
+synthesis_agent) or phases (planning, synthesis) to Bedrock model IDs. The
+synthesis phase only exists in parallel mode, which is the default here.
+
+Usage:
+    python scripts/compare_model_routes.py
+    python scripts/compare_model_routes.py --routes '{"planning": "us.anthropic.claude-3-5-haiku-20241022-v1:0"}' --runs 3
+    python scripts/compare_model_routes.py --mode swarm --routes '{"persistence_agent": "us.amazon.nova-lite-v1:0"}'
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from sherlock.config import Config
+from sherlock.models import get_model_routes
+from sherlock.orchestrator import INVESTIGATION_MODES, investigate
+
+# Setup development configuration
+Config.setup_for_development()
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTES = {
+    "planning": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+    "persistence_agent": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+    "synthesis": "us.anthropic.claude-sonnet-4-20250514-v1:0",
+}
+
+
+async def main():
+    """Run the query with a single model and with the routes and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare a single model with per-agent and per-phase model routes")
+    parser.add_argument(
+        "--query",
+        default="Could you analyze why the carts service is having issues?",
+        help="Investigation query (default: analyze carts service issues)"
+    )
+    parser.add_argument(
+        "--model-id",
+        default="us.anthropic.claude-sonnet-4-20250514-v1:0",
+        help="Model of the single-model setup, and of agents without a route (default: us.anthropic.claude-sonnet-4-20250514-v1:0)"
+    )
+    parser.add_argument(
+        "--routes",
+        type=json.loads,
+        default=DEFAULT_ROUTES,
+        help="JSON object of agent or phase to model ID (default: Claude 3.5 Haiku for planning and persistence, Claude Sonnet 4 for synthesis)"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=INVESTIGATION_MODES,
+        default="parallel",
+        help="Execution mode (default: parallel)"
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=1,
+        help="Runs per setup; results are averaged (default: 1)"
+    )
+    args = parser.parse_args()
+
+    print(f"\n🧭 Sherlock Model Routing Comparison")
+    print(f"❓ Query: {args.query}")
+    print(f"🤖 Routes: {json.dumps(get_model_routes(args.model_id, args.routes).assignments(), indent=2)}\n")
+
+    setups = {"single": {}, "routed": args.routes}
+    summary = {}
+    agents = {}
+    for setup, routes in setups.items():
+        runs = []
+        for run in range(args.runs):
+            print(f"▶️  {setup} run {run + 1}/{args.runs}...")
+            start_time = time.time()
+            result = await investigate(args.query, model_id=args.model_id, use_cache=False, mode=args.mode, model_routes=routes)
+            runs.append({
+                "wall_clock": time.time() - start_time,
+                "execution_time": result["execution_time"] / 1000,
+                "input_tokens": result["usage"].get("inputTokens", 0),
+                "output_tokens": result["usage"].get("outputTokens", 0),
+                "cache_read_tokens": result["usage"].get("cacheReadInputTokens", 0),
+                "cost_usd": result["estimated_cost_usd"] or 0.0,
+            })
+            for agent, usage in result["agent_usage"].items():
+                agents.setdefault((setup, agent), {"model": usage["modelId"], "tokens": []})["tokens"].append(usage["totalTokens"])
+        summary[setup] = {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+
+    print(f"\n{'Metric':<20}" + "".join(f"{setup:>15}" for setup in summary))
+    for key in ("wall_clock", "execution_time", "input_tokens", "output_tokens", "cache_read_tokens"):
+        print(f"{key:<20}" + "".join(f"{summary[setup][key]:>15.1f}" for setup in summary))
+    print(f"{'cost_usd':<20}" + "".join(f"{summary[setup]['cost_usd']:>15.4f}" for setup in summary))
+
+    print(f"\n{'Setup':<8} {'Agent':<22} {'Model':<48} {'Tokens':>10}")
+    for (setup, agent), usage in agents.items():
+        print(f"{setup:<8} {agent:<22} {usage['model']:<48} {sum(usage['tokens']) / len(usage['tokens']):>10.0f}")
+
+    single, routed = summary["single"], summary["routed"]
+    if single["wall_clock"]:
+        print(f"\n⏱️  Routed wall-clock: {routed['wall_clock'] / single['wall_clock']:.2f}x of single model")
+    if single["cost_usd"]:
+        print(f"💵 Routed cost: {routed['cost_usd'] / single['cost_usd']:.2f}x of single model")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
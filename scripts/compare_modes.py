@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare swarm and parallel investigation modes on the same query.
+
+Runs the query once per mode (bypassing the investigation cache) and reports
+wall-clock time, swarm/parallel execution time and token usage side by side.
+
+Usage:
+    python scripts/compare_modes.py --query "Could you analyze why the carts service is having issues?"
+"""
+import argparse
+import asyncio
+import logging
+import time
+from sherlock.config import Config
+from sherlock.orchestrator import INVESTIGATION_MODES, investigate
+
+# Setup development configuration
+Config.setup_for_development()
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Run the query in every mode and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare Sherlock execution modes")
+    parser.add_argument(
+        "--query",
+        default="Could you analyze why the carts service is having issues?",
+        help="Investigation query (default: analyze carts service issues)"
+    )
+    parser.add_argument(
+        "--model-id",
+        default="us.anthropic.claude-sonnet-4-20250514-v1:0",
+        help="Bedrock model ID to use (default: us.anthropic.claude-sonnet-4-20250514-v1:0)"
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=1,
+        help="Runs per mode; results are averaged (default: 1)"
+    )
+    args = parser.parse_args()
+
+    print(f"\n⚖️  Sherlock Mode Comparison")
+    print(f"❓ Query: {args.query}\n")
+
+    summary = {}
+    for mode in INVESTIGATION_MODES:
+        runs = []
+        for run in range(args.runs):
+            print(f"▶️  {mode} run {run + 1}/{args.runs}...")
+            start_time = time.time()
+            result = await investigate(args.query, model_id=args.model_id, use_cache=False, mode=mode)
+            runs.append({
+                "wall_clock": time.time() - start_time,
+                "execution_time": result["execution_time"] / 1000,
+                "input_tokens": result["usage"].get("inputTokens", 0),
+                "output_tokens": result["usage"].get("outputTokens", 0),
+                "cache_read_tokens": result["usage"].get("cacheReadInputTokens", 0),
+                "cache_write_tokens": result["usage"].get("cacheWriteInputTokens", 0),
+                "agents": len(result["agents_used"]),
+            })
+        summary[mode] = {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+
+    print(f"\n{'Metric':<20}" + "".join(f"{mode:>15}" for mode in summary))
+    for key in ("wall_clock", "execution_time", "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens", "agents"):
+        print(f"{key:<20}" + "".join(f"{summary[mode][key]:>15.1f}" for mode in summary))
+
+    swarm, parallel = summary["swarm"], summary["parallel"]
+    if swarm["wall_clock"]:
+        print(f"\n⏱️  Parallel wall-clock: {parallel['wall_clock'] / swarm['wall_clock']:.2f}x of swarm")
+    swarm_tokens = swarm["input_tokens"] + swarm["output_tokens"]
+    if swarm_tokens:
+        parallel_tokens = parallel["input_tokens"] + parallel["output_tokens"]
+        print(f"🪙 Parallel tokens: {parallel_tokens / swarm_tokens:.2f}x of swarm")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
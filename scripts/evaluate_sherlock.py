@@ -8,23 +8,89 @@ This program implements evaluation in multiple steps:
 3. Dataset evaluation using existing datasets
 4. Multiple evaluators support
 
+Traces are fetched concurrently over the SDK's pooled async HTTP client with
+a bounded number of requests in flight and retry with exponential backoff;
+scores go through the SDK's batched ingestion queue.
+
+Runs are incremental: every page of matching traces is streamed, traces already
+scored are skipped and a per-query watermark in a local SQLite state file moves
+forward as pages are scored, so the evaluator can run as a cron job.
+
 Usage:
-    python scripts/evaluate_sherlock.py
+    python scripts/evaluate_sherlock.py --session sherlock-1234
+    python scripts/evaluate_sherlock.py --since-hours 24 --concurrency 16 --score-batch-size 100
+    python scripts/evaluate_sherlock.py --from 2025-01-01T00:00:00Z --to 2025-01-02T00:00:00Z --rescore
 """
 
 import os
 import argparse
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from langfuse import get_client
+import asyncio
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional, Dict, Any, AsyncIterator
+import httpx
+from langfuse import Langfuse
+from langfuse.api.core.api_error import ApiError
+
+# Responses worth retrying: timeouts, rate limiting and server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp, treating timestamps without a timezone as UTC"""
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+class EvaluationState:
+    """Local record of scored traces and how far each query has been evaluated"""
+    
+    def __init__(self, path: str):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("CREATE TABLE IF NOT EXISTS scored (trace_id TEXT PRIMARY KEY, trace_timestamp TEXT, scored_at TEXT NOT NULL)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS watermarks (scope TEXT PRIMARY KEY, timestamp TEXT NOT NULL)")
+        self.db.commit()
+    
+    def watermark(self, scope: str) -> Optional[datetime]:
+        """Timestamp up to which every trace of this query has been scored"""
+        row = self.db.execute("SELECT timestamp FROM watermarks WHERE scope = ?", (scope,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+    
+    def unscored(self, trace_ids: List[str]) -> set:
+        """The trace IDs that have not been scored yet"""
+        if not trace_ids:
+            return set()
+        placeholders = ",".join("?" * len(trace_ids))
+        scored = {row[0] for row in self.db.execute(f"SELECT trace_id FROM scored WHERE trace_id IN ({placeholders})", trace_ids)}
+        return set(trace_ids) - scored
+    
+    def checkpoint(self, scope: str, traces: List[Any], watermark: Optional[datetime]) -> None:
+        """Mark traces as scored and move the query's watermark forward in one transaction"""
+        now = datetime.now(timezone.utc).isoformat()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO scored (trace_id, trace_timestamp, scored_at) VALUES (?, ?, ?)",
+                [(trace.id, trace.timestamp.isoformat(), now) for trace in traces],
+            )
+            if watermark:
+                self.db.execute("INSERT OR REPLACE INTO watermarks (scope, timestamp) VALUES (?, ?)", (scope, watermark.isoformat()))
+    
+    def close(self) -> None:
+        self.db.close()
 
 
 class SherlockEvaluator:
     """Main evaluator class for Sherlock traces and datasets"""
     
-    def __init__(self):
-        """Initialize Langfuse client"""
-        self.langfuse = get_client()
+    def __init__(self, score_batch_size: int = 50):
+        """Initialize Langfuse client, sending scores in batches of ``score_batch_size``"""
+        self.langfuse = Langfuse(flush_at=score_batch_size, flush_interval=1.0)
         print("✅ Langfuse client initialized")
     
     # STEP 1: Implement getting existing traces
@@ -46,6 +112,27 @@ class SherlockEvaluator:
     # STEP 2: Single evaluation using LLM as judge
 
     
+    def apply_evaluators(self, trace: Any) -> List[Dict[str, Any]]:
+        """Run every evaluator on a trace"""
+        return [
+            self.observation_count_score_evaluator(trace),
+            self.latency_score_evaluator(trace),
+            self.input_token_count_evaluator(trace),
+            self.total_cost_evaluator(trace)
+        ]
+    
+    def score_trace(self, trace_id: str, evaluations: List[Dict[str, Any]], verbose: bool = True) -> None:
+        """Queue a trace's scores; the SDK sends them to Langfuse in batches"""
+        for evaluation in evaluations:
+            self.langfuse.create_score(
+                name=evaluation["name"],
+                value=evaluation["value"],
+                trace_id=trace_id,
+                comment=evaluation["comment"]
+            )
+            if verbose:
+                print(f"✅ Applied {evaluation['name']}: {evaluation['comment']}")
+    
     def evaluate_trace(self, trace_id: str) -> bool:
         """Evaluate a trace with multiple evaluators"""
         try:
@@ -55,39 +142,147 @@ class SherlockEvaluator:
                 print(f"❌ Trace not found: {trace_id}")
                 return False
             
-            # Apply multiple evaluators
-            evaluations = [
-                self.observation_count_score_evaluator(trace),
-                self.latency_score_evaluator(trace),
-                self.input_token_count_evaluator(trace),
-                self.total_cost_evaluator(trace)
-            ]
-            
-            # Add scores to trace
-            for evaluation in evaluations:
-                self.langfuse.create_score(
-                    name=evaluation["name"],
-                    value=evaluation["value"],
-                    trace_id=trace_id,
-                    comment=evaluation["comment"]
-                )
-                print(f"✅ Applied {evaluation['name']}: {evaluation['comment']}")
-            
+            # Apply multiple evaluators and add scores to trace
+            self.score_trace(trace_id, self.apply_evaluators(trace))
             return True
             
         except Exception as e:
             print(f"❌ Error evaluating trace {trace_id}: {e}")
             return False
     
-    def evaluate_traces_batch(self, traces: List[Any]) -> int:
-        """Evaluate multiple traces"""
-        success_count = 0
-        for trace in traces:
-            if self.evaluate_trace(trace.id):
-                success_count += 1
+    async def fetch_trace_with_retries(self, trace_id: str, retries: int, stats: Dict[str, Any]) -> Any:
+        """Fetch a trace, retrying rate limits, server errors and network failures with exponential backoff"""
+        for attempt in range(retries + 1):
+            try:
+                return await self.langfuse.async_api.trace.get(trace_id)
+            except (ApiError, httpx.TransportError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt == retries:
+                    raise
+                stats["retries"] += 1
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                await asyncio.sleep(random.uniform(0, 0.5 * 2 ** attempt))
+    
+    async def evaluate_traces_concurrently(self, trace_ids: List[str], concurrency: int = 16, retries: int = 4) -> Dict[str, Any]:
+        """Fetch and evaluate traces with at most ``concurrency`` requests in flight"""
+        semaphore = asyncio.Semaphore(concurrency)
+        stats = {"evaluated": 0, "failed": 0, "retries": 0, "scores": 0, "fetch_seconds": [], "scored_ids": set()}
+        
+        async def evaluate(trace_id: str) -> None:
+            async with semaphore:
+                fetch_start = time.monotonic()
+                try:
+                    trace = await self.fetch_trace_with_retries(trace_id, retries, stats)
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"❌ Error fetching trace {trace_id}: {e}")
+                    return
+                stats["fetch_seconds"].append(time.monotonic() - fetch_start)
+            
+            evaluations = self.apply_evaluators(trace)
+            self.score_trace(trace_id, evaluations, verbose=False)
+            stats["evaluated"] += 1
+            stats["scores"] += len(evaluations)
+            stats["scored_ids"].add(trace_id)
+        
+        start_time = time.monotonic()
+        await asyncio.gather(*(evaluate(trace_id) for trace_id in trace_ids))
+        flush_start = time.monotonic()
+        
+        # Scores are queued in the background; wait until every batch has been sent
+        await asyncio.to_thread(self.langfuse.flush)
+        stats["flush_seconds"] = time.monotonic() - flush_start
+        stats["wall_seconds"] = time.monotonic() - start_time
+        return stats
+    
+    def evaluate_traces_batch(self, traces: List[Any], concurrency: int = 16, retries: int = 4) -> int:
+        """Evaluate multiple traces concurrently and report throughput"""
+        stats = asyncio.run(self.evaluate_traces_concurrently([trace.id for trace in traces], concurrency, retries))
+        print(f"📈 Successfully evaluated {stats['evaluated']}/{len(traces)} traces ({stats['failed']} failed, {stats['retries']} retries)")
+        self.print_throughput(stats, concurrency)
+        return stats["evaluated"]
+    
+    def print_throughput(self, stats: Dict[str, Any], concurrency: int) -> None:
+        """Report how fast traces were fetched and scored"""
+        wall_seconds = stats["wall_seconds"]
+        fetch_seconds = stats["fetch_seconds"]
+        if wall_seconds:
+            print(f"⚡ Throughput: {stats['evaluated'] / wall_seconds:.1f} traces/s, {stats['scores'] / wall_seconds:.1f} scores/s ({wall_seconds:.1f}s, of which {stats['flush_seconds']:.1f}s flushing scores)")
+        if fetch_seconds:
+            print(f"⏱️  Trace fetch latency: p50 {statistics.median(fetch_seconds):.2f}s, max {max(fetch_seconds):.2f}s with {concurrency} in flight")
+    
+    async def iter_trace_pages(
+        self,
+        session_id: Optional[str] = None,
+        from_timestamp: Optional[datetime] = None,
+        to_timestamp: Optional[datetime] = None,
+        page_size: int = 100,
+    ) -> AsyncIterator[List[Any]]:
+        """Stream every page of traces matching a session and/or time window, oldest first"""
+        page = 1
+        while True:
+            traces = await self.langfuse.async_api.trace.list(
+                page=page,
+                limit=page_size,
+                session_id=session_id,
+                from_timestamp=from_timestamp,
+                to_timestamp=to_timestamp,
+                order_by="timestamp.asc",
+                fields="core",
+            )
+            if traces.data:
+                yield traces.data
+            if page >= traces.meta.total_pages or not traces.data:
+                return
+            page += 1
+    
+    async def evaluate_incrementally(
+        self,
+        state: EvaluationState,
+        scope: str,
+        session_id: Optional[str] = None,
+        from_timestamp: Optional[datetime] = None,
+        to_timestamp: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        page_size: int = 100,
+        concurrency: int = 16,
+        retries: int = 4,
+        rescore: bool = False,
+    ) -> Dict[str, Any]:
+        """Score every unscored trace of a query page by page, checkpointing the watermark after each page"""
+        totals = {"listed": 0, "skipped": 0, "evaluated": 0, "failed": 0, "retries": 0, "scores": 0, "fetch_seconds": [], "flush_seconds": 0.0}
+        start_time = time.monotonic()
         
-        print(f"📈 Successfully evaluated {success_count}/{len(traces)} traces")
-        return success_count
+        async for page in self.iter_trace_pages(session_id, from_timestamp, to_timestamp, page_size):
+            totals["listed"] += len(page)
+            page_ids = [trace.id for trace in page]
+            unscored_ids = set(page_ids) if rescore else state.unscored(page_ids)
+            todo = [trace for trace in page if trace.id in unscored_ids]
+            if limit is not None:
+                todo = todo[:max(limit - totals["evaluated"] - totals["failed"], 0)]
+            totals["skipped"] += len(page) - len(unscored_ids)
+            
+            stats = await self.evaluate_traces_concurrently([trace.id for trace in todo], concurrency, retries)
+            for key in ("evaluated", "failed", "retries", "scores", "fetch_seconds", "flush_seconds"):
+                totals[key] += stats[key]
+            
+            # Scores are flushed at this point; the watermark stops at the oldest failure so it is retried next run
+            scored = [trace for trace in todo if trace.id in stats["scored_ids"]]
+            failed = [trace for trace in todo if trace.id not in stats["scored_ids"]]
+            if failed:
+                watermark = min(trace.timestamp for trace in failed)
+            elif len(todo) == len(unscored_ids):
+                watermark = page[-1].timestamp
+            else:
+                watermark = todo[-1].timestamp if todo else None
+            state.checkpoint(scope, scored, watermark)
+            print(f"📄 Page of {len(page)}: {len(scored)} scored, {len(failed)} failed, {len(page) - len(unscored_ids)} already scored")
+            
+            if failed or (limit is not None and totals["evaluated"] + totals["failed"] >= limit):
+                break
+        
+        totals["wall_seconds"] = time.monotonic() - start_time
+        return totals
     
     # STEP 4: Dataset evaluation
     def evaluate_dataset(self, dataset_name: str) -> bool:
@@ -257,41 +452,71 @@ class SherlockEvaluator:
 def main():
     """Main function to demonstrate the evaluator"""
     parser = argparse.ArgumentParser(description="Evaluate Sherlock traces")
-    parser.add_argument("--session", required=True, help="Session ID to evaluate traces for")
+    parser.add_argument("--session", help="Session ID to evaluate traces for")
+    parser.add_argument("--from", dest="from_timestamp", type=parse_timestamp, help="Evaluate traces from this ISO timestamp")
+    parser.add_argument("--to", dest="to_timestamp", type=parse_timestamp, help="Evaluate traces up to this ISO timestamp")
+    parser.add_argument("--since-hours", type=float, default=24, help="Without --from or a watermark, evaluate traces of the last N hours (default: 24)")
+    parser.add_argument("--settle-minutes", type=float, default=5, help="Without --to, skip traces newer than this, as their investigation may still be running (default: 5)")
+    parser.add_argument("--limit", type=int, help="Maximum traces to evaluate in this run (default: no limit)")
+    parser.add_argument("--page-size", type=int, default=100, help="Traces per page when listing (default: 100)")
+    parser.add_argument("--state", default=os.getenv("SHERLOCK_EVALUATION_STATE", "~/.sherlock/evaluations.db"), help="SQLite file recording scored traces and watermarks (default: ~/.sherlock/evaluations.db)")
+    parser.add_argument("--rescore", action="store_true", help="Ignore the watermark and score traces again even if already scored")
+    parser.add_argument("--concurrency", type=int, default=16, help="Trace fetches in flight at once (default: 16)")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per trace fetch on rate limits and server errors (default: 4)")
+    parser.add_argument("--score-batch-size", type=int, default=50, help="Scores sent to Langfuse per batch (default: 50)")
     args = parser.parse_args()
     
     print("🔍 Starting Sherlock Evaluator")
     
-    evaluator = SherlockEvaluator()
+    evaluator = SherlockEvaluator(score_batch_size=args.score_batch_size)
     
-    # STEP 1: Fetch traces
+    state = EvaluationState(args.state)
+    
+    # STEP 1: Work out which traces this run covers
     print("\n📋 STEP 1: Fetching existing traces")
     
-    print(f"🎯 Fetching traces for session: {args.session}")
-    recent_traces = evaluator.fetch_traces_by_session(args.session, limit=5)
+    now = datetime.now(timezone.utc)
+    scope = f"session:{args.session}" if args.session else "all"
+    watermark = None if args.rescore else state.watermark(scope)
+    from_timestamp = args.from_timestamp
+    if watermark and (from_timestamp is None or watermark > from_timestamp):
+        from_timestamp = watermark
+    if from_timestamp is None and not args.session:
+        from_timestamp = now - timedelta(hours=args.since_hours)
+    to_timestamp = args.to_timestamp or now - timedelta(minutes=args.settle_minutes)
     
-    if recent_traces:
-        print(f"Found {len(recent_traces)} traces")
-        
-        # STEP 2: Evaluate first trace
-        print(f"\n📋 STEP 2: Multi-metric evaluation (4 metrics: observation_count_score + latency_score + input_token_count + total_cost)")
-        
-        first_trace = recent_traces[0]
-        success = evaluator.evaluate_trace(first_trace.id)
-        
-        if success:
+    target = f"session {args.session}" if args.session else "all sessions"
+    print(f"🎯 Fetching traces for {target} from {from_timestamp or 'the beginning'} to {to_timestamp}" + (" (resuming from watermark)" if watermark else ""))
+    
+    # STEP 2: Evaluate every unscored trace, page by page
+    print(f"\n📋 STEP 2: Multi-metric evaluation (4 metrics: observation_count_score + latency_score + input_token_count + total_cost)")
+    
+    try:
+        totals = asyncio.run(evaluator.evaluate_incrementally(
+            state,
+            scope,
+            session_id=args.session,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            limit=args.limit,
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            rescore=args.rescore,
+        ))
+    finally:
+        state.close()
+    
+    if totals["listed"]:
+        print(f"📈 Listed {totals['listed']} traces: {totals['evaluated']} evaluated, {totals['skipped']} already scored, {totals['failed']} failed ({totals['retries']} retries)")
+        evaluator.print_throughput(totals, args.concurrency)
+        if totals["evaluated"]:
             print("✅ Multi-metric trace evaluation completed")
         
         print("\n📋 STEP 3: Check Langfuse UI to verify the evaluation scores were added")
-        
-        # STEP 5: Multiple evaluators on second trace if available
-        if len(recent_traces) > 1:
-            print("\n📋 STEP 5: Additional trace evaluation")
-            second_trace = recent_traces[1]
-            evaluator.evaluate_trace(second_trace.id)
     
     else:
-        print("⚠️  No traces found for the specified session. Please ensure the session ID exists in your Langfuse project.")
+        print("⚠️  No new traces found. Please ensure the session ID or time window has traces in your Langfuse project.")
     
     print("\n🎉 Sherlock Evaluator completed!")
 
@@ -8,6 +8,7 @@ import logging
 import os
 import asyncio
 import argparse
+from sherlock.cassette import Cassette
 from sherlock.orchestrator import orchestrate
 from sherlock.config import Config
 
@@ -36,17 +37,48 @@ async def main():
         default="us.anthropic.claude-sonnet-4-20250514-v1:0",
         help="Bedrock model ID to use (default: us.anthropic.claude-sonnet-4-20250514-v1:0)"
     )
+    parser.add_argument(
+        "--mode",
+        choices=["swarm", "parallel"],
+        default="swarm",
+        help="Execution mode: swarm (sequential handoffs) or parallel (concurrent specialists + synthesis)"
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        help="Record every MCP tool call and model turn to this cassette file"
+    )
+    cassette_group.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        help="Replay a recorded investigation from this cassette file, without AWS or MCP servers"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed: 1 is recorded speed, 4 is four times faster, 0 replays without waiting (default: 1)"
+    )
     
     args = parser.parse_args()
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, mode="record")
+    elif args.replay:
+        cassette = Cassette(args.replay, mode="replay", speed=args.speed)
     
     print(f"\n🔧 New SRE Agent Orchestrator Test")
     print(f"📊 Diagnostic Agent: {args.diagnostic_agent}")
     print(f"🤖 Bedrock Model: {args.model_id}")
+    print(f"🔀 Mode: {args.mode}")
+    if cassette:
+        print(f"📼 Cassette: {cassette.mode} {cassette.path}" + (f" at {args.speed:g}x" if cassette.replaying else ""))
     print(f"❓ Query: {args.query}\n")
     
     try:
         start_time = time.time()
-        result = await orchestrate(args.query, args.diagnostic_agent, args.model_id)
+        result = await orchestrate(args.query, args.diagnostic_agent, args.model_id, mode=args.mode, cassette=cassette)
         elapsed = time.time() - start_time
         
         print(str(result))
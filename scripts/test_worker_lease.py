@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Test that a worker stops an investigation whose job it no longer holds.
+
+Runs queued investigations offline, against the benchmark's stub MCP servers
+and scripted model, and takes each job away from its worker while it runs:
+once by cancelling it as its producer would, once by letting its lease expire
+so that a second worker reclaims it. In both cases the first worker must stop
+its investigation and store nothing, leaving the cancellation or the second
+worker's result in place.
+
+Usage:
+    python scripts/test_worker_lease.py
+    python scripts/test_worker_lease.py --lease-seconds 3 --turn-latency-ms 500
+"""
+import argparse
+import asyncio
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sherlock.benchmark.runner import StubConfig, stubs_installed
+from sherlock.benchmark.scripted_model import ScriptedModel
+from sherlock.config import Config
+from sherlock.job_queue import JobQueue, open_job_queue
+from sherlock.worker import run_job
+
+logger = logging.getLogger(__name__)
+
+REQUEST = {"query": "Could you analyze why the carts service is having issues?", "mode": "swarm", "use_cache": False}
+
+
+async def run_until_taken(queue: JobQueue, job_id: str, take: Callable[[], Awaitable[None]], model: ScriptedModel, lease_seconds: float) -> float:
+    """Run the job on worker-a, call ``take()`` once it is under way, and return how long worker-a kept going."""
+    job = await asyncio.to_thread(queue.claim, "worker-a", lease_seconds)
+    assert job is not None and job.id == job_id, "worker-a could not claim the job"
+    turns = model.turns
+    running = asyncio.ensure_future(run_job(queue, job, "worker-a", lease_seconds))
+    while model.turns < turns + 2:
+        await asyncio.sleep(0.05)
+    taken_at = time.monotonic()
+    await take()
+    try:
+        await asyncio.wait_for(running, timeout=lease_seconds * 2)
+    except asyncio.TimeoutError:
+        raise AssertionError("worker-a kept running the investigation after losing its job")
+    return time.monotonic() - taken_at
+
+
+async def main():
+    """Main function for the worker lease test."""
+    parser = argparse.ArgumentParser(description="Test that workers stop investigations of jobs they lost")
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=1.5,
+        help="Job lease; workers renew it every third of it (default: 1.5)"
+    )
+    parser.add_argument(
+        "--turn-latency-ms",
+        type=float,
+        default=400,
+        help="Scripted model latency per turn, long enough for the job to be taken mid-run (default: 400)"
+    )
+    args = parser.parse_args()
+
+    model = ScriptedModel(turn_latency_ms=args.turn_latency_ms, tool_calls=4)
+    with tempfile.TemporaryDirectory() as directory, stubs_installed(StubConfig(latency_ms=50, payload_kb=1), model):
+        path = Path(directory) / "jobs.db"
+        queue = open_job_queue(f"sqlite://{path}")
+        try:
+            print(f"\n🔧 Worker Lease Test")
+            print(f"⏱️  Lease: {args.lease_seconds:g}s\n")
+
+            # The producer cancels the job: worker-a stops and the cancellation stays
+            job_id = queue.enqueue(REQUEST)
+            stopped_after = await run_until_taken(
+                queue, job_id, lambda: asyncio.to_thread(queue.cancel, job_id, "cancelled by its producer"), model, args.lease_seconds
+            )
+            turns = model.turns
+            await asyncio.sleep(1)
+            assert model.turns == turns, "the investigation kept calling the model after its job was cancelled"
+            job = queue.get(job_id)
+            assert job.status == "failed" and job.error == "cancelled by its producer", f"cancelled job ended as {job.status}: {job.error}"
+            assert job.result is None, "worker-a stored a result for a cancelled job"
+            print(f"✅ Cancelled job: worker-a stopped {stopped_after:.1f}s after the cancellation")
+
+            # The lease expires and worker-b reclaims the job: worker-a stops, worker-b's result stays
+            job_id = queue.enqueue(REQUEST)
+
+            async def reclaim() -> None:
+                with sqlite3.connect(path) as db:
+                    db.execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job_id,))
+                reclaimed = await asyncio.to_thread(queue.claim, "worker-b", args.lease_seconds)
+                assert reclaimed is not None and reclaimed.id == job_id, "worker-b could not reclaim the job"
+                reclaimers.append(asyncio.ensure_future(run_job(queue, reclaimed, "worker-b", args.lease_seconds)))
+
+            reclaimers = []
+            stopped_after = await run_until_taken(queue, job_id, reclaim, model, args.lease_seconds)
+            await asyncio.gather(*reclaimers)
+            job = queue.get(job_id)
+            assert job.status == "succeeded" and job.worker == "worker-b", f"reclaimed job ended as {job.status} on {job.worker}"
+            print(f"✅ Reclaimed job: worker-a stopped {stopped_after:.1f}s after losing its lease, worker-b finished it")
+        finally:
+            queue.close()
+
+
+if __name__ == "__main__":
+    Config.setup_logging(log_level="WARNING")
+    try:
+        asyncio.run(main())
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -1,34 +1,15 @@
 """EKS-MCP client factory for diagnostic operations."""
 import logging
-import os
-from mcp import stdio_client, StdioServerParameters
 from strands.tools.mcp.mcp_client import MCPClient
 
+from sherlock.transports import MCPServerSpec, create_mcp_client
+
 logger = logging.getLogger(__name__)
 
-def get_eks_mcp_client():
-    """Get EKS MCP client for use in orchestrator."""
-    aws_region = os.getenv("AWS_REGION", "us-east-1")
-    
-    return MCPClient(
-        lambda: stdio_client(
-            StdioServerParameters(
-                command="docker",
-                args=[
-                    "run",
-                    "--rm",
-                    "--interactive",
-                    "--env", f"AWS_REGION={aws_region}",
-                    "--env", f"AWS_ACCESS_KEY_ID={os.getenv('AWS_ACCESS_KEY_ID', '')}",
-                    "--env", f"AWS_SECRET_ACCESS_KEY={os.getenv('AWS_SECRET_ACCESS_KEY', '')}",
-                    "--env", f"AWS_SESSION_TOKEN={os.getenv('AWS_SESSION_TOKEN', '')}",
-                    "--env", "FASTMCP_LOG_LEVEL=ERROR",
-                    "--volume", f"{os.path.expanduser('~')}/.aws:/root/.aws:ro",
-                    "awslabs/eks-mcp-server:latest",
-                    "--allow-sensitive-data-access"
-                ],
-                env={},
-                timeout=30
-            )
-        )
-    )
\ No newline at end of file
+EKS_MCP_IMAGE = "awslabs/eks-mcp-server:latest"
+EKS_MCP_PACKAGE = "awslabs.eks-mcp-server"
+EKS_MCP_SERVER = MCPServerSpec("eks-mcp", EKS_MCP_IMAGE, EKS_MCP_PACKAGE, ("--allow-sensitive-data-access",))
+
+def get_eks_mcp_client() -> MCPClient:
+    """Get EKS MCP client for use in orchestrator, over the transport configured for eks-mcp."""
+    return create_mcp_client(EKS_MCP_SERVER)
@@ -1,33 +1,15 @@
 """DynamoDB MCP client factory for persistence operations."""
 import logging
-import os
-from mcp import stdio_client, StdioServerParameters
 from strands.tools.mcp.mcp_client import MCPClient
 
+from sherlock.transports import MCPServerSpec, create_mcp_client
+
 logger = logging.getLogger(__name__)
 
-def get_dynamodb_mcp_client():
-    """Get DynamoDB MCP client for use in orchestrator."""
-    aws_region = os.getenv("AWS_REGION", "us-east-1")
-    
-    return MCPClient(
-        lambda: stdio_client(
-            StdioServerParameters(
-                command="docker",
-                args=[
-                    "run",
-                    "--rm",
-                    "--interactive",
-                    "--env", f"AWS_REGION={aws_region}",
-                    "--env", f"AWS_ACCESS_KEY_ID={os.getenv('AWS_ACCESS_KEY_ID', '')}",
-                    "--env", f"AWS_SECRET_ACCESS_KEY={os.getenv('AWS_SECRET_ACCESS_KEY', '')}",
-                    "--env", f"AWS_SESSION_TOKEN={os.getenv('AWS_SESSION_TOKEN', '')}",
-                    "--env", "FASTMCP_LOG_LEVEL=ERROR",
-                    "--volume", f"{os.path.expanduser('~')}/.aws:/root/.aws:ro",
-                    "awslabs/dynamodb-mcp-server:latest"
-                ],
-                env={},
-                timeout=30
-            )
-        )
-    )
\ No newline at end of file
+DYNAMODB_MCP_IMAGE = "awslabs/dynamodb-mcp-server:latest"
+DYNAMODB_MCP_PACKAGE = "awslabs.dynamodb-mcp-server"
+DYNAMODB_MCP_SERVER = MCPServerSpec("dynamodb", DYNAMODB_MCP_IMAGE, DYNAMODB_MCP_PACKAGE)
+
+def get_dynamodb_mcp_client() -> MCPClient:
+    """Get DynamoDB MCP client for use in orchestrator, over the transport configured for dynamodb."""
+    return create_mcp_client(DYNAMODB_MCP_SERVER)
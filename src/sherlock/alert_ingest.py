@@ -0,0 +1,231 @@
+"""Alert ingestion: group alert bursts into incidents and run one investigation per incident."""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterator, Optional, Set, TextIO
+
+from sherlock.alerts import AlertGrouper, Incident, parse_alerts
+from sherlock.cli import DEFAULT_MODEL_ID, run_job
+from sherlock.config import Config
+from sherlock.job_queue import JobQueue, open_job_queue
+from sherlock.mcp_pool import close_all_pools, prewarm
+from sherlock.orchestrator import INVESTIGATION_MODES
+
+logger = logging.getLogger(__name__)
+
+
+class IncidentDispatcher:
+    """Feed alerts to an AlertGrouper and investigate each incident once it closes.
+
+    At most ``concurrency`` incidents are investigated at once, here or on
+    sherlock-worker processes through ``job_queue``; each result is written
+    to ``output`` as a JSONL record carrying the incident summary.
+    """
+
+    def __init__(self, grouper: AlertGrouper, defaults: Dict[str, Any], output: TextIO, concurrency: int = 2, job_queue: Optional[JobQueue] = None):
+        self.grouper = grouper
+        self.defaults = defaults
+        self.output = output
+        self.job_queue = job_queue
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: Set[asyncio.Future] = set()
+        self._stats = {"investigations": 0, "succeeded": 0, "failed": 0}
+
+    def ingest(self, payload: Any) -> Dict[str, Any]:
+        """Group the alerts of one payload; raises ValueError for a payload that is not an alert."""
+        alerts = parse_alerts(payload)
+        incidents = {incident.id for alert in alerts if (incident := self.grouper.add(alert)) is not None}
+        return {"alerts": len(alerts), "incidents": sorted(incidents)}
+
+    async def investigate(self, incident: Incident) -> Dict[str, Any]:
+        async with self._slots:
+            logger.info(f"Investigating incident {incident.id}: {len(incident.alerts)} alerts in namespace {incident.namespace or '-'}")
+            record = await run_job({**self.defaults, "id": incident.id, "query": incident.query()}, self.job_queue)
+        record = {**record, "incident": incident.summary()}
+        self._stats["investigations"] += 1
+        self._stats["succeeded" if record["status"] == "success" else "failed"] += 1
+        self.output.write(json.dumps(record, default=str) + "\n")
+        self.output.flush()
+        return record
+
+    def dispatch_ready(self, everything: bool = False) -> int:
+        """Start investigating every incident that has closed; returns how many were started."""
+        incidents = self.grouper.close_ready(everything=everything)
+        for incident in incidents:
+            task = asyncio.ensure_future(self.investigate(incident))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return len(incidents)
+
+    async def run(self, stop: asyncio.Event, poll_interval: float = 5.0) -> None:
+        """Investigate incidents as they close until ``stop`` is set, then close and investigate the rest."""
+        while not stop.is_set():
+            self.dispatch_ready()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+        await self.drain()
+
+    async def drain(self) -> None:
+        """Investigate every open incident and wait for all investigations to finish."""
+        self.dispatch_ready(everything=True)
+        while self._running:
+            await asyncio.gather(*list(self._running))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.grouper.stats(), **self._stats}
+
+
+def read_payloads(stream: TextIO) -> Iterator[Any]:
+    """Alert payloads of a file holding one JSON document per line, or one JSON document.
+
+    Lines are parsed as they are read, so alerts piped in on stdin are grouped
+    as they arrive; the rest of the stream is only read at once when its first
+    payload line is not JSON on its own, as in a pretty-printed document.
+    """
+    lines = enumerate(stream, start=1)
+    first = True
+    while (item := next(lines, None)) is not None:
+        line_number, line = item
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            if first:
+                rest = stream.read()
+                try:
+                    yield json.loads(line + rest)
+                    return
+                except ValueError:
+                    lines = enumerate(rest.splitlines(), start=line_number + 1)
+            logger.warning(f"Skipping invalid payload on line {line_number}: {e}")
+        first = False
+
+
+def webhook_app(dispatcher: IncidentDispatcher):
+    """Starlette app that takes alert webhooks on POST /alerts and reports grouping stats on GET /status."""
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    async def receive(request: Request) -> JSONResponse:
+        try:
+            accepted = dispatcher.ingest(await request.json())
+        except (ValueError, KeyError, TypeError) as e:
+            return JSONResponse({"error": f"Invalid alert payload: {e}"}, status_code=400)
+        return JSONResponse(accepted, status_code=202)
+
+    async def status(request: Request) -> JSONResponse:
+        return JSONResponse(dispatcher.stats())
+
+    return Starlette(routes=[Route("/alerts", receive, methods=["POST"]), Route("/status", status, methods=["GET"])])
+
+
+async def serve(dispatcher: IncidentDispatcher, host: str, port: int, poll_interval: float) -> None:
+    """Receive alert webhooks until interrupted, investigating incidents as they settle."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(webhook_app(dispatcher), host=host, port=port, log_level="warning"))
+    stop = asyncio.Event()
+    dispatching = asyncio.ensure_future(dispatcher.run(stop, poll_interval))
+    logger.info(f"Receiving alerts on http://{host}:{port}/alerts")
+    try:
+        await server.serve()
+    finally:
+        # Incidents still open when the server stops are investigated before exiting
+        stop.set()
+        await dispatching
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Group the alerts from files or webhooks and investigate each incident."""
+    defaults = {
+        "mode": args.mode,
+        "model_id": args.model_id,
+        "diagnostic_agent": args.diagnostic_agent,
+        "use_cache": not args.no_cache,
+    }
+    grouper = AlertGrouper(
+        window_seconds=args.window,
+        settle_seconds=args.settle,
+        max_age_seconds=args.max_age,
+        min_similarity=args.min_similarity,
+    )
+    with contextlib.ExitStack() as stack:
+        output = stack.enter_context(open(args.output, "a")) if args.output else sys.stdout
+        # Agents stream their text to stdout; keep it out of the JSONL results
+        stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+
+        job_queue = open_job_queue(args.queue) if args.queue else None
+        dispatcher = IncidentDispatcher(grouper, defaults, output, concurrency=args.concurrency, job_queue=job_queue)
+        try:
+            if args.prewarm and job_queue is None:
+                await asyncio.to_thread(prewarm)
+            if args.serve:
+                await serve(dispatcher, args.host, args.port, poll_interval=min(args.settle, 5.0))
+            else:
+                # Replayed alerts are grouped by their own timestamps, then every incident is investigated
+                for path in args.inputs:
+                    with (contextlib.nullcontext(sys.stdin) if path == "-" else open(path)) as stream:
+                        for payload in read_payloads(stream):
+                            try:
+                                dispatcher.ingest(payload)
+                            except (ValueError, KeyError, TypeError) as e:
+                                logger.warning(f"Skipping payload from {path}: {e}")
+                await dispatcher.drain()
+            return dispatcher.stats()
+        finally:
+            await asyncio.to_thread(close_all_pools)
+            if job_queue is not None:
+                job_queue.close()
+
+
+def main():
+    """Entry point of ``sherlock-alerts``."""
+    parser = argparse.ArgumentParser(
+        prog="sherlock-alerts",
+        description="Group CloudWatch and Alertmanager alerts into incidents and run one investigation per incident, writing results as JSONL",
+    )
+    parser.add_argument("inputs", nargs="*", default=["-"], help="Files of alert payloads (one JSON document or JSONL), or - for stdin (default: -)")
+    parser.add_argument("--serve", action="store_true", help="Receive alert webhooks on POST /alerts instead of reading files")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on with --serve (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SHERLOCK_ALERT_PORT", "9095")), help="Port to listen on with --serve (default: 9095)")
+    parser.add_argument("--output", "-o", help="Append results to this JSONL file instead of writing them to stdout")
+    parser.add_argument("--window", type=float, default=float(os.getenv("SHERLOCK_ALERT_GROUP_WINDOW", "300")), help="Seconds between alerts of the same incident (default: 300)")
+    parser.add_argument("--settle", type=float, default=float(os.getenv("SHERLOCK_ALERT_SETTLE_SECONDS", "60")), help="Seconds without new alerts before an incident is investigated (default: 60)")
+    parser.add_argument("--max-age", type=float, default=float(os.getenv("SHERLOCK_ALERT_MAX_INCIDENT_AGE", "900")), help="Seconds after which an incident that keeps getting alerts is investigated anyway (default: 900)")
+    parser.add_argument("--min-similarity", type=float, default=float(os.getenv("SHERLOCK_ALERT_MIN_SIMILARITY", "0.3")), help="Label overlap an alert needs with an incident of another service to join it (default: 0.3)")
+    parser.add_argument("--concurrency", "-c", type=int, default=2, help="Incidents investigated at the same time (default: 2)")
+    parser.add_argument("--mode", choices=INVESTIGATION_MODES, default="parallel", help="Execution mode (default: parallel)")
+    parser.add_argument("--model-id", default=DEFAULT_MODEL_ID, help=f"Bedrock model ID (default: {DEFAULT_MODEL_ID})")
+    parser.add_argument("--diagnostic-agent", choices=["eks-mcp"], default="eks-mcp", help="Diagnostic agent (default: eks-mcp)")
+    parser.add_argument("--no-cache", action="store_true", help="Always run investigations instead of serving repeats from the cache")
+    parser.add_argument("--no-prewarm", dest="prewarm", action="store_false", help="Do not start MCP sessions before the first investigation")
+    parser.add_argument("--queue", default=os.getenv("SHERLOCK_JOB_QUEUE"), help="Hand investigations to sherlock-worker processes through this job queue (default: SHERLOCK_JOB_QUEUE)")
+    parser.add_argument("--log-level", default="INFO", help="Log level for stderr (default: INFO)")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    os.environ.setdefault("SHERLOCK_MCP_POOL_MAX_SIZE", str(args.concurrency))
+    Config.setup_logging(log_level=args.log_level)
+    enable_langfuse = bool(os.getenv("LANGFUSE_PUBLIC_KEY") and os.getenv("LANGFUSE_SECRET_KEY"))
+    Config.setup_telemetry(enable_langfuse=enable_langfuse)
+    Config.setup_environment()
+
+    stats = asyncio.run(run(args))
+    print(
+        f"🚨 {stats['alerts']} firing alerts ({stats['resolved']} resolved ignored) grouped into {stats['incidents']} incidents: "
+        f"{stats['investigations']} investigations ({stats['succeeded']} succeeded, {stats['failed']} failed)",
+        file=sys.stderr,
+    )
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Parse CloudWatch and Alertmanager alerts and group them into incidents."""
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from opentelemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter("sherlock.alerts")
+alerts_counter = meter.create_counter(
+    "sherlock.alerts.received",
+    description="Alerts received, by source and whether they were firing or resolved",
+)
+incidents_counter = meter.create_counter(
+    "sherlock.alerts.incidents",
+    description="Incidents the received alerts were grouped into",
+)
+
+# Labels that name where an alert comes from; they tell the workload apart in the query
+# but are too specific (one pod, one node) to decide whether two alerts belong together
+INSTANCE_LABELS = {"pod", "pod_name", "podname", "instance", "container", "container_id", "node", "uid", "endpoint"}
+SERVICE_LABELS = ("service", "servicename", "app", "app_kubernetes_io_name", "deployment", "job", "tablename", "functionname")
+NAMESPACE_LABELS = ("namespace", "kubernetes_namespace", "exported_namespace")
+
+
+@dataclass
+class Alert:
+    """One firing or resolved alert, normalized across sources."""
+    source: str
+    name: str
+    firing: bool
+    namespace: str = ""
+    service: str = ""
+    severity: str = ""
+    summary: str = ""
+    labels: Dict[str, str] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identity of the alert, so re-sent notifications are not counted twice."""
+        raw = json.dumps([self.source, self.name, sorted(self.labels.items())])
+        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+    @property
+    def grouping_labels(self) -> set:
+        """Label pairs compared when deciding whether two alerts belong to the same incident."""
+        return {(key, value) for key, value in self.labels.items() if key.lower() not in INSTANCE_LABELS}
+
+
+def parse_time(value: Optional[str]) -> float:
+    """Epoch seconds of an ISO 8601 timestamp (``Z`` and ``+0000`` offsets included), or now if missing."""
+    if not value:
+        return time.time()
+    value = value.replace("Z", "+00:00")
+    if len(value) > 5 and value[-5] in "+-" and value[-3] != ":":
+        value = f"{value[:-2]}:{value[-2:]}"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(f"Unparseable alert timestamp {value!r}; using the time it was received")
+        return time.time()
+    return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def first_label(labels: Dict[str, str], names: Iterable[str]) -> str:
+    lowered = {key.lower(): value for key, value in labels.items()}
+    return next((lowered[name] for name in names if lowered.get(name)), "")
+
+
+def parse_alertmanager(payload: Dict[str, Any]) -> List[Alert]:
+    """Alerts of an Alertmanager webhook notification."""
+    alerts = []
+    for item in payload.get("alerts", []):
+        labels = {**payload.get("commonLabels", {}), **item.get("labels", {})}
+        annotations = {**payload.get("commonAnnotations", {}), **item.get("annotations", {})}
+        alerts.append(Alert(
+            source="alertmanager",
+            name=labels.get("alertname", "unnamed"),
+            firing=item.get("status", payload.get("status", "firing")) == "firing",
+            namespace=first_label(labels, NAMESPACE_LABELS),
+            service=first_label(labels, SERVICE_LABELS),
+            severity=labels.get("severity", ""),
+            summary=annotations.get("summary") or annotations.get("description") or annotations.get("message", ""),
+            labels=labels,
+            started_at=parse_time(item.get("startsAt")),
+        ))
+    return alerts
+
+
+def parse_cloudwatch(payload: Dict[str, Any]) -> List[Alert]:
+    """The alarm of a CloudWatch alarm state change, as delivered by SNS or EventBridge."""
+    if payload.get("Type") == "Notification":
+        # SNS wraps the alarm as a JSON string
+        return parse_cloudwatch(json.loads(payload["Message"]))
+
+    if "detail" in payload:
+        detail = payload["detail"]
+        name = detail.get("alarmName", "unnamed")
+        state = detail.get("state", {})
+        firing, reason = state.get("value") == "ALARM", state.get("reason", "")
+        timestamp = state.get("timestamp") or payload.get("time")
+        labels: Dict[str, str] = {}
+        for metric in detail.get("configuration", {}).get("metrics", []):
+            stat_metric = metric.get("metricStat", {}).get("metric", {})
+            if stat_metric:
+                labels.setdefault("metric", stat_metric.get("name", ""))
+                labels.setdefault("metric_namespace", stat_metric.get("namespace", ""))
+                labels.update(stat_metric.get("dimensions", {}))
+    else:
+        name = payload.get("AlarmName", "unnamed")
+        firing, reason = payload.get("NewStateValue") == "ALARM", payload.get("NewStateReason", "")
+        timestamp = payload.get("StateChangeTime")
+        trigger = payload.get("Trigger", {})
+        labels = {"metric": trigger.get("MetricName", ""), "metric_namespace": trigger.get("Namespace", "")}
+        labels.update({dimension["name"]: dimension["value"] for dimension in trigger.get("Dimensions", [])})
+
+    labels = {key: value for key, value in labels.items() if value}
+    return [Alert(
+        source="cloudwatch",
+        name=name,
+        firing=firing,
+        # Container Insights alarms carry the Kubernetes namespace and service as dimensions; other
+        # alarms are grouped by their metric namespace (e.g. AWS/DynamoDB), with the table or function as service
+        namespace=first_label(labels, NAMESPACE_LABELS) or labels.get("metric_namespace", ""),
+        service=first_label(labels, SERVICE_LABELS),
+        summary=reason,
+        labels=labels,
+        started_at=parse_time(timestamp),
+    )]
+
+
+def parse_alerts(payload: Any) -> List[Alert]:
+    """Alerts of an Alertmanager webhook, a CloudWatch alarm (raw, SNS or EventBridge), or a list of those."""
+    if isinstance(payload, list):
+        return [alert for item in payload for alert in parse_alerts(item)]
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object or list of objects")
+    if "alerts" in payload:
+        alerts = parse_alertmanager(payload)
+    elif payload.get("Type") == "Notification" or "AlarmName" in payload or payload.get("detail-type") == "CloudWatch Alarm State Change":
+        alerts = parse_cloudwatch(payload)
+    else:
+        raise ValueError("not an Alertmanager webhook or CloudWatch alarm payload")
+    for alert in alerts:
+        alerts_counter.add(1, {"source": alert.source, "firing": alert.firing})
+    return alerts
+
+
+@dataclass
+class Incident:
+    """Alerts that are likely symptoms of the same problem."""
+    id: str
+    namespace: str
+    first_at: float
+    last_at: float
+    alerts: List[Alert] = field(default_factory=list)
+    fingerprints: set = field(default_factory=set)
+    services: Counter = field(default_factory=Counter)
+    labels: Counter = field(default_factory=Counter)
+    repeats: int = 0
+    updated: float = field(default_factory=time.monotonic)
+
+    def add(self, alert: Alert) -> None:
+        self.updated = time.monotonic()
+        self.first_at = min(self.first_at, alert.started_at)
+        self.last_at = max(self.last_at, alert.started_at)
+        if alert.fingerprint in self.fingerprints:
+            self.repeats += 1
+            return
+        self.fingerprints.add(alert.fingerprint)
+        self.alerts.append(alert)
+        if alert.service:
+            self.services[alert.service] += 1
+        self.labels.update(alert.grouping_labels)
+
+    def similarity(self, alert: Alert) -> float:
+        """How well an alert fits this incident: 1 for a service already in it, else label overlap."""
+        if alert.service and alert.service in self.services:
+            return 1.0
+        labels = alert.grouping_labels
+        if not labels or not self.labels:
+            # Nothing to compare; alerts of the same namespace and time are assumed to be related
+            return 0.5
+        return len(labels & self.labels.keys()) / len(labels | self.labels.keys())
+
+    def query(self, max_alerts: int = 15) -> str:
+        """Investigation query describing the whole incident."""
+        started = datetime.fromtimestamp(self.first_at, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        lines = [
+            f"Investigate this incident: {len(self.alerts)} related alerts fired since {started} UTC"
+            + (f" in {'metric namespace' if self.namespace.startswith('AWS/') else 'namespace'} {self.namespace}" if self.namespace else "")
+            + (f", affecting {', '.join(service for service, _ in self.services.most_common(5))}" if self.services else "")
+            + ".",
+            "Alerts:",
+        ]
+        distinct = Counter((alert.severity, alert.name, alert.service, alert.summary) for alert in self.alerts)
+        for (severity, name, service, summary), count in distinct.most_common(max_alerts):
+            lines.append(
+                f"- {f'[{severity}] ' if severity else ''}{name}"
+                + (f" on {service}" if service else "")
+                + (f" (x{count})" if count > 1 else "")
+                + (f": {summary}" if summary else "")
+            )
+        if len(distinct) > max_alerts:
+            lines.append(f"- ... and {len(distinct) - max_alerts} more")
+        lines.append("Find the common root cause of these alerts rather than explaining each one separately.")
+        return "\n".join(lines)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "namespace": self.namespace,
+            "services": dict(self.services),
+            "alerts": len(self.alerts),
+            "repeats": self.repeats,
+            "first_at": datetime.fromtimestamp(self.first_at, timezone.utc).isoformat(),
+            "last_at": datetime.fromtimestamp(self.last_at, timezone.utc).isoformat(),
+        }
+
+
+class AlertGrouper:
+    """Group alerts into incidents one at a time, as they arrive.
+
+    Open incidents are indexed by namespace. An alert joins the open incident
+    of its namespace that it is most similar to (same service, or at least
+    ``min_similarity`` overlap of its identifying labels) and whose alerts
+    started within ``window_seconds`` of it; otherwise it opens a new
+    incident. Each alert is compared with the few open incidents of its
+    namespace only, so a burst of hundreds of alerts is grouped in linear
+    time. An incident closes once no alert has joined it for
+    ``settle_seconds`` or it has been open for ``max_age_seconds``.
+    """
+
+    def __init__(self, window_seconds: float = 300, settle_seconds: float = 60, max_age_seconds: float = 900, min_similarity: float = 0.3):
+        self.window_seconds = window_seconds
+        self.settle_seconds = settle_seconds
+        self.max_age_seconds = max_age_seconds
+        self.min_similarity = min_similarity
+        self._open: Dict[str, List[Incident]] = defaultdict(list)
+        self._opened_at: Dict[str, float] = {}
+        self._stats = {"alerts": 0, "resolved": 0, "incidents": 0}
+
+    def add(self, alert: Alert) -> Optional[Incident]:
+        """Put a firing alert into an incident and return it; resolved alerts are only counted."""
+        if not alert.firing:
+            self._stats["resolved"] += 1
+            return None
+        self._stats["alerts"] += 1
+
+        best: Optional[Tuple[float, Incident]] = None
+        for incident in self._open[alert.namespace]:
+            if alert.started_at < incident.first_at - self.window_seconds or alert.started_at > incident.last_at + self.window_seconds:
+                continue
+            score = incident.similarity(alert)
+            if score >= self.min_similarity and (best is None or score > best[0]):
+                best = (score, incident)
+
+        if best is not None:
+            incident = best[1]
+        else:
+            incident = Incident(id=uuid.uuid4().hex[:12], namespace=alert.namespace, first_at=alert.started_at, last_at=alert.started_at)
+            self._open[alert.namespace].append(incident)
+            self._opened_at[incident.id] = time.monotonic()
+            self._stats["incidents"] += 1
+            incidents_counter.add(1)
+            logger.info(f"Opened incident {incident.id} for {alert.name} in namespace {alert.namespace or '-'}")
+        incident.add(alert)
+        return incident
+
+    def close_ready(self, now: Optional[float] = None, everything: bool = False) -> List[Incident]:
+        """Remove and return incidents that have settled or are too old to keep open, or all of them."""
+        now = now if now is not None else time.monotonic()
+        closed = []
+        for namespace, incidents in list(self._open.items()):
+            keep = []
+            for incident in incidents:
+                settled = now - incident.updated >= self.settle_seconds
+                too_old = now - self._opened_at[incident.id] >= self.max_age_seconds
+                if everything or settled or too_old:
+                    closed.append(incident)
+                    del self._opened_at[incident.id]
+                else:
+                    keep.append(incident)
+            if keep:
+                self._open[namespace] = keep
+            else:
+                del self._open[namespace]
+        return sorted(closed, key=lambda incident: incident.first_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "open_incidents": sum(len(incidents) for incidents in self._open.values())}
@@ -0,0 +1,308 @@
+"""Vectorized metric anomaly pre-screening for the observability agent."""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import boto3
+import numpy as np
+from strands import tool
+
+logger = logging.getLogger(__name__)
+
+# A series is reported as anomalous when any component crosses its threshold (score >= 1).
+# The peak z threshold is high because it is the maximum over every point of the incident window.
+ROBUST_Z_THRESHOLD = 4.5
+CHANGE_POINT_THRESHOLD = 5.0
+SEASONAL_Z_THRESHOLD = 3.0
+
+# Scale factor that makes the median absolute deviation comparable to a standard deviation
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class MetricAnomaly:
+    """How anomalous one metric series is over the incident window."""
+    name: str
+    score: float
+    robust_z: float
+    change_point: Optional[int]
+    change_point_stat: float
+    level_shift: float
+    seasonal_z: Optional[float]
+    baseline: float
+    incident_value: float
+
+    def summary(self, timestamps: Optional[Sequence[str]] = None) -> str:
+        parts = [f"{self.name}: score {self.score:.1f}"]
+        direction = "above" if self.robust_z > 0 else "below"
+        parts.append(
+            f"peak {abs(self.robust_z):.1f} robust σ {direction} baseline "
+            f"(baseline {self.baseline:.4g}, incident median {self.incident_value:.4g})"
+        )
+        if self.change_point is not None and self.change_point_stat >= CHANGE_POINT_THRESHOLD:
+            at = timestamps[self.change_point] if timestamps is not None else f"point {self.change_point}"
+            parts.append(f"level shift {self.level_shift:+.4g} at {at}")
+        if self.seasonal_z is not None:
+            parts.append(f"{self.seasonal_z:+.1f} σ vs same time last season")
+        return "; ".join(parts)
+
+
+def _robust_scale(deviations: np.ndarray, center: np.ndarray) -> np.ndarray:
+    """MAD-based scale per row, floored so flat series do not divide by zero."""
+    mad = np.nanmedian(np.abs(deviations), axis=1) * MAD_SCALE
+    return np.maximum(mad, 0.01 * np.abs(center) + 1e-9)
+
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    """Replace missing datapoints with the series median so cumulative sums stay defined."""
+    medians = np.nanmedian(values, axis=1, keepdims=True)
+    medians = np.where(np.isnan(medians), 0.0, medians)
+    return np.where(np.isnan(values), medians, values)
+
+
+def change_points(values: np.ndarray, min_segment: int = 3) -> Dict[str, np.ndarray]:
+    """Find the strongest single mean shift in every row at once.
+
+    For each split k the two-sample statistic |mean(left) - mean(right)| *
+    sqrt(k(n-k)/n) / sigma is computed from cumulative sums, with sigma
+    estimated robustly from first differences, and the best split is kept.
+    """
+    series_count, length = values.shape
+    if length < 2 * min_segment:
+        return {
+            "index": np.full(series_count, -1),
+            "stat": np.zeros(series_count),
+            "shift": np.zeros(series_count),
+        }
+
+    filled = _fill_gaps(values)
+    cumulative = np.cumsum(filled, axis=1)
+    total = cumulative[:, -1:]
+    splits = np.arange(min_segment, length - min_segment + 1)
+    left_mean = cumulative[:, splits - 1] / splits
+    right_mean = (total - cumulative[:, splits - 1]) / (length - splits)
+    shift = right_mean - left_mean
+
+    differences = np.diff(filled, axis=1)
+    sigma = _robust_scale(differences - np.median(differences, axis=1, keepdims=True), np.median(filled, axis=1))
+    sigma = sigma / np.sqrt(2)
+    stat = np.abs(shift) * np.sqrt(splits * (length - splits) / length) / sigma[:, None]
+
+    best = np.argmax(stat, axis=1)
+    rows = np.arange(series_count)
+    return {"index": splits[best], "stat": stat[rows, best], "shift": shift[rows, best]}
+
+
+def score_series(
+    values: np.ndarray,
+    incident_start: int,
+    season_length: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Score every row of a (series x datapoints) matrix in one pass.
+
+    Points before ``incident_start`` are the baseline. When at least two
+    seasons of history are available the series are first seasonally
+    differenced (each point minus the same phase one season earlier), so the
+    daily cycle is not mistaken for an anomaly. Three signals are combined:
+    the peak robust z-score of the incident window against the baseline
+    median/MAD, the strongest mean-shift change point around the incident,
+    and the sustained (median) deviation over the incident window.
+    """
+    values = np.asarray(values, dtype=float)
+    raw_center = np.nanmedian(values[:, :incident_start], axis=1)
+    incident_value = np.nanmedian(values[:, incident_start:], axis=1)
+
+    seasonal = bool(season_length) and incident_start >= 2 * season_length
+    if seasonal:
+        residuals = values[:, season_length:] - values[:, :-season_length]
+        start = incident_start - season_length
+    else:
+        residuals = values
+        start = incident_start
+    baseline = residuals[:, :start]
+    window = residuals[:, start:]
+
+    center = np.nanmedian(baseline, axis=1)
+    center = np.where(np.isnan(center), 0.0, center)
+    scale = _robust_scale(baseline - center[:, None], np.where(np.isnan(raw_center), 0.0, raw_center))
+    z = (window - center[:, None]) / scale[:, None]
+    peak_index = np.argmax(np.where(np.isnan(z), -np.inf, np.abs(z)), axis=1)
+    robust_z = z[np.arange(len(z)), peak_index]
+    robust_z = np.where(np.isnan(robust_z), 0.0, robust_z)
+
+    # Look for a shift from just before the incident onwards, with as much lead-in as the window is long
+    lead_in = max(window.shape[1], 6)
+    segment_start = max(start - lead_in, 0)
+    shifts = change_points(residuals[:, segment_start:])
+    change_point = np.where(shifts["index"] >= 0, shifts["index"] + segment_start + (season_length if seasonal else 0), -1)
+
+    sustained_z = (np.nanmedian(window, axis=1) - center) / scale
+    sustained_z = np.where(np.isnan(sustained_z), 0.0, sustained_z)
+
+    score = np.maximum.reduce([
+        np.abs(robust_z) / ROBUST_Z_THRESHOLD,
+        shifts["stat"] / CHANGE_POINT_THRESHOLD,
+        np.abs(sustained_z) / SEASONAL_Z_THRESHOLD,
+    ])
+    return {
+        "score": score,
+        "robust_z": robust_z,
+        "change_point": change_point,
+        "change_point_stat": shifts["stat"],
+        "level_shift": shifts["shift"],
+        "seasonal_z": sustained_z if seasonal else None,
+        "baseline": raw_center,
+        "incident_value": incident_value,
+    }
+
+
+def rank_anomalies(
+    series: Dict[str, Sequence[float]],
+    incident_start: int,
+    season_length: Optional[int] = None,
+    top: int = 10,
+    min_score: float = 1.0,
+) -> List[MetricAnomaly]:
+    """Rank named series sampled on a common grid by anomaly score, most anomalous first.
+
+    Shorter series are aligned to the end of the grid and padded with missing
+    values at the start.
+    """
+    if not series:
+        return []
+    names = list(series)
+    length = max(len(values) for values in series.values())
+    matrix = np.full((len(names), length), np.nan)
+    for row, name in enumerate(names):
+        values = np.asarray(series[name], dtype=float)
+        if len(values):
+            matrix[row, length - len(values):] = values
+
+    scores = score_series(matrix, incident_start, season_length)
+    order = np.argsort(-scores["score"])
+    anomalies = []
+    for row in order[:top]:
+        if scores["score"][row] < min_score:
+            break
+        anomalies.append(MetricAnomaly(
+            name=names[row],
+            score=float(scores["score"][row]),
+            robust_z=float(scores["robust_z"][row]),
+            change_point=int(scores["change_point"][row]) if scores["change_point"][row] >= 0 else None,
+            change_point_stat=float(scores["change_point_stat"][row]),
+            level_shift=float(scores["level_shift"][row]),
+            seasonal_z=float(scores["seasonal_z"][row]) if scores["seasonal_z"] is not None else None,
+            baseline=float(scores["baseline"][row]),
+            incident_value=float(scores["incident_value"][row]),
+        ))
+    return anomalies
+
+
+def _to_epoch(value: str) -> int:
+    # Timestamps without an offset are taken as UTC; others are converted to it
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _fetch_series(
+    namespace: str,
+    start: int,
+    end: int,
+    period: int,
+    statistic: str,
+    dimension_name: str,
+    dimension_value: str,
+) -> Dict[str, np.ndarray]:
+    """Fetch every metric in a namespace (optionally filtered by one dimension) onto a common time grid."""
+    cloudwatch = boto3.client("cloudwatch")
+    list_params: Dict[str, Any] = {"Namespace": namespace}
+    if dimension_name:
+        list_params["Dimensions"] = [{"Name": dimension_name, **({"Value": dimension_value} if dimension_value else {})}]
+    metrics = [
+        metric
+        for page in cloudwatch.get_paginator("list_metrics").paginate(**list_params)
+        for metric in page["Metrics"]
+    ]
+
+    grid = np.arange(start, end, period)
+    series: Dict[str, np.ndarray] = {}
+    # GetMetricData takes up to 500 queries per call
+    for batch_start in range(0, len(metrics), 500):
+        batch = metrics[batch_start:batch_start + 500]
+        queries = [
+            {"Id": f"m{index}", "MetricStat": {"Metric": metric, "Period": period, "Stat": statistic}}
+            for index, metric in enumerate(batch)
+        ]
+        paginator = cloudwatch.get_paginator("get_metric_data")
+        for page in paginator.paginate(MetricDataQueries=queries, StartTime=start, EndTime=end):
+            for result in page["MetricDataResults"]:
+                metric = batch[int(result["Id"][1:])]
+                dimensions = ",".join(f"{d['Name']}={d['Value']}" for d in metric.get("Dimensions", []))
+                name = f"{metric['MetricName']}{{{dimensions}}}" if dimensions else metric["MetricName"]
+                values = series.setdefault(name, np.full(len(grid), np.nan))
+                for timestamp, value in zip(result["Timestamps"], result["Values"]):
+                    slot = int((timestamp.timestamp() - start) // period)
+                    if 0 <= slot < len(grid):
+                        values[slot] = value
+    return series
+
+
+@tool
+def rank_metric_anomalies(
+    namespace: str,
+    start_time: str,
+    end_time: str,
+    incident_start: str = "",
+    dimension_name: str = "",
+    dimension_value: str = "",
+    statistic: str = "Average",
+    period: int = 60,
+    top: int = 10,
+) -> str:
+    """Screen every CloudWatch metric in a namespace and return only the most anomalous ones, with short summaries.
+
+    Use this first when looking for which metrics changed during an incident,
+    instead of reading raw datapoints: it scores hundreds of series at once
+    with robust z-scores against the pre-incident baseline, change-point
+    detection and, with two or more days of history, comparison to the same
+    time on the previous day.
+
+    Args:
+        namespace: CloudWatch namespace, e.g. ContainerInsights or AWS/DynamoDB
+        start_time: Start of the history to fetch, ISO 8601 (include enough baseline before the incident)
+        end_time: End of the window, ISO 8601
+        incident_start: When the incident began, ISO 8601; defaults to the last quarter of the window
+        dimension_name: Optional dimension to filter on, e.g. ClusterName or TableName
+        dimension_value: Optional value for dimension_name
+        statistic: CloudWatch statistic (Average, Maximum, Sum, p99, ...)
+        period: Datapoint period in seconds
+        top: Number of anomalies to return
+    """
+    if period <= 0:
+        return f"Invalid period: {period}. Must be a positive number of seconds"
+    start, end = _to_epoch(start_time), _to_epoch(end_time)
+    series = _fetch_series(namespace, start, end, period, statistic, dimension_name, dimension_value)
+    if not series:
+        return f"No metrics found in {namespace}"
+
+    length = len(next(iter(series.values())))
+    incident_index = (
+        int((_to_epoch(incident_start) - start) // period) if incident_start else length - max(length // 4, 1)
+    )
+    incident_index = min(max(incident_index, 1), length - 1)
+    # Daily seasonality needs at least one datapoint per day and two days of history before the incident
+    day = 86400 // period
+    season_length = day if day >= 1 and incident_index >= 2 * day else None
+
+    anomalies = rank_anomalies(series, incident_index, season_length, top=top)
+    timestamps = [time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + index * period)) for index in range(length)]
+    logger.info(f"Screened {len(series)} metrics in {namespace}: {len(anomalies)} anomalous")
+    if not anomalies:
+        return f"Screened {len(series)} metrics in {namespace}: none deviate significantly from baseline"
+    lines = [f"Screened {len(series)} metrics in {namespace}; {len(anomalies)} most anomalous:"]
+    lines.extend(f"{rank}. {anomaly.summary(timestamps)}" for rank, anomaly in enumerate(anomalies, 1))
+    return "\n".join(lines)
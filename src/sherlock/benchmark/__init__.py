@@ -0,0 +1 @@
+"""Offline benchmarks with stub MCP servers and a scripted model."""
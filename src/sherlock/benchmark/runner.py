@@ -0,0 +1,274 @@
+"""Run investigations against stub MCP servers and a scripted model and measure them."""
+import asyncio
+import contextlib
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from mcp import StdioServerParameters, stdio_client
+from strands.tools.mcp.mcp_client import MCPClient
+
+import sherlock.orchestrator as orchestrator
+from sherlock import mcp_pool
+from sherlock.benchmark.scripted_model import ScriptedModel
+from sherlock.benchmark.stub_server import STUB_CATALOGS
+from sherlock.progress import ProgressEvent, ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_TARGETS = ("orchestrator", "mcp-server")
+
+
+@dataclass
+class StubConfig:
+    """Latency and payload size of the stub MCP servers."""
+    latency_ms: float = 200
+    jitter: float = 0.2
+    payload_kb: float = 4
+
+
+def stub_client(server: str, config: StubConfig) -> MCPClient:
+    """MCP client that launches a stub server as a local subprocess."""
+    return MCPClient(
+        lambda: stdio_client(
+            StdioServerParameters(
+                command=sys.executable,
+                args=[
+                    "-m", "sherlock.benchmark.stub_server", server,
+                    "--latency-ms", str(config.latency_ms),
+                    "--jitter", str(config.jitter),
+                    "--payload-kb", str(config.payload_kb),
+                ],
+                env=dict(os.environ),
+            )
+        )
+    )
+
+
+@contextlib.contextmanager
+def stubs_installed(config: StubConfig, model: ScriptedModel) -> Iterator[None]:
+    """Point the MCP pools at stub servers and every agent at the scripted model.
+
+    Must be entered before the first investigation, since pools keep the
+    factory they were created with; on exit the pools are closed and the
+    real servers, model and environment are restored.
+    """
+    saved_factories = dict(mcp_pool.SERVER_FACTORIES)
+    saved_images = dict(mcp_pool.SERVER_IMAGES)
+    saved_specs = dict(mcp_pool.SERVER_SPECS)
+    saved_model = orchestrator.get_bedrock_model
+    saved_coalesce = os.environ.get("SHERLOCK_COALESCE_ENABLED")
+
+    mcp_pool.close_all_pools()
+    for server in STUB_CATALOGS:
+        mcp_pool.SERVER_FACTORIES[server] = lambda server=server: stub_client(server, config)
+        mcp_pool.SERVER_IMAGES[server] = f"sherlock-stub/{server}"
+        mcp_pool.SERVER_SPECS.pop(server, None)
+    orchestrator.get_bedrock_model = lambda model_id: model
+    # Every run repeats the same query, so concurrent ones would otherwise be coalesced into one
+    os.environ["SHERLOCK_COALESCE_ENABLED"] = "false"
+    try:
+        yield
+    finally:
+        mcp_pool.close_all_pools()
+        for registry, saved in ((mcp_pool.SERVER_FACTORIES, saved_factories), (mcp_pool.SERVER_IMAGES, saved_images), (mcp_pool.SERVER_SPECS, saved_specs)):
+            registry.clear()
+            registry.update(saved)
+        orchestrator.get_bedrock_model = saved_model
+        if saved_coalesce is None:
+            os.environ.pop("SHERLOCK_COALESCE_ENABLED", None)
+        else:
+            os.environ["SHERLOCK_COALESCE_ENABLED"] = saved_coalesce
+
+
+def phase_timings(events: List[ProgressEvent], total: float) -> Dict[str, float]:
+    """Split one investigation's latency into phases using its progress events.
+
+    ``tools`` and ``model`` are summed over agents, so they exceed the
+    ``agents`` wall time when specialists run in parallel.
+    """
+    steps = {event.detail.get("step"): event.elapsed for event in events if event.kind == "phase"}
+    started: Dict[Any, deque] = defaultdict(deque)
+    agent_seconds = tool_seconds = 0.0
+    for event in events:
+        if event.kind in ("agent_start", "tool_start"):
+            started[(event.kind, event.agent, event.detail.get("tool"))].append(event.elapsed)
+        elif event.kind in ("agent_done", "tool_done"):
+            key = (event.kind.replace("_done", "_start"), event.agent, event.detail.get("tool"))
+            if started[key]:
+                duration = event.elapsed - started[key].popleft()
+                if event.kind == "agent_done":
+                    agent_seconds += duration
+                else:
+                    tool_seconds += duration
+
+    mcp_ready = steps.get("mcp_ready", 0.0)
+    agents_start = steps.get("agents_start", mcp_ready)
+    finished = steps.get("finished", total)
+    return {
+        "mcp_startup": mcp_ready,
+        "agent_setup": agents_start - mcp_ready,
+        "agents": finished - agents_start,
+        "tools": tool_seconds,
+        "model": max(agent_seconds - tool_seconds, 0.0),
+        "finalize": max(total - finished, 0.0),
+        "total": total,
+    }
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """Mean, median, p95 and max of a list of latencies."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "max": ordered[-1],
+    }
+
+
+def memory_usage() -> Dict[str, float]:
+    """Peak resident memory of this process and of the largest finished child process, in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "process_max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "stub_server_max_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+async def run_orchestrator(query: str, mode: str, investigations: int, concurrency: int) -> List[Dict[str, Any]]:
+    """Run investigations through investigate() with at most ``concurrency`` at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one() -> Dict[str, Any]:
+        async with semaphore:
+            reporter = ProgressReporter(lambda event: None)
+            try:
+                result = await orchestrator.investigate(query, use_cache=False, mode=mode, progress=reporter)
+                status = result["swarm_status"]
+            except Exception as e:
+                logger.error(f"Benchmark investigation failed: {e}")
+                result, status = {}, "error"
+            total = time.monotonic() - reporter.start_time
+            return {
+                "status": status,
+                "latency": total,
+                "phases": phase_timings(reporter.events, total),
+                "tokens": result.get("usage", {}).get("totalTokens", 0),
+                "tool_calls": result.get("budget", {}).get("used", {}).get("tool_calls", 0),
+            }
+
+    return await asyncio.gather(*(run_one() for _ in range(investigations)))
+
+
+async def run_mcp_server(query: str, mode: str, investigations: int, concurrency: int) -> List[Dict[str, Any]]:
+    """Call the ``sherlock`` MCP tool over an in-memory MCP session with at most ``concurrency`` calls at once."""
+    # Imported here because the MCP server module configures logging and telemetry on import;
+    # there is no collector offline, so the exporters it sets up are disabled
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    log_level = logging.getLogger().level
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from sherlock.mcp_server import mcp
+    logging.getLogger().setLevel(log_level)
+    logging.getLogger("strands").setLevel(log_level)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with create_connected_server_and_client_session(mcp._mcp_server) as client:
+        async def run_one() -> Dict[str, Any]:
+            async with semaphore:
+                start_time = time.monotonic()
+                notifications: List[float] = []
+
+                async def on_progress(progress: float, total: Optional[float], message: Optional[str]) -> None:
+                    notifications.append(time.monotonic() - start_time)
+
+                result = await client.call_tool(
+                    "sherlock", {"query": query, "use_cache": False, "mode": mode}, progress_callback=on_progress
+                )
+                text = result.content[0].text if result.content else ""
+                if text.startswith("⏳"):
+                    status = "rejected"
+                elif text.startswith("❌") or result.isError:
+                    status = "error"
+                else:
+                    status = "completed"
+                return {
+                    "status": status,
+                    "latency": time.monotonic() - start_time,
+                    "first_progress": notifications[0] if notifications else None,
+                    "notifications": len(notifications),
+                }
+
+        return await asyncio.gather(*(run_one() for _ in range(investigations)))
+
+
+async def run_benchmark(
+    target: str = "orchestrator",
+    query: str = "Could you analyze why the carts service is having issues?",
+    mode: str = "swarm",
+    investigations: int = 10,
+    concurrency: int = 2,
+    warmup: int = 1,
+    stub_config: Optional[StubConfig] = None,
+    model: Optional[ScriptedModel] = None,
+    trace_memory: bool = False,
+) -> Dict[str, Any]:
+    """Run the benchmark and return latency, phase, throughput and memory figures.
+
+    Warmup investigations start the stub servers and fill the tool schema
+    cache; they are not included in the results. Set ``warmup=0`` to measure
+    cold starts.
+    """
+    if target not in BENCHMARK_TARGETS:
+        raise ValueError(f"Invalid target: {target}. Must be one of {BENCHMARK_TARGETS}")
+    run = run_orchestrator if target == "orchestrator" else run_mcp_server
+
+    with stubs_installed(stub_config or StubConfig(), model or ScriptedModel()):
+        try:
+            if warmup:
+                await run(query, mode, warmup, warmup)
+
+            if trace_memory:
+                tracemalloc.start()
+            start_time = time.monotonic()
+            runs = await run(query, mode, investigations, concurrency)
+            wall_seconds = time.monotonic() - start_time
+            heap_peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024 if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+
+    statuses: Dict[str, int] = defaultdict(int)
+    for item in runs:
+        statuses[item["status"]] += 1
+    report = {
+        "target": target,
+        "mode": mode,
+        "investigations": investigations,
+        "concurrency": concurrency,
+        "wall_seconds": wall_seconds,
+        "throughput_per_minute": investigations / wall_seconds * 60 if wall_seconds else 0.0,
+        "statuses": dict(statuses),
+        "latency": latency_summary([item["latency"] for item in runs]),
+        "memory": {**memory_usage(), "python_heap_peak_mb": heap_peak_mb},
+    }
+    if target == "orchestrator":
+        report["phases"] = {
+            phase: statistics.fmean(item["phases"][phase] for item in runs) for phase in runs[0]["phases"]
+        } if runs else {}
+        report["tokens_per_investigation"] = statistics.fmean(item["tokens"] for item in runs) if runs else 0
+        report["tool_calls_per_investigation"] = statistics.fmean(item["tool_calls"] for item in runs) if runs else 0
+    else:
+        report["first_progress"] = latency_summary([item["first_progress"] for item in runs if item["first_progress"] is not None])
+        report["notifications_per_investigation"] = statistics.fmean(item["notifications"] for item in runs) if runs else 0
+    return report
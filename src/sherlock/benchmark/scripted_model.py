@@ -0,0 +1,151 @@
+"""Scripted stand-in for BedrockModel that drives agents through a fixed investigation plan."""
+import asyncio
+import json
+import random
+from enum import Enum
+from types import UnionType
+from typing import Any, AsyncIterable, Dict, List, Literal, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from strands.models.model import Model
+
+from sherlock.benchmark.stub_server import STUB_CATALOGS
+from sherlock.progress import HANDOFF_TOOL
+
+# Order in which specialists hand off to each other in swarm mode
+SPECIALIST_ORDER = ("diagnostic_agent", "observability_agent", "persistence_agent")
+
+# A tool an agent has tells the scripted model which specialist it is driving
+_AGENT_SERVERS = {"diagnostic_agent": "eks-mcp", "observability_agent": "cloudwatch", "persistence_agent": "dynamodb"}
+
+
+def _text_size(value: Any) -> int:
+    return len(value) if isinstance(value, str) else len(json.dumps(value, default=str))
+
+
+def _scripted_value(annotation: Any) -> Any:
+    """Placeholder value of a field type: text, zero, empty containers or a nested scripted model."""
+    origin = get_origin(annotation)
+    if origin in (Union, UnionType):
+        args = get_args(annotation)
+        return None if type(None) in args else _scripted_value(args[0])
+    if origin is Literal:
+        return get_args(annotation)[0]
+    if origin in (list, tuple, set, frozenset):
+        return []
+    if origin is dict:
+        return {}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _scripted_fields(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return next(iter(annotation)).value
+    return {str: "scripted", bool: False, int: 0, float: 0.0}.get(annotation, None)
+
+
+def _scripted_fields(output_model: Type[BaseModel]) -> Dict[str, Any]:
+    return {name: _scripted_value(field.annotation) for name, field in output_model.model_fields.items() if field.is_required()}
+
+
+class ScriptedModel(Model):
+    """Model that calls a fixed number of stub tools per agent, then hands off or reports.
+
+    The agent being driven is recognized from its tool catalog, and progress is
+    read from the conversation itself, so one instance can serve every agent
+    of many concurrent investigations. Turn latency and token usage are
+    simulated: input tokens are estimated from the prompt size.
+    """
+
+    def __init__(
+        self,
+        tool_calls: int = 3,
+        turn_latency_ms: float = 800,
+        output_tokens: int = 300,
+        seed: int = 7,
+        **model_config: Any,
+    ):
+        self.config = {"model_id": "scripted", **model_config}
+        self.tool_calls = tool_calls
+        self.turn_latency_ms = turn_latency_ms
+        self.output_tokens = output_tokens
+        self.rng = random.Random(seed)
+        self.turns = 0
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Return an instance of ``output_model`` with a scripted value for every field."""
+        self.turns += 1
+        await asyncio.sleep(self.turn_latency_ms * self.rng.uniform(0.8, 1.2) / 1000)
+        yield {"output": output_model.model_validate(_scripted_fields(output_model))}
+
+    def _agent_name(self, tool_names: List[str]) -> str:
+        for agent_name, server in _AGENT_SERVERS.items():
+            if any(tool_name in STUB_CATALOGS[server] for tool_name in tool_names):
+                return agent_name
+        return "synthesis_agent"
+
+    def _next_action(self, messages: List[Dict[str, Any]], tool_names: List[str]) -> Optional[Dict[str, Any]]:
+        """Tool call to make next, or None when the agent should write its findings."""
+        agent_name = self._agent_name(tool_names)
+        if agent_name == "synthesis_agent":
+            return None
+
+        tool_uses = [
+            block["toolUse"]["name"] for message in messages if message["role"] == "assistant"
+            for block in message["content"] if "toolUse" in block
+        ]
+        if HANDOFF_TOOL in tool_uses:
+            return None
+
+        calls_made = len(tool_uses)
+        catalog = [tool_name for tool_name in STUB_CATALOGS[_AGENT_SERVERS[agent_name]] if tool_name in tool_names]
+        if calls_made < self.tool_calls and catalog:
+            tool_name = catalog[calls_made % len(catalog)]
+            # Distinct arguments on every call, so the tool result cache does not hide tool latency
+            return {"name": tool_name, "input": {"namespace": "carts", "resource_name": f"carts-{self.rng.getrandbits(32):08x}"}}
+
+        if HANDOFF_TOOL in tool_names:
+            task = "".join(block.get("text", "") for block in messages[0]["content"]) if messages else ""
+            for target in SPECIALIST_ORDER[SPECIALIST_ORDER.index(agent_name) + 1:]:
+                if f"Agent name: {target}." in task:
+                    return {
+                        "name": HANDOFF_TOOL,
+                        "input": {"agent_name": target, "message": f"Continue the investigation as {target}", "context": {}},
+                    }
+        return None
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Dict[str, Any]]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[Dict[str, Any]]:
+        self.turns += 1
+        tool_names = [spec["name"] for spec in tool_specs or []]
+        action = self._next_action(messages, tool_names)
+        await asyncio.sleep(self.turn_latency_ms * self.rng.uniform(0.8, 1.2) / 1000)
+
+        yield {"messageStart": {"role": "assistant"}}
+        if action:
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"scripted-{self.turns}", "name": action["name"]}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(action["input"])}}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            agent_name = self._agent_name(tool_names)
+            yield {"contentBlockDelta": {"delta": {"text": f"Scripted findings of {agent_name}: carts pods time out calling DynamoDB."}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+
+        input_tokens = (_text_size(system_prompt or "") + _text_size(tool_specs or []) + _text_size(messages)) // 4
+        yield {
+            "metadata": {
+                "usage": {"inputTokens": input_tokens, "outputTokens": self.output_tokens, "totalTokens": input_tokens + self.output_tokens},
+                "metrics": {"latencyMs": round(self.turn_latency_ms)},
+            }
+        }
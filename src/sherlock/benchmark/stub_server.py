@@ -0,0 +1,142 @@
+"""Stdio or streamable HTTP MCP server that mimics an EKS, CloudWatch or DynamoDB MCP server's tool catalog."""
+import argparse
+import asyncio
+import json
+import random
+from typing import Callable, Dict
+
+from mcp.server import FastMCP
+
+from sherlock.log_templates import LOG_TOOLS
+
+# Tool names and descriptions of the real servers; descriptions are roughly as long as the originals
+# so tool schema tokens are realistic
+STUB_CATALOGS: Dict[str, Dict[str, str]] = {
+    "eks-mcp": {
+        "list_k8s_resources": "List Kubernetes resources of a given kind in an EKS cluster, optionally filtered by namespace, labels and fields. Returns name, namespace, status and creation time for each resource.",
+        "list_api_versions": "List the API versions available in an EKS cluster, to find the right apiVersion for a resource kind.",
+        "get_k8s_events": "Get the Kubernetes events for a resource, including the event type, reason, message, count and first and last timestamps.",
+        "get_pod_logs": "Get the logs of a pod container in an EKS cluster, with optional time window, line limit and previous-container selection.",
+        "get_cloudwatch_logs": "Get CloudWatch logs for an EKS resource (pod, node or cluster control plane) within a time window, optionally filtered.",
+        "get_cloudwatch_metrics": "Get CloudWatch Container Insights metrics for an EKS resource within a time window, at a given period and statistic.",
+        "get_eks_metrics_guidance": "Get guidance on which Container Insights metrics are available for a Kubernetes resource type and what their dimensions are.",
+        "get_eks_insights": "Get EKS cluster insights for configuration and upgrade readiness issues, with their status and recommendations.",
+        "get_eks_vpc_config": "Get the VPC configuration of an EKS cluster: subnets, route tables, security groups and endpoint access.",
+        "get_policies_for_role": "Get the managed and inline IAM policies attached to an IAM role, including their policy documents.",
+        "search_eks_troubleshoot_guide": "Search the EKS troubleshooting guide for a symptom or error message and return matching guide sections.",
+    },
+    "cloudwatch": {
+        "describe_log_groups": "List CloudWatch log groups matching a prefix, with retention, stored bytes and creation time.",
+        "analyze_log_group": "Analyze a CloudWatch log group for anomalies, common patterns and error messages over a time window.",
+        "execute_log_insights_query": "Start a CloudWatch Logs Insights query on one or more log groups over a time window and return its query ID.",
+        "get_logs_insight_query_results": "Get the status and results of a CloudWatch Logs Insights query started earlier.",
+        "filter_log_events": "Return log events from a CloudWatch log group that match a filter pattern within a time window.",
+        "get_metric_data": "Get CloudWatch metric datapoints for a namespace, metric name and dimensions over a time window at a given period and statistic.",
+        "get_metric_metadata": "Get the description, unit and recommended statistics for a CloudWatch metric.",
+        "get_recommended_metric_alarms": "Get recommended alarm configurations for a CloudWatch metric, based on its historical behaviour.",
+        "get_active_alarms": "List CloudWatch alarms currently in the ALARM state, with their metric, threshold and state reason.",
+        "get_alarm_history": "Get the state change history of a CloudWatch alarm within a time window.",
+        "describe_alarms": "Describe CloudWatch alarms matching a name prefix or state, with their configuration and current state.",
+    },
+    "dynamodb": {
+        "describe_table": "Describe a DynamoDB table: key schema, attribute definitions, billing mode, provisioned throughput, indexes, item count and size.",
+        "list_tables": "List the DynamoDB tables in the account and region.",
+        "describe_limits": "Describe the account and table level read and write capacity quotas for DynamoDB in the region.",
+        "describe_time_to_live": "Describe the time to live settings of a DynamoDB table.",
+        "describe_continuous_backups": "Describe the continuous backup and point-in-time recovery settings of a DynamoDB table.",
+        "get_item": "Get a single item from a DynamoDB table by its primary key.",
+        "query": "Query a DynamoDB table or index by partition key with an optional key condition and filter expression.",
+        "scan": "Scan a DynamoDB table or index with an optional filter expression and limit.",
+    },
+}
+
+_LOG_LINE_TEMPLATES = [
+    "{ts} ERROR [carts] request {id} failed: timeout after {ms}ms calling dynamodb",
+    "{ts} WARN [carts] retrying request {id} (attempt {n})",
+    "{ts} INFO [carts] GET /carts/{id} 200 {ms}ms",
+    "{ts} INFO [orders] POST /orders 201 {ms}ms",
+    "{ts} ERROR [checkout] upstream carts returned 503 for session {id}",
+]
+
+
+def log_payload(size_bytes: int, rng: random.Random) -> str:
+    """Log lines drawn from a few templates with varying ids and timings."""
+    lines, total = [], 0
+    second = 0
+    while total < size_bytes:
+        second += rng.randint(0, 2)
+        line = rng.choice(_LOG_LINE_TEMPLATES).format(
+            ts=f"2025-01-01T10:{second // 60 % 60:02d}:{second % 60:02d}Z",
+            id=f"{rng.getrandbits(48):012x}",
+            ms=rng.randint(5, 5000),
+            n=rng.randint(1, 5),
+        )
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def json_payload(tool_name: str, size_bytes: int, rng: random.Random) -> str:
+    """JSON list of resource-like records."""
+    items, total = [], 2
+    while total < size_bytes:
+        item = {
+            "name": f"{tool_name.split('_')[-1]}-{len(items)}-{rng.getrandbits(20):05x}",
+            "namespace": rng.choice(["carts", "orders", "checkout", "catalog", "ui"]),
+            "status": rng.choice(["Running", "Running", "Running", "Pending", "CrashLoopBackOff"]),
+            "value": round(rng.uniform(0, 100), 2),
+            "timestamp": f"2025-01-01T10:{rng.randint(0, 59):02d}:00Z",
+        }
+        items.append(item)
+        total += len(json.dumps(item)) + 2
+    return json.dumps(items)
+
+
+def make_stub_tool(tool_name: str, latency_ms: float, jitter: float, payload_bytes: int) -> Callable:
+    """Tool function that waits for the configured latency and returns a payload of the configured size."""
+    rng = random.Random(tool_name)
+
+    async def stub_tool(
+        resource_name: str = "",
+        namespace: str = "",
+        start_time: str = "",
+        end_time: str = "",
+        filter_pattern: str = "",
+    ) -> str:
+        await asyncio.sleep(latency_ms * rng.uniform(1 - jitter, 1 + jitter) / 1000)
+        if tool_name in LOG_TOOLS:
+            return log_payload(payload_bytes, rng)
+        return json_payload(tool_name, payload_bytes, rng)
+
+    return stub_tool
+
+
+def create_stub_server(server: str, latency_ms: float = 200, jitter: float = 0.2, payload_kb: float = 4, port: int = 8000) -> FastMCP:
+    """FastMCP server exposing one server's stub tool catalog."""
+    mcp = FastMCP(f"sherlock-stub-{server}", log_level="ERROR", host="127.0.0.1", port=port)
+    for tool_name, description in STUB_CATALOGS[server].items():
+        mcp.add_tool(
+            make_stub_tool(tool_name, latency_ms, jitter, int(payload_kb * 1024)),
+            name=tool_name,
+            description=description,
+        )
+    return mcp
+
+
+def main():
+    """Run a stub MCP server over stdio or streamable HTTP."""
+    parser = argparse.ArgumentParser(description="Stub MCP server for offline Sherlock benchmarks")
+    parser.add_argument("server", choices=sorted(STUB_CATALOGS), help="Server whose tool catalog to mimic")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Average tool call latency (default: 200)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction of the average (default: 0.2)")
+    parser.add_argument("--payload-kb", type=float, default=4, help="Size of each tool result in KB (default: 4)")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio", help="How clients connect (default: stdio)")
+    parser.add_argument("--port", type=int, default=8000, help="Port for the streamable-http transport (default: 8000)")
+    # Ignore the real server's flags (e.g. --allow-sensitive-data-access) so the stub can stand in for it
+    args, _ = parser.parse_known_args()
+
+    create_stub_server(args.server, args.latency_ms, args.jitter, args.payload_kb, args.port).run(transport=args.transport)
+
+
+if __name__ == "__main__":
+    main()
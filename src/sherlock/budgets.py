@@ -0,0 +1,182 @@
+"""Execution budgets for investigations and their agents."""
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from strands.hooks import BeforeInvocationEvent, BeforeToolCallEvent, HookProvider, HookRegistry
+
+from sherlock.progress import HANDOFF_TOOL
+
+logger = logging.getLogger(__name__)
+
+# Extra time the hard timeouts allow after the deadline, so agents told to stop can write up their findings
+DEADLINE_GRACE_SECONDS = 60
+
+
+@dataclass
+class ExecutionBudget:
+    """Limits for one investigation (``max_*``) and for each agent within it (``agent_max_*``)."""
+    max_handoffs: int = 10
+    max_tool_calls: int = 60
+    max_input_tokens: int = 1_000_000
+    max_output_tokens: int = 60_000
+    deadline_seconds: float = 600
+    agent_max_tool_calls: int = 25
+    agent_max_input_tokens: int = 400_000
+    agent_max_output_tokens: int = 25_000
+
+    @classmethod
+    def from_env(cls) -> "ExecutionBudget":
+        """Budget from ``SHERLOCK_BUDGET_*`` environment variables, falling back to the defaults."""
+        defaults = cls()
+        return cls(**{
+            name: type(value)(os.getenv(f"SHERLOCK_BUDGET_{name.upper()}", value))
+            for name, value in asdict(defaults).items()
+        })
+
+
+class BudgetTracker:
+    """Track what one investigation has spent and decide when an agent must stop.
+
+    Agents are stopped gracefully: the first tool call after a budget runs out
+    is cancelled with an instruction to report findings now (a handoff past
+    the handoff budget is refused so the current agent finishes the analysis),
+    and any further call is cancelled and ends the agent's event loop.
+    """
+
+    def __init__(self, budget: ExecutionBudget):
+        self.budget = budget
+        self.start_time = time.monotonic()
+        self.tool_calls: Dict[str, int] = {}
+        self.handoffs = 0
+        self.exhausted: Dict[str, str] = {}
+        self._agents: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def deadline(self) -> float:
+        return self.budget.deadline_seconds
+
+    @property
+    def hard_timeout(self) -> float:
+        return self.budget.deadline_seconds + DEADLINE_GRACE_SECONDS
+
+    def hooks(self, agent_name: str) -> List[HookProvider]:
+        """Hooks that enforce the budget on one agent."""
+        return [BudgetHook(self, agent_name)]
+
+    def tokens(self, agent_name: Optional[str] = None) -> Dict[str, int]:
+        """Input/output tokens used by one agent, or by the whole investigation."""
+        agents = [self._agents[agent_name]] if agent_name in self._agents else (
+            [] if agent_name else list(self._agents.values())
+        )
+        usage = [agent.event_loop_metrics.accumulated_usage for agent in agents]
+        return {
+            "inputTokens": sum(item.get("inputTokens", 0) for item in usage),
+            "outputTokens": sum(item.get("outputTokens", 0) for item in usage),
+        }
+
+    def check(self, agent: Any, agent_name: str, tool_name: str) -> Optional[str]:
+        """Count a tool call and return why it must not run, or None if it is within budget."""
+        with self._lock:
+            self._agents[agent_name] = agent
+            budget = self.budget
+            if tool_name == HANDOFF_TOOL and self.handoffs >= budget.max_handoffs:
+                return self._exhaust("handoffs", f"handoff budget of {budget.max_handoffs} used")
+
+            elapsed = time.monotonic() - self.start_time
+            total_calls = sum(self.tool_calls.values())
+            agent_calls = self.tool_calls.get(agent_name, 0)
+            total_tokens = self.tokens()
+            agent_tokens = self.tokens(agent_name)
+            reason = None
+            if elapsed >= budget.deadline_seconds:
+                reason = self._exhaust("deadline", f"deadline of {budget.deadline_seconds:.0f}s reached")
+            elif total_calls >= budget.max_tool_calls:
+                reason = self._exhaust("tool_calls", f"investigation tool call budget of {budget.max_tool_calls} used")
+            elif total_tokens["inputTokens"] >= budget.max_input_tokens:
+                reason = self._exhaust("input_tokens", f"investigation input token budget of {budget.max_input_tokens} used")
+            elif total_tokens["outputTokens"] >= budget.max_output_tokens:
+                reason = self._exhaust("output_tokens", f"investigation output token budget of {budget.max_output_tokens} used")
+            elif agent_calls >= budget.agent_max_tool_calls:
+                reason = self._exhaust(f"{agent_name}.tool_calls", f"{agent_name} tool call budget of {budget.agent_max_tool_calls} used")
+            elif agent_tokens["inputTokens"] >= budget.agent_max_input_tokens:
+                reason = self._exhaust(f"{agent_name}.input_tokens", f"{agent_name} input token budget of {budget.agent_max_input_tokens} used")
+            elif agent_tokens["outputTokens"] >= budget.agent_max_output_tokens:
+                reason = self._exhaust(f"{agent_name}.output_tokens", f"{agent_name} output token budget of {budget.agent_max_output_tokens} used")
+            if reason:
+                return reason
+
+            if tool_name == HANDOFF_TOOL:
+                self.handoffs += 1
+            else:
+                self.tool_calls[agent_name] = agent_calls + 1
+            return None
+
+    def _exhaust(self, budget_name: str, reason: str) -> str:
+        if budget_name not in self.exhausted:
+            logger.warning(f"Execution budget exhausted: {reason}")
+            self.exhausted[budget_name] = reason
+        return reason
+
+    def report(self) -> Dict[str, Any]:
+        """Limits, what was used and which budgets ran out, for the result and the span."""
+        return {
+            "limits": asdict(self.budget),
+            "used": {
+                "elapsed_seconds": round(time.monotonic() - self.start_time, 2),
+                "handoffs": self.handoffs,
+                "tool_calls": sum(self.tool_calls.values()),
+                **self.tokens(),
+                "agents": {
+                    agent_name: {"tool_calls": self.tool_calls.get(agent_name, 0), **self.tokens(agent_name)}
+                    for agent_name in self._agents
+                },
+            },
+            "exhausted": dict(self.exhausted),
+        }
+
+
+class BudgetHook(HookProvider):
+    """Cancel an agent's tool calls once its investigation or agent budget is spent."""
+
+    def __init__(self, tracker: BudgetTracker, agent_name: str):
+        self.tracker = tracker
+        self.agent_name = agent_name
+        self.warned_at: Optional[int] = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self.reset)
+        registry.add_callback(BeforeToolCallEvent, self.enforce)
+
+    def reset(self, event: BeforeInvocationEvent) -> None:
+        self.warned_at = None
+
+    def enforce(self, event: BeforeToolCallEvent) -> None:
+        tool_name = event.tool_use["name"]
+        reason = self.tracker.check(event.agent, self.agent_name, tool_name)
+        if reason is None:
+            return
+
+        if self.warned_at is None or self.warned_at == len(event.agent.messages):
+            # Let the agent write up what it has found in one more model turn; every tool call
+            # of the turn that hit the budget gets the same instruction
+            self.warned_at = len(event.agent.messages)
+            if tool_name == HANDOFF_TOOL:
+                event.cancel_tool = f"Handoff refused: {reason}. Complete the analysis yourself with the evidence you have."
+            else:
+                event.cancel_tool = (
+                    f"Execution budget exhausted ({reason}). Do not call any more tools; "
+                    f"report your findings so far, stating what could not be checked."
+                )
+        else:
+            event.cancel_tool = f"Execution budget exhausted ({reason})."
+            event.invocation_state["request_state"]["stop_event_loop"] = True
+
+
+def get_execution_budget() -> ExecutionBudget:
+    """Get the execution budget for a new investigation."""
+    return ExecutionBudget.from_env()
@@ -0,0 +1,185 @@
+"""Investigation result cache for Sherlock."""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivially different phrasings share a cache entry."""
+    normalized = re.sub(r"\s+", " ", query.strip().lower())
+    return normalized.rstrip("?!. ")
+
+
+class InvestigationCache:
+    """TTL + LRU cache of investigation results with optional SQLite persistence.
+
+    Entries are keyed on the normalized query, model, diagnostic agent,
+    execution mode and a time bucket, so the same question asked during one incident window is
+    answered once while a later incident triggers a fresh investigation.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 128,
+        bucket_seconds: float = 300.0,
+        path: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bucket_seconds = bucket_seconds
+        self.path = path
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = self._open_db(path)
+
+    def make_key(
+        self,
+        query: str,
+        model_id: str,
+        diagnostic_agent: str,
+        mode: str = "swarm",
+        now: Optional[float] = None,
+    ) -> str:
+        """Build the cache key for an investigation request."""
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds) if self.bucket_seconds > 0 else 0
+        raw = json.dumps([normalize_query(query), model_id, diagnostic_agent, mode, bucket])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._entries[key] = entry
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            created_at, value = entry
+            if now - created_at > self.ttl:
+                self._delete_locked(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            if self._db is not None:
+                self._db.execute("UPDATE investigations SET last_access = ? WHERE key = ?", (now, key))
+                self._db.commit()
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result, evicting the least recently used entries past ``max_entries``."""
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO investigations (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+
+            while len(self._entries) > self.max_entries:
+                oldest, _ = self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+                if self._db is not None:
+                    self._db.execute("DELETE FROM investigations WHERE key = ?", (oldest,))
+
+            if self._db is not None:
+                self._prune_db_locked()
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop every cached entry, including persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM investigations")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current hit rate."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def _open_db(self, path: str) -> sqlite3.Connection:
+        db_path = Path(path).expanduser()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(db_path), check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS investigations ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        db.commit()
+        logger.info(f"Investigation cache persisted at {db_path}")
+        return db
+
+    def _load(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        row = self._db.execute("SELECT created_at, value FROM investigations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _delete_locked(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM investigations WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _prune_db_locked(self) -> None:
+        """Keep the persisted table within TTL and ``max_entries`` as well."""
+        self._db.execute("DELETE FROM investigations WHERE created_at < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM investigations WHERE key NOT IN "
+            "(SELECT key FROM investigations ORDER BY last_access DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+
+_cache: Optional[InvestigationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_investigation_cache() -> Optional[InvestigationCache]:
+    """Get the process-wide investigation cache, or None when caching is disabled."""
+    global _cache
+
+    if os.getenv("SHERLOCK_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = InvestigationCache(
+                ttl=float(os.getenv("SHERLOCK_CACHE_TTL", "300")),
+                max_entries=int(os.getenv("SHERLOCK_CACHE_MAX_ENTRIES", "128")),
+                bucket_seconds=float(os.getenv("SHERLOCK_CACHE_BUCKET_SECONDS", "300")),
+                path=os.getenv("SHERLOCK_CACHE_PATH") or None,
+            )
+    return _cache
@@ -0,0 +1,346 @@
+"""Record and replay the MCP tool calls and model turns of an investigation."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
+
+from strands.models.model import Model
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolSpec, ToolUse
+
+from sherlock.sessions import ServerSession
+from sherlock.tool_cache import make_cache_key
+from sherlock.tool_wrappers import DelegatingTool
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("record", "replay")
+
+# Cassettes being recorded by this process; recording wipes the file, so each may only be opened once
+_recording: set = set()
+_recording_lock = threading.Lock()
+
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed investigation asks for a model turn the cassette does not have."""
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+class Cassette:
+    """Compressed, indexed recording of one investigation's tool calls and model turns.
+
+    Entries live in a SQLite file keyed by kind (``tool`` or ``model``), a
+    digest of the request and an occurrence number, with zlib-compressed JSON
+    payloads. Model turns are keyed by the agent's system prompt and turn
+    number and tool calls by server, tool and arguments, so a replay follows
+    the recorded conversation even though timestamps and tool use IDs differ.
+
+    In replay mode every wait is the recorded duration divided by ``speed``;
+    ``speed=0`` replays without waiting.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", speed: float = 1.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Invalid cassette mode: {mode}. Must be one of {CASSETTE_MODES}")
+        self.path = Path(path).expanduser()
+        self.mode = mode
+        self.speed = speed
+        self.start_time = time.monotonic()
+        self._sequence: Dict[Tuple[str, str], int] = {}
+        self._stats = {"tool_calls": 0, "model_turns": 0, "tool_misses": 0, "recorded_seconds": 0.0}
+        self._lock = threading.Lock()
+
+        if self.replaying and not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        if self.recording:
+            with _recording_lock:
+                if self.path.resolve() in _recording:
+                    raise RuntimeError(f"Cassette {self.path} is already being recorded by another investigation")
+                _recording.add(self.path.resolve())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, seq INTEGER NOT NULL, "
+            "offset REAL NOT NULL, duration REAL NOT NULL, payload BLOB NOT NULL, "
+            "PRIMARY KEY (kind, key, seq))"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if self.recording:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM meta")
+        self._db.commit()
+        logger.info(f"Cassette {self.mode} mode: {self.path}")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def set_meta(self, **values: Any) -> None:
+        """Store investigation metadata (query, mode, model, ...) alongside the recording."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                [(name, json.dumps(value, default=str)) for name, value in values.items()],
+            )
+            self._db.commit()
+
+    def meta(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: json.loads(value) for name, value in self._db.execute("SELECT name, value FROM meta")}
+
+    def next_key(self, kind: str, request: str) -> Tuple[str, int]:
+        """Digest of a request plus how many identical requests came before it."""
+        key = _digest(request)
+        with self._lock:
+            seq = self._sequence.get((kind, key), 0)
+            self._sequence[(kind, key)] = seq + 1
+        return key, seq
+
+    def save(self, kind: str, key: str, seq: int, started: float, duration: float, payload: Any) -> None:
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":"), default=str).encode())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, seq, offset, duration, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, seq, started - self.start_time, duration, blob),
+            )
+            self._db.commit()
+            self._stats["tool_calls" if kind == "tool" else "model_turns"] += 1
+            self._stats["recorded_seconds"] += duration
+
+    def load(self, kind: str, key: str, seq: int) -> Optional[Tuple[float, Any]]:
+        """Recorded duration and payload of an entry, or None if it was not recorded."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT duration, payload FROM entries WHERE kind = ? AND key = ? AND seq = ?", (kind, key, seq)
+            ).fetchone()
+            if row is None:
+                if kind == "tool":
+                    self._stats["tool_misses"] += 1
+                return None
+            self._stats["tool_calls" if kind == "tool" else "model_turns"] += 1
+            self._stats["recorded_seconds"] += row[0]
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    async def wait(self, seconds: float) -> None:
+        """Sleep for a recorded duration, scaled by the replay speed."""
+        if self.speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+
+    def wrap_tools(self, server: str, tools: List[AgentTool]) -> List[AgentTool]:
+        """Record calls to these tools, or serve them from the cassette when replaying."""
+        if self.replaying:
+            return [tool if isinstance(tool, ReplayedTool) else ReplayedTool(tool, server, self) for tool in tools]
+        self.set_meta(**{f"tools:{server}": [tool.tool_spec for tool in tools]})
+        return [RecordedTool(tool, server, self) for tool in tools]
+
+    def sessions(self, servers: List[str]) -> Dict[str, ServerSession]:
+        """Stand-ins for MCP sessions, with the tool specs recorded for each server."""
+        meta = self.meta()
+        sessions = {}
+        for server in servers:
+            specs = meta.get(f"tools:{server}")
+            if specs is None:
+                sessions[server] = ServerSession(server, status="failed", error="not recorded in cassette")
+            else:
+                tools = [ReplayedTool(RecordedToolSpec(spec), server, self) for spec in specs]
+                sessions[server] = ServerSession(server, tools=tools, status="ready")
+        return sessions
+
+    def model(self, model: Optional[Model] = None) -> "CassetteModel":
+        """Model that records ``model``'s turns, or replays recorded turns without a model."""
+        if self.recording and model is None:
+            raise ValueError("A model is required to record a cassette")
+        return CassetteModel(self, model)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "recorded_seconds": round(self._stats["recorded_seconds"], 3),
+                "mode": self.mode,
+                "path": str(self.path),
+                "speed": self.speed,
+                "bytes": self.path.stat().st_size if self.path.exists() else 0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.commit()
+            self._db.close()
+            self._db = None
+        if self.recording:
+            with _recording_lock:
+                _recording.discard(self.path.resolve())
+
+
+class RecordedToolSpec(AgentTool):
+    """A tool known only from its recorded spec; it cannot be called, only replayed."""
+
+    def __init__(self, spec: ToolSpec):
+        super().__init__()
+        self.spec = spec
+
+    @property
+    def tool_name(self) -> str:
+        return self.spec["name"]
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self.spec
+
+    @property
+    def tool_type(self) -> str:
+        return "python"
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        raise RuntimeError(f"{self.tool_name} was only recorded and cannot run")
+        yield
+
+
+class RecordedTool(DelegatingTool):
+    """Run a tool and save its result and duration to the cassette."""
+
+    def __init__(self, tool: AgentTool, server: str, cassette: Cassette):
+        super().__init__(tool, server)
+        self.cassette = cassette
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        key, seq = self.cassette.next_key("tool", make_cache_key(self.server, self.tool_name, tool_use.get("input") or {}))
+        started = time.monotonic()
+        result = await self.call(tool_use, invocation_state, **kwargs)
+        self.cassette.save("tool", key, seq, started, time.monotonic() - started, result)
+        yield ToolResultEvent(result)
+
+
+class ReplayedTool(DelegatingTool):
+    """Serve a tool's result from the cassette after its recorded duration."""
+
+    def __init__(self, tool: AgentTool, server: str, cassette: Cassette):
+        super().__init__(tool, server)
+        self.cassette = cassette
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        key, seq = self.cassette.next_key("tool", make_cache_key(self.server, self.tool_name, tool_use.get("input") or {}))
+        entry = self.cassette.load("tool", key, seq)
+        if entry is None:
+            logger.warning(f"Cassette has no result for {self.server}:{self.tool_name} call {seq + 1} with {tool_use.get('input')}")
+            yield ToolResultEvent({
+                "toolUseId": tool_use["toolUseId"],
+                "status": "error",
+                "content": [{"text": f"{self.tool_name} was not called with these arguments in the recorded investigation"}],
+            })
+            return
+        duration, result = entry
+        await self.cassette.wait(duration)
+        yield ToolResultEvent({**result, "toolUseId": tool_use["toolUseId"]})
+
+
+class CassetteModel(Model):
+    """Record every streamed model turn with event timings, or replay them in order per agent."""
+
+    def __init__(self, cassette: Cassette, model: Optional[Model] = None):
+        self.cassette = cassette
+        self.model = model
+        self.config = dict(model.get_config()) if model else cassette.meta().get("model_config", {"model_id": "cassette"})
+        if cassette.recording:
+            cassette.set_meta(model_config=self.config)
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+        if self.model:
+            self.model.update_config(**model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        # Recorded as the validated output, numbered per output type and system prompt
+        key, seq = self.cassette.next_key("structured_output", json.dumps([output_model.__name__, system_prompt or ""]))
+
+        if self.cassette.replaying:
+            entry = self.cassette.load("structured_output", key, seq)
+            if entry is None:
+                raise CassetteMissError(f"Cassette has no structured output {seq + 1} of {output_model.__name__} for this agent")
+            await self.cassette.wait(entry[0])
+            yield {"output": output_model.model_validate(entry[1])}
+            return
+
+        started = time.monotonic()
+        output = None
+        async for event in self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs):
+            if "output" in event:
+                output = event["output"]
+            yield event
+        if output is not None:
+            self.cassette.save("structured_output", key, seq, started, time.monotonic() - started, output.model_dump(mode="json"))
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[Dict[str, Any]]:
+        # Agents share one model, so turns are numbered per system prompt, i.e. per agent
+        key, seq = self.cassette.next_key("model", system_prompt or "")
+
+        if self.cassette.replaying:
+            entry = self.cassette.load("model", key, seq)
+            if entry is None:
+                raise CassetteMissError(f"Cassette has no model turn {seq + 1} for this agent")
+            replay_start = time.monotonic()
+            for offset, event in entry[1]:
+                await self.cassette.wait(offset - (time.monotonic() - replay_start) * self.cassette.speed)
+                yield event
+            return
+
+        started = time.monotonic()
+        events = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append([time.monotonic() - started, event])
+            yield event
+        self.cassette.save("model", key, seq, started, time.monotonic() - started, events)
+
+
+def recording_path(path: str) -> str:
+    """Path of a new recording next to ``path``, unique per investigation, e.g. ``sherlock-cassette-20250101T120000-1a2b3c4d.db``."""
+    base = Path(path).expanduser()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return str(base.with_name(f"{base.stem}-{stamp}-{uuid.uuid4().hex[:8]}{base.suffix}"))
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Open the cassette for a new investigation, or None unless SHERLOCK_CASSETTE_MODE is record or replay.
+
+    Every recorded investigation gets its own file next to SHERLOCK_CASSETTE_PATH,
+    so recordings made by a long-running server or worker do not overwrite each
+    other; replay reads SHERLOCK_CASSETTE_PATH itself.
+    """
+    mode = os.getenv("SHERLOCK_CASSETTE_MODE", "off").lower()
+    if mode not in CASSETTE_MODES:
+        return None
+    path = os.getenv("SHERLOCK_CASSETTE_PATH", "sherlock-cassette.db")
+    return Cassette(
+        path=recording_path(path) if mode == "record" else path,
+        mode=mode,
+        speed=float(os.getenv("SHERLOCK_CASSETTE_SPEED", "1.0")),
+    )
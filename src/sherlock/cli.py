@@ -0,0 +1,204 @@
+"""Command line interface for running Sherlock investigations in batches."""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from sherlock.config import Config
+from sherlock.job_queue import JobQueue, get_job_timeout, open_job_queue, wait_for_job
+from sherlock.mcp_pool import close_all_pools, prewarm
+from sherlock.orchestrator import INVESTIGATION_MODES, investigate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+
+
+def read_jobs(stream: TextIO, defaults: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Parse investigation jobs from JSONL.
+
+    Each line is an object with a ``query`` and optionally ``id``, ``mode``,
+    ``model_id``, ``diagnostic_agent`` and ``use_cache``, or just a JSON
+    string with the query. Blank lines and lines starting with ``#`` are
+    skipped; a line that cannot be parsed becomes a job carrying its error.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"query": record}
+            if not isinstance(record, dict) or not record.get("query"):
+                raise ValueError("expected an object with a 'query' or a query string")
+            yield {**defaults, "id": line_number, **record}
+        except ValueError as e:
+            yield {"id": line_number, "error": f"Invalid input on line {line_number}: {e}"}
+
+
+async def run_job(job: Dict[str, Any], job_queue: Optional[JobQueue] = None) -> Dict[str, Any]:
+    """Run one investigation, here or on a worker through ``job_queue``, and return its JSONL result record."""
+    record = {"id": job["id"], "query": job.get("query"), "started_at": datetime.now(timezone.utc).isoformat()}
+    if "error" in job:
+        return {**record, "status": "error", "error": job["error"]}
+
+    start_time = time.monotonic()
+    try:
+        if job_queue is not None:
+            request = {key: job[key] for key in ("query", "diagnostic_agent", "model_id", "use_cache", "mode")}
+            job_id = await asyncio.to_thread(job_queue.enqueue, request)
+            result = await wait_for_job(job_queue, job_id, timeout=get_job_timeout())
+        else:
+            result = await investigate(
+                job["query"],
+                job["diagnostic_agent"],
+                job["model_id"],
+                use_cache=job["use_cache"],
+                mode=job["mode"],
+            )
+        return {
+            **record,
+            "status": "success",
+            "mode": result["mode"],
+            "swarm_status": result["swarm_status"],
+            "cached": result["cached"],
+            "latency_seconds": round(time.monotonic() - start_time, 3),
+            "execution_time": result["execution_time"],
+            "usage": result["usage"],
+            "agents_used": result["agents_used"],
+            "budget_exhausted": result.get("budget", {}).get("exhausted", {}),
+            "results": result["results"],
+        }
+    except Exception as e:
+        logger.exception(f"Investigation {job['id']} failed")
+        return {
+            **record,
+            "status": "error",
+            "latency_seconds": round(time.monotonic() - start_time, 3),
+            "error": f"{type(e).__name__}: {e}",
+        }
+
+
+async def run_batch(jobs: Iterator[Dict[str, Any]], output: TextIO, workers: int, job_queue: Optional[JobQueue] = None) -> Dict[str, Any]:
+    """Run jobs with ``workers`` investigations in flight, writing each result as soon as it finishes."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    completed = []
+    start_time = time.monotonic()
+
+    async def worker() -> None:
+        while True:
+            job = await queue.get()
+            if job is None:
+                return
+            record = await run_job(job, job_queue)
+            completed.append((record["status"], record.get("latency_seconds"), record.get("usage", {}).get("totalTokens", 0)))
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(workers)]
+    # Feed jobs lazily so a large backlog is never held in memory; reading a
+    # line can block on stdin, so it happens off the event loop
+    while (job := await asyncio.to_thread(next, jobs, None)) is not None:
+        await queue.put(job)
+    for _ in tasks:
+        await queue.put(None)
+    await asyncio.gather(*tasks)
+
+    wall_seconds = time.monotonic() - start_time
+    latencies = [latency for status, latency, _ in completed if status == "success"]
+    return {
+        "investigations": len(completed),
+        "succeeded": len(latencies),
+        "failed": len(completed) - len(latencies),
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(len(completed) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "latency_p50": round(statistics.median(latencies), 3) if latencies else None,
+        "latency_p95": round(statistics.quantiles(latencies, n=20)[-1], 3) if len(latencies) > 1 else None,
+        "total_tokens": sum(tokens for _, _, tokens in completed),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Open the input and output, warm the MCP pools and run the batch."""
+    defaults = {
+        "mode": args.mode,
+        "model_id": args.model_id,
+        "diagnostic_agent": args.diagnostic_agent,
+        "use_cache": not args.no_cache,
+    }
+    with contextlib.ExitStack() as stack:
+        if args.query:
+            source = iter([json.dumps({"query": query}) for query in args.query])
+        elif args.input == "-":
+            source = sys.stdin
+        else:
+            source = stack.enter_context(open(args.input))
+        output = stack.enter_context(open(args.output, "a" if args.append else "w")) if args.output else sys.stdout
+        # Agents stream their text to stdout; keep it out of the JSONL results
+        stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+
+        # Investigations either run in this process or are handed to sherlock-worker processes
+        job_queue = open_job_queue(args.queue) if args.queue else None
+        try:
+            if args.prewarm and job_queue is None:
+                # Start MCP sessions before the first investigation so workers do not all cold start at once
+                await asyncio.to_thread(prewarm)
+            return await run_batch(read_jobs(source, defaults), output, args.workers, job_queue)
+        finally:
+            await asyncio.to_thread(close_all_pools)
+            if job_queue is not None:
+                job_queue.close()
+
+
+def main():
+    """Entry point of ``sherlock-cli``."""
+    parser = argparse.ArgumentParser(
+        prog="sherlock-cli",
+        description="Run Sherlock investigations from JSONL and stream the results as JSONL",
+        epilog='Input lines look like {"id": "inc-42", "query": "Why is carts slow?", "mode": "parallel"}',
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file of investigations, or - for stdin (default: -)")
+    parser.add_argument("--query", "-q", action="append", help="Investigate this query instead of reading input (repeatable)")
+    parser.add_argument("--output", "-o", help="Write results to this JSONL file instead of stdout")
+    parser.add_argument("--append", action="store_true", help="Append to the output file instead of overwriting it")
+    parser.add_argument("--workers", "-w", type=int, default=2, help="Investigations run at the same time (default: 2)")
+    parser.add_argument("--mode", choices=INVESTIGATION_MODES, default="swarm", help="Default execution mode (default: swarm)")
+    parser.add_argument("--model-id", default=DEFAULT_MODEL_ID, help=f"Default Bedrock model ID (default: {DEFAULT_MODEL_ID})")
+    parser.add_argument("--diagnostic-agent", choices=["eks-mcp"], default="eks-mcp", help="Diagnostic agent (default: eks-mcp)")
+    parser.add_argument("--no-cache", action="store_true", help="Always run investigations instead of serving repeats from the cache")
+    parser.add_argument("--no-prewarm", dest="prewarm", action="store_false", help="Do not start MCP sessions before the first investigation")
+    parser.add_argument("--queue", default=os.getenv("SHERLOCK_JOB_QUEUE"), help="Hand investigations to sherlock-worker processes through this job queue, e.g. sqlite:///var/lib/sherlock/jobs.db (default: SHERLOCK_JOB_QUEUE)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for stderr (default: WARNING)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # One warm MCP session per worker and server, unless configured otherwise
+    os.environ.setdefault("SHERLOCK_MCP_POOL_MAX_SIZE", str(args.workers))
+    Config.setup_logging(log_level=args.log_level)
+    enable_langfuse = bool(os.getenv("LANGFUSE_PUBLIC_KEY") and os.getenv("LANGFUSE_SECRET_KEY"))
+    Config.setup_telemetry(enable_langfuse=enable_langfuse)
+    Config.setup_environment()
+
+    summary = asyncio.run(run(args))
+    print(
+        f"🔎 {summary['investigations']} investigations ({summary['succeeded']} succeeded, {summary['failed']} failed) "
+        f"in {summary['wall_seconds']:.1f}s with {summary['workers']} workers: "
+        f"{summary['throughput_per_minute']:.1f}/min, p50 {summary['latency_p50']}s, p95 {summary['latency_p95']}s, "
+        f"{summary['total_tokens']} tokens",
+        file=sys.stderr,
+    )
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Single-flight coalescing of identical investigations that are requested at the same time."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from sherlock.cache import normalize_query
+from sherlock.progress import ProgressEvent, ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter("sherlock.coalescing")
+requests_counter = meter.create_counter(
+    "sherlock.investigations.requests",
+    description="Investigation requests, by whether they joined an identical investigation already in flight",
+)
+
+
+def investigation_key(query: str, diagnostic_agent: str, model_id: str, mode: str, **scope: Any) -> str:
+    """Key under which concurrent requests for the same investigation are coalesced."""
+    raw = json.dumps([normalize_query(query), diagnostic_agent, model_id, mode, scope], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class Flight:
+    """An investigation in flight, with every caller's progress reporter attached to it."""
+    subscribers: List[ProgressReporter] = field(default_factory=list)
+    events: List[ProgressEvent] = field(default_factory=list)
+    task: Optional[asyncio.Future] = None
+    followers: int = 0
+    waiters: int = 0
+
+    def broadcast(self, event: ProgressEvent) -> None:
+        self.events.append(event)
+        for subscriber in self.subscribers:
+            subscriber.forward(event)
+
+    def subscribe(self, progress: ProgressReporter) -> None:
+        """Attach a caller's reporter, replaying what it missed."""
+        for event in self.events:
+            progress.forward(event)
+        self.subscribers.append(progress)
+
+    async def wait(self, progress: Optional[ProgressReporter] = None) -> Dict[str, Any]:
+        """Wait for the result; the run is cancelled once every caller waiting for it has gone away."""
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if progress in self.subscribers:
+                self.subscribers.remove(progress)
+            if self.waiters == 1 and not self.task.done():
+                self.task.cancel()
+            raise
+        finally:
+            self.waiters -= 1
+
+
+class InvestigationCoalescer:
+    """Let concurrent requests for the same investigation share one run.
+
+    The first request for a key starts the investigation; requests with the
+    same key that arrive while it is running attach to it, receive its
+    progress events (including those already sent) and get its result. The
+    run is shielded from its callers, so one caller going away does not
+    cancel it for the others; it is cancelled when the last one goes away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    def in_flight(self, key: str) -> bool:
+        """Whether an investigation with this key is running now."""
+        return key in self._flights
+
+    async def run(
+        self,
+        key: str,
+        start: Callable[[ProgressReporter], Awaitable[Dict[str, Any]]],
+        progress: Optional[ProgressReporter] = None,
+    ) -> Dict[str, Any]:
+        """Join the investigation running under ``key``, or start it with ``start(progress)``."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            self._stats["followers"] += 1
+            requests_counter.add(1, {"coalesced": True})
+            logger.info(f"Coalesced request into in-flight investigation {key[:12]} ({flight.followers} followers)")
+            if progress:
+                progress.emit("phase", "🔗 Joined an identical investigation already in progress", step="coalesced")
+                flight.subscribe(progress)
+            result = await flight.wait(progress)
+            return {**result, "coalesced": True}
+
+        flight = Flight()
+        if progress:
+            flight.subscribe(progress)
+        self._flights[key] = flight
+        self._stats["leaders"] += 1
+        requests_counter.add(1, {"coalesced": False})
+        flight.task = asyncio.ensure_future(start(ProgressReporter(flight.broadcast)))
+        flight.task.add_done_callback(lambda _: self._flights.pop(key, None))
+        result = await flight.wait(progress)
+        return {**result, "coalesced": False}
+
+    def coalescing_ratio(self) -> float:
+        """Share of requests that were answered by an investigation another request started."""
+        requests = self._stats["leaders"] + self._stats["followers"]
+        return self._stats["followers"] / requests if requests else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "in_flight": len(self._flights),
+            "coalescing_ratio": round(self.coalescing_ratio(), 4),
+        }
+
+
+_coalescer: Optional[InvestigationCoalescer] = None
+_coalescer_lock = threading.Lock()
+
+
+def get_investigation_coalescer() -> Optional[InvestigationCoalescer]:
+    """Get the process-wide coalescer, or None when SHERLOCK_COALESCE_ENABLED is false."""
+    global _coalescer
+
+    if os.getenv("SHERLOCK_COALESCE_ENABLED", "true").lower() != "true":
+        return None
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = InvestigationCoalescer()
+    return _coalescer
+
+
+def _observe_coalescing_ratio(options: CallbackOptions) -> List[Observation]:
+    return [Observation(_coalescer.coalescing_ratio())] if _coalescer else []
+
+
+meter.create_observable_gauge(
+    "sherlock.investigations.coalescing_ratio",
+    callbacks=[_observe_coalescing_ratio],
+    description="Share of investigation requests served by joining an identical investigation already in flight",
+)
@@ -1,6 +1,7 @@
 """Configuration management for Sherlock SRE toolkit."""
 import logging
 import os
+import sys
 import base64
 from pathlib import Path
 from typing import Optional
@@ -12,6 +13,7 @@ class Config:
     """Centralized configuration management."""
     
     _telemetry_instance: Optional[StrandsTelemetry] = None
+    _meter_configured: bool = False
     
     @staticmethod
     def setup_logging(
@@ -70,8 +72,12 @@ class Config:
         logger.info(f"Langfuse OTLP configured - Endpoint: {langfuse_host}/api/public/otel")
 
     @staticmethod
-    def setup_telemetry(enable_otlp: bool = False, enable_console: bool = False, enable_langfuse: bool = False) -> None:
-        """Setup centralized telemetry configuration."""
+    def setup_telemetry(enable_otlp: bool = False, enable_console: bool = False, enable_langfuse: bool = False, enable_console_metrics: bool = False) -> None:
+        """Setup centralized telemetry configuration.
+
+        Console spans go to stderr, so they never mix with a stdio MCP server's
+        JSON-RPC stream; console metrics print to stdout and are opt-in.
+        """
         if not enable_otlp and not enable_console and not enable_langfuse:
             # Telemetry disabled
             return
@@ -91,7 +97,17 @@ class Config:
             Config._telemetry_instance.setup_otlp_exporter()
         
         if enable_console:
-            Config._telemetry_instance.setup_console_exporter()
+            Config._telemetry_instance.setup_console_exporter(out=sys.stderr)
+        
+        # Phase and tool latency histograms (plus the Strands agent metrics) go to an OTLP metrics endpoint.
+        # Langfuse and Jaeger only accept traces, so metrics are exported only when an endpoint is set for them.
+        if not Config._meter_configured:
+            export_metrics = (enable_otlp or enable_langfuse) and bool(os.getenv("OTEL_EXPORTER_OTLP_METRICS_ENDPOINT"))
+            Config._telemetry_instance.setup_meter(
+                enable_console_exporter=enable_console_metrics,
+                enable_otlp_exporter=export_metrics
+            )
+            Config._meter_configured = True
     
     @staticmethod
     def setup_environment() -> None:
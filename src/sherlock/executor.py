@@ -0,0 +1,116 @@
+"""Bounded-concurrency executor for investigations."""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from opentelemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+meter = metrics.get_meter("sherlock.executor")
+queue_depth_counter = meter.create_up_down_counter(
+    "sherlock.investigations.queue_depth",
+    description="Investigations waiting for a free execution slot",
+)
+running_counter = meter.create_up_down_counter(
+    "sherlock.investigations.running",
+    description="Investigations currently executing",
+)
+queue_wait_histogram = meter.create_histogram(
+    "sherlock.investigations.queue_wait",
+    unit="s",
+    description="Time investigations spent waiting for an execution slot",
+)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when an investigation is submitted while the wait queue is full."""
+
+
+class InvestigationExecutor:
+    """Run investigations on the event loop with a cap on how many run at once.
+
+    Callers beyond ``max_concurrent`` wait in FIFO order (asyncio.Semaphore is
+    fair), up to ``max_queue`` waiters, after which submissions are rejected
+    instead of piling up behind a long incident.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_queue: int = 16):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self._running = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "total_wait_seconds": 0.0}
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of investigations waiting for a slot."""
+        return self._waiting
+
+    async def submit(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` once a slot is free and return its result."""
+        if self._waiting >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise QueueFullError(
+                f"{self._waiting} investigations already waiting (max_queue={self.max_queue}), try again shortly"
+            )
+
+        self._stats["submitted"] += 1
+        self._waiting += 1
+        queue_depth_counter.add(1)
+        enqueued_at = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            queue_depth_counter.add(-1)
+
+        waited = time.monotonic() - enqueued_at
+        self._stats["total_wait_seconds"] += waited
+        queue_wait_histogram.record(waited)
+        if waited > 1:
+            logger.info(f"Investigation waited {waited:.1f}s for an execution slot (queue depth {self._waiting})")
+
+        self._running += 1
+        running_counter.add(1)
+        try:
+            result = await func(*args, **kwargs)
+            self._stats["completed"] += 1
+            return result
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            self._running -= 1
+            running_counter.add(-1)
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, occupancy and counters."""
+        return {
+            **self._stats,
+            "queue_depth": self._waiting,
+            "running": self._running,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
+
+
+_executor: Optional[InvestigationExecutor] = None
+
+
+def get_executor() -> InvestigationExecutor:
+    """Get the process-wide investigation executor."""
+    global _executor
+
+    if _executor is None:
+        _executor = InvestigationExecutor(
+            max_concurrent=int(os.getenv("SHERLOCK_MAX_CONCURRENT_INVESTIGATIONS", "2")),
+            max_queue=int(os.getenv("SHERLOCK_MAX_QUEUED_INVESTIGATIONS", "16")),
+        )
+    return _executor
@@ -0,0 +1,346 @@
+"""Job queue that lets producers hand investigations to separate worker processes."""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sherlock.progress import ProgressEvent, ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("pending", "running", "succeeded", "failed")
+
+
+class JobFailedError(RuntimeError):
+    """Raised when a queued investigation failed on its worker."""
+
+
+@dataclass
+class Job:
+    """An investigation request and its state in the queue."""
+    id: str
+    request: Dict[str, Any]
+    status: str = "pending"
+    worker: Optional[str] = None
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+class JobQueue(ABC):
+    """Backend for queued investigations, their progress events and results.
+
+    Workers claim a job with a lease and renew it while the investigation
+    runs; a job whose worker died is handed to another worker once the lease
+    expires, up to ``max_attempts`` times.
+    """
+
+    max_attempts: int = 3
+
+    @abstractmethod
+    def enqueue(self, request: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        """Add an investigation request and return its job ID."""
+
+    @abstractmethod
+    def claim(self, worker: str, lease_seconds: float) -> Optional[Job]:
+        """Take the oldest pending (or abandoned) job for ``worker``, or None if there is nothing to do."""
+
+    @abstractmethod
+    def renew(self, job_id: str, worker: str, lease_seconds: float) -> bool:
+        """Extend a worker's lease on a job; False if the job is no longer the worker's."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> None:
+        """Store a job's result."""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker: str, error: str) -> None:
+        """Mark a job as failed."""
+
+    @abstractmethod
+    def publish(self, job_id: str, event: ProgressEvent) -> None:
+        """Append a progress event to a job's event stream."""
+
+    def publish_many(self, job_id: str, events: List[ProgressEvent]) -> None:
+        """Append several progress events at once."""
+        for event in events:
+            self.publish(job_id, event)
+
+    @abstractmethod
+    def cancel(self, job_id: str, reason: str) -> bool:
+        """Mark a pending or running job as failed with ``reason``; False if it had already finished."""
+
+    @abstractmethod
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete jobs that finished more than ``older_than_seconds`` ago, with their events; returns how many."""
+
+    @abstractmethod
+    def events(self, job_id: str, after: int = 0) -> List[Tuple[int, ProgressEvent]]:
+        """Progress events of a job with a sequence number greater than ``after``."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Current state of a job."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Number of jobs per status."""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """Job queue in a SQLite file, shared by every producer and worker on the same host or volume.
+
+    The database runs in WAL mode and jobs are claimed inside an immediate
+    transaction, so concurrent workers never take the same job.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = Path(path).expanduser()
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, request TEXT NOT NULL, status TEXT NOT NULL, worker TEXT, "
+            "lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, result TEXT, error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, event TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_by_job ON events (job_id, seq)")
+
+    def enqueue(self, request: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, request, status, created_at) VALUES (?, ?, 'pending', ?)",
+                (job_id, json.dumps(request), time.time()),
+            )
+        return job_id
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Give up on abandoned jobs that have already been tried max_attempts times
+                self._db.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, error = 'worker lost ' || attempts || ' times' "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                    "started_at = ? WHERE id = ?",
+                    (worker, now + lease_seconds, now, row[0]),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return self.get(row[0])
+
+    def renew(self, job_id: str, worker: str, lease_seconds: float) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> None:
+        self._finish(job_id, worker, "succeeded", result=json.dumps(result, default=str))
+
+    def fail(self, job_id: str, worker: str, error: str) -> None:
+        self._finish(job_id, worker, "failed", error=error)
+
+    def _finish(self, job_id: str, worker: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (status, result, error, time.time(), job_id, worker),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"Job {job_id} was no longer held by {worker}; its {status} result was dropped")
+
+    def publish(self, job_id: str, event: ProgressEvent) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO events (job_id, event) VALUES (?, ?)",
+                (job_id, json.dumps(asdict(event), default=str)),
+            )
+
+    def publish_many(self, job_id: str, events: List[ProgressEvent]) -> None:
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO events (job_id, event) VALUES (?, ?)",
+                [(job_id, json.dumps(asdict(event), default=str)) for event in events],
+            )
+
+    def cancel(self, job_id: str, reason: str) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ? AND status IN ('pending', 'running')",
+                (reason, time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def prune(self, older_than_seconds: float) -> int:
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "DELETE FROM events WHERE job_id IN "
+                    "(SELECT id FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?)",
+                    (cutoff,),
+                )
+                cursor = self._db.execute(
+                    "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (cutoff,)
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def events(self, job_id: str, after: int = 0) -> List[Tuple[int, ProgressEvent]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, event FROM events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        return [(seq, ProgressEvent(**json.loads(event))) for seq, event in rows]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, request, status, worker, attempts, created_at, started_at, finished_at, result, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row[0],
+            request=json.loads(row[1]),
+            status=row[2],
+            worker=row[3],
+            attempts=row[4],
+            created_at=row[5],
+            started_at=row[6],
+            finished_at=row[7],
+            result=json.loads(row[8]) if row[8] else None,
+            error=row[9],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            workers = self._db.execute(
+                "SELECT COUNT(DISTINCT worker) FROM jobs WHERE status = 'running' AND lease_until >= ?", (time.time(),)
+            ).fetchone()[0]
+        return {**{status: counts.get(status, 0) for status in JOB_STATUSES}, "active_workers": workers, "path": str(self.path)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# Queue backends by URL scheme; a Redis (or other broker) backend registers here
+JOB_QUEUE_BACKENDS: Dict[str, Callable[[str], JobQueue]] = {
+    "sqlite": lambda location: SQLiteJobQueue(location),
+}
+
+
+def open_job_queue(url: str) -> JobQueue:
+    """Open a job queue from a URL such as ``sqlite:///var/lib/sherlock/jobs.db`` or ``sqlite://jobs.db``."""
+    scheme, _, location = url.partition("://")
+    if scheme not in JOB_QUEUE_BACKENDS or not location:
+        raise ValueError(f"Invalid job queue URL: {url}. Expected <backend>://<location> with backend one of {sorted(JOB_QUEUE_BACKENDS)}")
+    return JOB_QUEUE_BACKENDS[scheme](location)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> Optional[JobQueue]:
+    """Get the process-wide job queue, or None unless SHERLOCK_JOB_QUEUE is set."""
+    global _queue
+
+    url = os.getenv("SHERLOCK_JOB_QUEUE")
+    if not url:
+        return None
+    with _queue_lock:
+        if _queue is None:
+            _queue = open_job_queue(url)
+    return _queue
+
+
+def get_job_timeout() -> float:
+    """Seconds a producer waits for a queued investigation (SHERLOCK_JOB_TIMEOUT, default 1800)."""
+    return float(os.getenv("SHERLOCK_JOB_TIMEOUT", "1800"))
+
+
+async def wait_for_job(
+    queue: JobQueue,
+    job_id: str,
+    progress: Optional[ProgressReporter] = None,
+    poll_interval: float = 0.5,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Wait for a queued investigation, forwarding its progress events, and return its result.
+
+    When ``timeout`` expires the job is cancelled, so a worker that picks it
+    up later does not run an investigation nobody is waiting for.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    seen = 0
+    while True:
+        job = await asyncio.to_thread(queue.get, job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        # Read events after the job state so none are missed when it just finished
+        for seen, event in await asyncio.to_thread(queue.events, job_id, seen):
+            if progress:
+                progress.forward(event)
+        if job.status == "succeeded":
+            return job.result
+        if job.status == "failed":
+            raise JobFailedError(f"Investigation {job_id} failed on {job.worker}: {job.error}")
+        if deadline and time.monotonic() > deadline:
+            await asyncio.to_thread(queue.cancel, job_id, f"timed out after {timeout:.0f}s waiting for a worker")
+            raise TimeoutError(f"Investigation {job_id} still {job.status} after {timeout:.0f}s")
+        await asyncio.sleep(poll_interval)
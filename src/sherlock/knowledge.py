@@ -0,0 +1,204 @@
+"""Query-time retrieval of Retail Store workload knowledge for the agents."""
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands.hooks import HookProvider, HookRegistry, MessageAddedEvent
+
+from sherlock.prompts import WORKLOAD_KNOWLEDGE
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_MARKER = "RELEVANT WORKLOAD KNOWLEDGE"
+
+# Terms describing what each specialist looks at; blended into the query so each agent gets the sections it can act on
+AGENT_FOCUS = {
+    "diagnostic_agent": "kubernetes eks namespace pod deployment service probe health endpoint discovery configmap secret",
+    "observability_agent": "cloudwatch log group metric prometheus alarm tracing x-ray opentelemetry adot",
+    "persistence_agent": "dynamodb table rds mysql postgresql redis elasticache database persistence messaging",
+}
+AGENT_FOCUS_WEIGHT = 0.5
+
+# Sections scoring below this fraction of the best match are left out even if the budget has room
+MIN_RELATIVE_SCORE = 0.35
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_HEADING_PATTERN = re.compile(r"^(#{2,4})\s+(.*)$")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with a light plural strip, so "carts" matches "cart"."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+@dataclass
+class Section:
+    """One heading of the workload overview and the text under it."""
+    title: str
+    text: str
+    position: int
+    terms: Counter = field(default_factory=Counter)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def split_sections(document: str) -> List[Section]:
+    """Split a markdown document into one section per heading, ignoring '#' lines inside code fences.
+
+    Each section's title carries its parent headings (e.g. "AWS Services
+    Integration > Core AWS Services > Amazon DynamoDB") so it reads on its own.
+    """
+    sections: List[Section] = []
+    path: List[str] = []
+    lines: List[str] = []
+    in_code = False
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body and path:
+            title = " > ".join(path)
+            text = f"{'#' * min(len(path) + 1, 4)} {title}\n{body}"
+            sections.append(Section(title, text, len(sections), Counter(tokenize(text))))
+        lines.clear()
+
+    for line in document.splitlines():
+        if line.strip().startswith("```"):
+            in_code = not in_code
+        heading = None if in_code else _HEADING_PATTERN.match(line)
+        if heading:
+            flush()
+            depth = len(heading.group(1)) - 2
+            path[depth:] = [heading.group(2).strip()]
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+class KnowledgeIndex:
+    """In-process BM25 index over the workload overview sections."""
+
+    def __init__(self, sections: List[Section], k1: float = 1.5, b: float = 0.75):
+        self.sections = sections
+        self.k1 = k1
+        self.b = b
+        self.average_length = sum(sum(s.terms.values()) for s in sections) / len(sections) if sections else 0.0
+        document_frequency = Counter(term for section in sections for term in section.terms)
+        self.idf = {
+            term: math.log(1 + (len(sections) - count + 0.5) / (count + 0.5))
+            for term, count in document_frequency.items()
+        }
+
+    def score(self, section: Section, query_terms: List[str]) -> float:
+        length = sum(section.terms.values())
+        score = 0.0
+        for term in query_terms:
+            frequency = section.terms.get(term, 0)
+            if frequency:
+                norm = self.k1 * (1 - self.b + self.b * length / self.average_length)
+                score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+        return score
+
+    def search(self, query: str, agent: Optional[str] = None) -> List[Tuple[float, Section]]:
+        """Return (score, section) pairs for the query, best first, weighted towards the agent's focus."""
+        query_terms = tokenize(query)
+        focus_terms = tokenize(AGENT_FOCUS.get(agent, ""))
+        ranked = []
+        for section in self.sections:
+            score = self.score(section, query_terms) + AGENT_FOCUS_WEIGHT * self.score(section, focus_terms)
+            if score > 0:
+                ranked.append((score, section))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return ranked
+
+    def retrieve(self, query: str, agent: Optional[str] = None, token_budget: int = 1500) -> Dict[str, Any]:
+        """Pick the best sections that fit in the token budget and render them in document order.
+
+        The "Workload Overview" introduction is always included so every agent
+        knows what system it is looking at.
+        """
+        pinned = [section for section in self.sections if section.title == "Workload Overview"]
+        selected = list(pinned)
+        used = sum(section.tokens for section in pinned)
+        ranked = self.search(query, agent)
+        cutoff = ranked[0][0] * MIN_RELATIVE_SCORE if ranked else 0.0
+        for score, section in ranked:
+            if score < cutoff:
+                break
+            if section in selected or used + section.tokens > token_budget:
+                continue
+            selected.append(section)
+            used += section.tokens
+
+        selected.sort(key=lambda section: section.position)
+        return {
+            "text": "\n\n".join(section.text for section in selected),
+            "sections": [section.title for section in selected],
+            "tokens": used,
+            "total_tokens": sum(section.tokens for section in self.sections),
+        }
+
+
+class KnowledgeHook(HookProvider):
+    """Attach retrieved workload knowledge to the first user message of each agent invocation.
+
+    The knowledge rides in the user turn rather than the system prompt, so the
+    system prompt stays byte-identical and keeps hitting the prompt cache.
+    """
+
+    def __init__(self, knowledge: str):
+        self.knowledge = knowledge
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(MessageAddedEvent, self.attach_knowledge)
+
+    def attach_knowledge(self, event: MessageAddedEvent) -> None:
+        message = event.message
+        if message["role"] != "user" or any("toolResult" in block for block in message["content"]):
+            return
+        # Swarm resets an agent's messages before each handoff, so check the conversation rather than keeping a flag
+        if any(KNOWLEDGE_MARKER in block.get("text", "") for earlier in event.agent.messages for block in earlier["content"]):
+            return
+        message["content"].append({"text": f"{KNOWLEDGE_MARKER}\n\n{self.knowledge}"})
+
+
+_index: Optional[KnowledgeIndex] = None
+
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """Get the process-wide index over the workload overview."""
+    global _index
+
+    if _index is None:
+        _index = KnowledgeIndex(split_sections(WORKLOAD_KNOWLEDGE))
+    return _index
+
+
+def knowledge_hooks(query: str, agent: str) -> Tuple[List[HookProvider], Dict[str, Any]]:
+    """Build the hook that gives one agent the knowledge relevant to the query, and a retrieval report.
+
+    ``SHERLOCK_KNOWLEDGE_TOKEN_BUDGET`` caps the injected text per agent.
+    """
+    token_budget = int(os.getenv("SHERLOCK_KNOWLEDGE_TOKEN_BUDGET", "1500"))
+    retrieval = get_knowledge_index().retrieve(query, agent, token_budget)
+    logger.info(
+        f"Workload knowledge for {agent}: {len(retrieval['sections'])} sections, "
+        f"~{retrieval['tokens']} of {retrieval['total_tokens']} tokens"
+    )
+    report = {key: retrieval[key] for key in ("sections", "tokens", "total_tokens")}
+    return [KnowledgeHook(retrieval["text"])], report
@@ -0,0 +1,348 @@
+"""Streaming log template mining (Drain) for condensing log evidence."""
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import boto3
+from strands import tool
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolUse
+
+from sherlock.tool_wrappers import DelegatingTool
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "<*>"
+
+# MCP tools whose results are log lines, and so are worth condensing into templates
+LOG_TOOLS = {
+    "get_pod_logs",
+    "get_cloudwatch_logs",
+    "filter_log_events",
+    "get_logs_insight_query_results",
+}
+
+_TIMESTAMP_PATTERN = re.compile(
+    r"^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)\]?\s*"
+)
+# UUIDs, IPv4 (with port), hex ids and numbers (with common units), as one pass
+_VARIABLE_PATTERN = re.compile(
+    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+    r"|\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"
+    r"|\b0x[0-9a-f]+\b"
+    r"|\b[0-9a-f]{12,}\b"
+    r"|(?<![a-z])-?\d+(?:\.\d+)?(?:ms|s|%)?(?![a-z])",
+    re.IGNORECASE,
+)
+
+# Key for the template list at the bottom of the prefix tree; tokens are always strings
+_LEAF = None
+
+
+def _mask(content: str) -> str:
+    return _VARIABLE_PATTERN.sub(WILDCARD, content)
+
+
+@dataclass
+class LogTemplate:
+    """A group of log lines that share a template."""
+    template_id: int
+    tokens: List[str]
+    count: int = 0
+    first_seen: Optional[str] = None
+    last_seen: Optional[str] = None
+    examples: List[List[str]] = field(default_factory=list)
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "template": self.template,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "example_parameters": self.examples,
+        }
+
+
+class LogTemplateMiner:
+    """Drain log parser: a fixed-depth prefix tree routes each line to a few candidate templates.
+
+    Lines are processed one at a time and only templates are kept, so memory is
+    bounded by ``max_templates`` regardless of how many lines are fed in; when
+    the limit is reached the least recently matched template is dropped, along
+    with the tree nodes that led only to it.
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        similarity_threshold: float = 0.5,
+        max_children: int = 100,
+        max_templates: int = 1000,
+        max_examples: int = 3,
+    ):
+        self.depth = depth
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self.max_examples = max_examples
+        self.lines = 0
+        self.evicted = 0
+        self._templates: "OrderedDict[int, LogTemplate]" = OrderedDict()
+        self._tree: Dict[Any, Any] = {}
+        # Where each template sits in the tree, so evicting one does not search the whole tree
+        self._paths: Dict[int, List[Tuple[Dict[Any, Any], Any]]] = {}
+        self._next_id = 0
+
+    def add(self, line: str, timestamp: Optional[str] = None) -> Optional[LogTemplate]:
+        """Feed one log line; returns the template it was grouped into."""
+        line = line.strip()
+        if not line:
+            return None
+        match = _TIMESTAMP_PATTERN.match(line)
+        if match:
+            timestamp = timestamp or match.group(1)
+            line = line[match.end():]
+
+        raw_tokens = line.split()
+        tokens = _mask(line).split()
+        if len(tokens) != len(raw_tokens):
+            # Masking merged or split tokens; fall back to masking token by token
+            tokens = [_mask(token) for token in raw_tokens]
+        self.lines += 1
+
+        path = self._leaf(tokens)
+        leaf_node, leaf_key = path[-1]
+        leaf = leaf_node[leaf_key]
+        template = self._best_match(leaf, tokens)
+        if template is None:
+            template = LogTemplate(self._next_id, list(tokens))
+            self._next_id += 1
+            leaf.append(template.template_id)
+            self._templates[template.template_id] = template
+            self._paths[template.template_id] = path
+            self._evict()
+        else:
+            template.tokens = [
+                token if token == new_token else WILDCARD for token, new_token in zip(template.tokens, tokens)
+            ]
+            self._templates.move_to_end(template.template_id)
+
+        template.count += 1
+        if timestamp:
+            template.first_seen = min(template.first_seen or timestamp, timestamp)
+            template.last_seen = max(template.last_seen or timestamp, timestamp)
+        if len(template.examples) < self.max_examples:
+            parameters = [raw for raw, token in zip(raw_tokens, template.tokens) if token == WILDCARD]
+            if parameters and parameters not in template.examples:
+                template.examples.append(parameters)
+        return template
+
+    def add_lines(self, lines: Iterable[str]) -> "LogTemplateMiner":
+        for line in lines:
+            self.add(line)
+        return self
+
+    def templates(self, limit: Optional[int] = None) -> List[LogTemplate]:
+        """Templates by line count, largest first."""
+        ranked = sorted(self._templates.values(), key=lambda template: template.count, reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def render(self, limit: int = 20) -> str:
+        """Compact text summary for an agent: one row per template with counts and time range."""
+        templates = self.templates()
+        rows = [
+            f"{self.lines} log lines grouped into {len(templates)} templates"
+            + (f" ({self.evicted} rare templates dropped)" if self.evicted else "")
+            + ":"
+        ]
+        for template in templates[:limit]:
+            time_range = f" [{template.first_seen} .. {template.last_seen}]" if template.first_seen else ""
+            examples = f" e.g. {template.examples[0]}" if template.examples else ""
+            rows.append(f"{template.count:>8}x{time_range} {template.template}{examples}")
+        if len(templates) > limit:
+            rest = sum(template.count for template in templates[limit:])
+            rows.append(f"... {len(templates) - limit} more templates covering {rest} lines")
+        return "\n".join(rows)
+
+    def _leaf(self, tokens: List[str]) -> List[Tuple[Dict[Any, Any], Any]]:
+        """Path of (node, key) steps from the root to the template list of a line, creating it if needed."""
+        path = [(self._tree, len(tokens))]
+        node = self._tree.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            key = WILDCARD if any(char.isdigit() for char in token) else token
+            if key not in node and len(node) >= self.max_children:
+                key = WILDCARD
+            path.append((node, key))
+            node = node.setdefault(key, {})
+        path.append((node, _LEAF))
+        node.setdefault(_LEAF, [])
+        return path
+
+    def _best_match(self, leaf: List[int], tokens: List[str]) -> Optional[LogTemplate]:
+        best, best_score = None, -1.0
+        for template_id in leaf:
+            template = self._templates[template_id]
+            same = sum(1 for token, new_token in zip(template.tokens, tokens) if token == new_token)
+            score = same / len(tokens) if tokens else 1.0
+            if score > best_score:
+                best, best_score = template, score
+        return best if best_score >= self.similarity_threshold else None
+
+    def _evict(self) -> None:
+        while len(self._templates) > self.max_templates:
+            template_id, _ = self._templates.popitem(last=False)
+            self.evicted += 1
+            # Remove the template from its leaf and prune the nodes it leaves empty, bottom up
+            path = self._paths.pop(template_id)
+            node, key = path[-1]
+            node[key].remove(template_id)
+            for node, key in reversed(path):
+                if node[key]:
+                    break
+                del node[key]
+
+
+def _log_lines(value: Any) -> Optional[List[Tuple[str, Optional[str]]]]:
+    """Return (message, timestamp) pairs if a JSON value is a list of log lines or log events."""
+    if not isinstance(value, list) or not value:
+        return None
+    if all(isinstance(item, str) for item in value):
+        return [(item, None) for item in value]
+    if all(isinstance(item, dict) and "message" in item for item in value):
+        return [(str(item["message"]), str(item["timestamp"]) if "timestamp" in item else None) for item in value]
+    return None
+
+
+def summarize_log_text(text: str, min_lines: int = 100, limit: int = 20) -> Optional[str]:
+    """Condense a tool output into templates if it carries at least ``min_lines`` log lines."""
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+
+    if isinstance(value, (dict, list)):
+        return _summarize_json(value, min_lines, limit)
+
+    lines = text.splitlines()
+    if len(lines) < min_lines:
+        return None
+    return LogTemplateMiner().add_lines(lines).render(limit)
+
+
+def _summarize_json(value: Any, min_lines: int, limit: int) -> Optional[str]:
+    """Replace every long list of log lines inside a JSON result with its template summary."""
+    replaced = False
+
+    def walk(node: Any) -> Any:
+        nonlocal replaced
+        entries = _log_lines(node)
+        if entries is not None and len(entries) >= min_lines:
+            miner = LogTemplateMiner()
+            for message, timestamp in entries:
+                miner.add(message, timestamp)
+            replaced = True
+            return miner.render(limit).splitlines()
+        if isinstance(node, dict):
+            return {key: walk(item) for key, item in node.items()}
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        return node
+
+    summarized = walk(value)
+    return json.dumps(summarized, indent=1, default=str) if replaced else None
+
+
+class TemplatedLogTool(DelegatingTool):
+    """Condense large log results of an MCP tool into templates with counts before the agent sees them."""
+
+    def __init__(self, tool: AgentTool, server: str, min_lines: int, limit: int):
+        super().__init__(tool, server)
+        self.min_lines = min_lines
+        self.limit = limit
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        result = await self.call(tool_use, invocation_state, **kwargs)
+        if result is not None and result.get("status") == "success":
+            content = []
+            for block in result.get("content", []):
+                summary = summarize_log_text(block["text"], self.min_lines, self.limit) if "text" in block else None
+                content.append({"text": summary} if summary is not None else block)
+            result = {**result, "content": content}
+        yield ToolResultEvent(result)
+
+
+def template_log_tools(tools: List[AgentTool], server: str) -> List[AgentTool]:
+    """Wrap the log-returning tools of one MCP server with template mining.
+
+    Results with fewer than ``SHERLOCK_LOG_TEMPLATE_MIN_LINES`` lines pass
+    through unchanged; set ``SHERLOCK_LOG_TEMPLATES_ENABLED=false`` to turn it off.
+    """
+    if os.getenv("SHERLOCK_LOG_TEMPLATES_ENABLED", "true").lower() != "true":
+        return tools
+    min_lines = int(os.getenv("SHERLOCK_LOG_TEMPLATE_MIN_LINES", "100"))
+    limit = int(os.getenv("SHERLOCK_LOG_TEMPLATE_LIMIT", "30"))
+    return [
+        TemplatedLogTool(tool, server, min_lines, limit) if tool.tool_name in LOG_TOOLS else tool
+        for tool in tools
+    ]
+
+
+@tool
+def mine_log_templates(
+    log_group_name: str,
+    start_time: str,
+    end_time: str = "",
+    filter_pattern: str = "",
+    max_lines: int = 1000000,
+    max_templates: int = 30,
+) -> str:
+    """Group the log events of a CloudWatch log group into templates with counts and first/last timestamps.
+
+    Use this instead of reading raw logs when a service produces many similar
+    lines: it streams up to max_lines events and returns only the templates,
+    largest first, with example parameter values.
+
+    Args:
+        log_group_name: CloudWatch log group, e.g. /aws/eks/retail-store/carts
+        start_time: Start of the window, ISO 8601 (e.g. 2025-01-01T10:00:00Z)
+        end_time: End of the window, ISO 8601; defaults to now
+        filter_pattern: Optional CloudWatch filter pattern, e.g. ERROR
+        max_lines: Stop after this many log events
+        max_templates: Number of templates to return
+    """
+    def to_millis(value: str) -> int:
+        # Timestamps without an offset are taken as UTC; others are converted to it
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
+
+    params: Dict[str, Any] = {"logGroupName": log_group_name, "startTime": to_millis(start_time)}
+    if end_time:
+        params["endTime"] = to_millis(end_time)
+    if filter_pattern:
+        params["filterPattern"] = filter_pattern
+
+    miner = LogTemplateMiner()
+    paginator = boto3.client("logs").get_paginator("filter_log_events")
+    for page in paginator.paginate(**params):
+        for event in page.get("events", []):
+            timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(event["timestamp"] / 1000))
+            miner.add(event["message"], timestamp)
+            if miner.lines >= max_lines:
+                break
+        if miner.lines >= max_lines:
+            break
+
+    logger.info(f"Mined {miner.lines} log events from {log_group_name} into {len(miner.templates())} templates")
+    return miner.render(max_templates)
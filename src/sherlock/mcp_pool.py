@@ -0,0 +1,335 @@
+"""Process-wide pool of warm MCP client sessions."""
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from strands.tools.mcp.mcp_client import MCPClient
+
+from sherlock.agents.diagnostic_agent import EKS_MCP_IMAGE, EKS_MCP_SERVER, get_eks_mcp_client
+from sherlock.agents.observability_agent import CLOUDWATCH_MCP_IMAGE, CLOUDWATCH_MCP_SERVER, get_cloudwatch_mcp_client
+from sherlock.agents.persistence_agent import DYNAMODB_MCP_IMAGE, DYNAMODB_MCP_SERVER, get_dynamodb_mcp_client
+from sherlock.telemetry import phase, record_phase
+from sherlock.transports import MCPServerSpec, get_transport
+
+logger = logging.getLogger(__name__)
+
+# Client factories for every MCP server type Sherlock talks to
+SERVER_FACTORIES: Dict[str, Callable[[], MCPClient]] = {
+    "eks-mcp": get_eks_mcp_client,
+    "cloudwatch": get_cloudwatch_mcp_client,
+    "dynamodb": get_dynamodb_mcp_client,
+}
+
+# Server images, used to fingerprint cached tool schemas
+SERVER_IMAGES: Dict[str, str] = {
+    "eks-mcp": EKS_MCP_IMAGE,
+    "cloudwatch": CLOUDWATCH_MCP_IMAGE,
+    "dynamodb": DYNAMODB_MCP_IMAGE,
+}
+
+# How each server can be run, for the transports other than docker
+SERVER_SPECS: Dict[str, MCPServerSpec] = {
+    "eks-mcp": EKS_MCP_SERVER,
+    "cloudwatch": CLOUDWATCH_MCP_SERVER,
+    "dynamodb": DYNAMODB_MCP_SERVER,
+}
+
+
+def server_image(server: str) -> Optional[str]:
+    """Image a server's tools come from, used to fingerprint cached tool schemas.
+
+    None for servers reached over http or run as a local process: nothing
+    identifies their version before a session starts, so their tools can
+    change behind the same URL or command and are listed every time.
+    """
+    spec = SERVER_SPECS.get(server)
+    if spec is not None and get_transport(spec) != "docker":
+        return None
+    return SERVER_IMAGES.get(server, server)
+
+
+@dataclass
+class PooledClient:
+    """An initialized MCP client session owned by a pool."""
+    client: MCPClient
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+class MCPClientPool:
+    """Pool of initialized MCP client sessions for a single server type.
+
+    Sessions are started lazily, handed out exclusively to one investigation at
+    a time, health-checked on every borrow and respawned when they die. Idle
+    sessions are stopped after ``idle_timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], MCPClient],
+        max_size: int = 4,
+        idle_timeout: float = 900.0,
+        acquire_timeout: float = 120.0,
+        health_check_timeout: float = 5.0,
+    ):
+        self.name = name
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_timeout = health_check_timeout
+
+        self._idle: List[PooledClient] = []
+        self._in_use = 0
+        self._starting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stats = {"created": 0, "reused": 0, "respawned": 0, "evicted": 0, "failed": 0}
+
+    @property
+    def size(self) -> int:
+        """Total number of sessions owned by the pool, including ones being started."""
+        return len(self._idle) + self._in_use + self._starting
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledClient:
+        """Borrow a healthy session, starting a new one if the pool has room."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError(f"MCP client pool '{self.name}' is closed")
+                self._evict_idle_locked()
+
+                if self._idle:
+                    entry = self._idle.pop()
+                    self._in_use += 1
+                    start_new = False
+                elif self.size < self.max_size:
+                    entry = None
+                    self._starting += 1
+                    start_new = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"Timed out after {timeout:.0f}s waiting for a '{self.name}' MCP session "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._condition.wait(remaining)
+                    continue
+
+            if start_new:
+                return self._start_entry()
+
+            if self._is_healthy(entry.client):
+                entry.uses += 1
+                entry.last_used = time.monotonic()
+                with self._condition:
+                    self._stats["reused"] += 1
+                logger.debug(f"Reusing warm '{self.name}' MCP session (uses={entry.uses})")
+                return entry
+
+            # Dead session: drop it and respawn in its slot
+            logger.warning(f"'{self.name}' MCP session failed health check, respawning")
+            self._stop_client(entry.client)
+            with self._condition:
+                self._in_use -= 1
+                self._starting += 1
+                self._stats["respawned"] += 1
+            return self._start_entry()
+
+    def release(self, entry: PooledClient, healthy: bool = True) -> None:
+        """Return a borrowed session to the pool, discarding it if it is unhealthy."""
+        discard = not healthy or self._closed
+        with self._condition:
+            self._in_use -= 1
+            if not discard:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._condition.notify()
+
+        if discard:
+            self._stop_client(entry.client)
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None) -> Iterator[MCPClient]:
+        """Borrow a session for the duration of a ``with`` block."""
+        entry = self.acquire(timeout)
+        try:
+            yield entry.client
+        finally:
+            self.release(entry)
+
+    def evict_idle(self) -> int:
+        """Stop sessions that have been idle for longer than ``idle_timeout``."""
+        with self._condition:
+            return self._evict_idle_locked()
+
+    def close(self) -> None:
+        """Stop every idle session and refuse new borrows."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+
+        for entry in idle:
+            self._stop_client(entry.client)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters and current occupancy for this pool."""
+        with self._condition:
+            return {
+                **self._stats,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+            }
+
+    def _start_entry(self) -> PooledClient:
+        """Start a new session in a slot already reserved via ``_starting``."""
+        start_time = time.monotonic()
+        spawned_at: List[int] = []
+        try:
+            with phase("mcp_start", server=self.name):
+                client = self.factory()
+                client._transport_callable = _timed_transport(client._transport_callable, spawned_at)
+                start_ns = time.time_ns()
+                client.start()
+                # The server process (for most servers a docker container) is spawned when the transport
+                # opens; initialize completes once it is up and has answered the handshake
+                if spawned_at:
+                    record_phase("mcp_spawn", start_ns, spawned_at[0], server=self.name)
+                    record_phase("mcp_initialize", spawned_at[0], time.time_ns(), server=self.name)
+        except Exception:
+            with self._condition:
+                self._starting -= 1
+                self._stats["failed"] += 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._starting -= 1
+            self._in_use += 1
+            self._stats["created"] += 1
+        logger.info(f"Started '{self.name}' MCP session in {time.monotonic() - start_time:.2f}s")
+        return PooledClient(client=client, uses=1)
+
+    def _evict_idle_locked(self) -> int:
+        now = time.monotonic()
+        expired = [entry for entry in self._idle if now - entry.last_used > self.idle_timeout]
+        if not expired:
+            return 0
+
+        self._idle = [entry for entry in self._idle if entry not in expired]
+        self._stats["evicted"] += len(expired)
+        logger.info(f"Evicting {len(expired)} idle '{self.name}' MCP session(s)")
+        # Stopping joins the client's background thread, so do it off the lock holder's path
+        for entry in expired:
+            threading.Thread(target=self._stop_client, args=(entry.client,), daemon=True).start()
+        self._condition.notify_all()
+        return len(expired)
+
+    def _is_healthy(self, client: MCPClient) -> bool:
+        """Check the session is alive and answers an MCP ping."""
+        if not client._is_session_active():
+            return False
+        try:
+            session = client._background_thread_session
+            client._invoke_on_background_thread(session.send_ping()).result(timeout=self.health_check_timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"'{self.name}' MCP session ping failed: {e}")
+            return False
+
+    def _stop_client(self, client: MCPClient) -> None:
+        try:
+            client.stop(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error stopping '{self.name}' MCP session: {e}")
+
+
+def _timed_transport(transport_callable: Callable, spawned_at: List[int]) -> Callable:
+    """Wrap an MCP client's transport factory to note when the server process has been spawned."""
+    @asynccontextmanager
+    async def timed():
+        async with transport_callable() as streams:
+            spawned_at.append(time.time_ns())
+            yield streams
+    return timed
+
+
+_pools: Dict[str, MCPClientPool] = {}
+_pools_lock = threading.Lock()
+_reaper: Optional[threading.Thread] = None
+
+
+def get_pool(server: str) -> MCPClientPool:
+    """Get the process-wide pool for an MCP server type, creating it on first use."""
+    global _reaper
+
+    with _pools_lock:
+        pool = _pools.get(server)
+        if pool is None:
+            if server not in SERVER_FACTORIES:
+                raise ValueError(f"Unknown MCP server: {server}. Must be one of {sorted(SERVER_FACTORIES)}")
+            pool = MCPClientPool(
+                name=server,
+                factory=SERVER_FACTORIES[server],
+                max_size=int(os.getenv("SHERLOCK_MCP_POOL_MAX_SIZE", "4")),
+                idle_timeout=float(os.getenv("SHERLOCK_MCP_POOL_IDLE_TIMEOUT", "900")),
+                acquire_timeout=float(os.getenv("SHERLOCK_MCP_POOL_ACQUIRE_TIMEOUT", "120")),
+            )
+            _pools[server] = pool
+
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_idle_sessions, name="sherlock-mcp-pool-reaper", daemon=True)
+            _reaper.start()
+    return pool
+
+
+def prewarm(servers: Optional[List[str]] = None) -> None:
+    """Start one session per server type so the first investigation skips cold start."""
+    for server in servers or list(SERVER_FACTORIES):
+        try:
+            pool = get_pool(server)
+            pool.release(pool.acquire())
+        except Exception as e:
+            logger.warning(f"Failed to prewarm '{server}' MCP session: {e}")
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Return stats for every pool created so far."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.stats() for name, pool in pools.items()}
+
+
+def close_all_pools() -> None:
+    """Stop every pooled session. Registered to run at interpreter exit."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _reap_idle_sessions() -> None:
+    interval = float(os.getenv("SHERLOCK_MCP_POOL_REAP_INTERVAL", "60"))
+    while True:
+        time.sleep(interval)
+        with _pools_lock:
+            pools = list(_pools.values())
+        for pool in pools:
+            pool.evict_idle()
+
+
+atexit.register(close_all_pools)
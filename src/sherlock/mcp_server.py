@@ -1,11 +1,21 @@
 """MCP server for SRE Agent Toolkit."""
 from mcp.server import FastMCP
-from sherlock.orchestrator import orchestrate, format_investigation_results
+from mcp.server.fastmcp import Context
+from sherlock.orchestrator import coalescing_key, orchestrate, format_investigation_results
 from sherlock.config import Config
+from sherlock.cache import get_investigation_cache
+from sherlock.coalescing import get_investigation_coalescer
+from sherlock.executor import QueueFullError, get_executor
+from sherlock.job_queue import get_job_queue, get_job_timeout, wait_for_job
+from sherlock.mcp_pool import pool_stats, prewarm
+from sherlock.progress import ProgressEvent, ProgressReporter
+from sherlock.tool_cache import get_tool_result_cache
+from sherlock.tool_reduction import get_tool_reduction_stats
+import asyncio
+import json
 import logging
 import os
-import nest_asyncio
-nest_asyncio.apply()
+import threading
 
 # Setup MCP-specific configuration
 Config.setup_for_mcp()
@@ -16,17 +26,61 @@ mcp = FastMCP("SRE Agent Toolkit")
 
 @mcp.tool(
     name="sherlock", 
-    description="Comprehensive SRE investigation using K8s diagnostics, CloudWatch observability, and DynamoDB analysis"
+    description="Comprehensive SRE investigation using K8s diagnostics, CloudWatch observability, and DynamoDB analysis. "
+                "Set mode='parallel' to run all specialists at the same time instead of the sequential swarm. "
+                "Agent findings, handoffs and tool activity are streamed as progress notifications while it runs"
 )
-def sherlock(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0") -> str:
-    import asyncio
+async def sherlock(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0", use_cache: bool = True, mode: str = "swarm", ctx: Context = None) -> str:
     logger.info(f"SRE Orchestrator investigating: {query}")
     logger.info(f"Using diagnostic agent: {diagnostic_agent}")
     logger.info(f"Using Bedrock model: {model_id}")
+    logger.info(f"Using execution mode: {mode}")
     
     try:
-        # Execute orchestration
-        result = asyncio.run(orchestrate(query, diagnostic_agent, model_id))
+        # With a job queue configured, sherlock-worker processes run the investigation and report back through it
+        queue = get_job_queue()
+        if queue is not None:
+            request = {"query": query, "diagnostic_agent": diagnostic_agent, "model_id": model_id, "use_cache": use_cache, "mode": mode}
+            job_id = await asyncio.to_thread(queue.enqueue, request)
+            logger.info(f"Queued investigation {job_id} ({queue.stats()['pending']} pending)")
+            events: asyncio.Queue = asyncio.Queue()
+            progress = ProgressReporter.to_queue(events)
+            progress.emit("phase", f"📬 Queued investigation {job_id} for a Sherlock worker")
+            investigation = asyncio.ensure_future(wait_for_job(queue, job_id, progress, timeout=get_job_timeout()))
+            try:
+                await stream_progress(ctx, events, investigation)
+                result = await investigation
+            finally:
+                if not investigation.done():
+                    # The client went away: stop waiting, and make sure no worker runs the job for nobody
+                    investigation.cancel()
+                    await asyncio.to_thread(queue.cancel, job_id, "cancelled by the MCP client")
+            return format_investigation_results(result["results"])
+        
+        # Execute orchestration on the server's event loop, bounded by the shared executor
+        executor = get_executor()
+        logger.info(f"Investigation queue depth: {executor.queue_depth}")
+        events: asyncio.Queue = asyncio.Queue()
+        progress = ProgressReporter.to_queue(events)
+        # A request identical to a running investigation joins it without taking an execution slot
+        coalescer = get_investigation_coalescer()
+        if coalescer and coalescer.in_flight(coalescing_key(query, diagnostic_agent, model_id, mode)):
+            investigation = asyncio.ensure_future(
+                orchestrate(query, diagnostic_agent, model_id, use_cache=use_cache, mode=mode, progress=progress)
+            )
+        else:
+            if executor.queue_depth or executor.stats()["running"] >= executor.max_concurrent:
+                progress.emit("phase", f"⏳ Waiting for an execution slot ({executor.queue_depth} investigations ahead)")
+            investigation = asyncio.ensure_future(
+                executor.submit(orchestrate, query, diagnostic_agent, model_id, use_cache=use_cache, mode=mode, progress=progress)
+            )
+        try:
+            await stream_progress(ctx, events, investigation)
+            result = await investigation
+        finally:
+            if not investigation.done():
+                # The client went away: release the execution slot instead of running for nobody
+                investigation.cancel()
         
         # Format result for Amazon Q using shared formatter
         formatted_output = format_investigation_results(result)
@@ -34,17 +88,75 @@ def sherlock(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.
         logger.info("SRE Orchestrator completed successfully")
         return formatted_output
             
+    except QueueFullError as e:
+        logger.warning(f"Rejected investigation: {e}")
+        return f"⏳ **Busy**: Sherlock is already running its maximum number of investigations. {e}"
     except Exception as e:
         error_msg = f"SRE investigation failed: {str(e)}"
         logger.error(error_msg)
         return f"❌ **Error**: {error_msg}\n\nPlease check your AWS credentials, Kubernetes access, and MCP server connections."
 
+async def stream_progress(ctx: Context, events: asyncio.Queue, investigation: asyncio.Future) -> None:
+    """Forward progress events to the MCP client until the investigation finishes.
+
+    Every event becomes a progress notification; phases, handoffs and agent
+    findings are also sent as log messages so clients can show partial results.
+    """
+    step = 0
+    while not (investigation.done() and events.empty()):
+        next_event = asyncio.ensure_future(events.get())
+        done, _ = await asyncio.wait({next_event, investigation}, return_when=asyncio.FIRST_COMPLETED)
+        if next_event not in done:
+            next_event.cancel()
+            continue
+        
+        event: ProgressEvent = next_event.result()
+        step += 1
+        if ctx is None:
+            continue
+        try:
+            await ctx.report_progress(step, message=f"[{event.elapsed:.0f}s] {event.message}")
+            if event.kind == "agent_done" and event.detail.get("findings"):
+                await ctx.info(f"### Findings from {event.agent}\n\n{event.detail['findings']}")
+            elif event.kind in ("phase", "handoff"):
+                await ctx.info(event.message)
+        except Exception as e:
+            # A client that stops listening must not fail the investigation
+            logger.debug(f"Could not send progress notification: {e}")
+
+@mcp.tool(
+    name="sherlock_status",
+    description="Show Sherlock's investigation queue depth, coalesced requests, job queue, MCP session pools, investigation cache, tool cache and tool result reduction statistics"
+)
+async def sherlock_status() -> str:
+    cache = get_investigation_cache()
+    queue = get_job_queue()
+    tool_cache = get_tool_result_cache()
+    reduction = get_tool_reduction_stats()
+    coalescer = get_investigation_coalescer()
+    status = {
+        "executor": get_executor().stats(),
+        "coalescing": coalescer.stats() if coalescer else None,
+        "job_queue": queue.stats() if queue else None,
+        "mcp_pools": pool_stats(),
+        "investigation_cache": cache.stats() if cache else None,
+        "tool_cache": tool_cache.stats() if tool_cache else None,
+        "tool_reduction": reduction.stats() if reduction else None,
+    }
+    return json.dumps(status, indent=2)
+
 def main():
     """Run the MCP server for Amazon Q integration."""
     try:
         logger.info("Starting SRE Agent Toolkit MCP Server")
         logger.info("Available tool: sherlock - Comprehensive investigation")
+        logger.info("Available tool: sherlock_status - Queue, pool and cache statistics")
         logger.info(f"Environment: AWS_REGION={os.getenv('AWS_REGION')}, KUBECONFIG={os.getenv('KUBECONFIG')}")
+        if get_job_queue() is not None:
+            logger.info(f"Investigations are queued for sherlock-worker processes: {os.getenv('SHERLOCK_JOB_QUEUE')}")
+        elif os.getenv("SHERLOCK_MCP_POOL_PREWARM", "true").lower() == "true":
+            # Start MCP sessions in the background so the first investigation skips container cold start
+            threading.Thread(target=prewarm, name="sherlock-mcp-prewarm", daemon=True).start()
         mcp.run(transport="stdio")
     except Exception as e:
         logger.error(f"MCP Server failed to start: {e}")
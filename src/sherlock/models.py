@@ -0,0 +1,203 @@
+"""Bedrock model construction for Sherlock agents."""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from botocore.config import Config as BotocoreConfig
+from strands.models import BedrockModel
+from strands.models.bedrock import DEFAULT_READ_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Model families that accept Bedrock cache points, and whether tool definitions can be cached too.
+# https://docs.aws.amazon.com/bedrock/latest/userguide/prompt-caching.html
+PROMPT_CACHE_MODELS: Dict[str, bool] = {
+    "anthropic.claude-3-5-haiku": True,
+    "anthropic.claude-3-7-sonnet": True,
+    "anthropic.claude-sonnet-4": True,
+    "anthropic.claude-opus-4": True,
+    "anthropic.claude-haiku-4": True,
+    "amazon.nova-micro": False,
+    "amazon.nova-lite": False,
+    "amazon.nova-pro": False,
+    "amazon.nova-premier": False,
+}
+
+# Approximate on-demand prices in USD per million input and output tokens, used to compare model routes.
+# Cache reads are billed at a tenth of the input price and cache writes at 1.25 times it.
+# https://aws.amazon.com/bedrock/pricing/
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "anthropic.claude-3-5-haiku": (0.8, 4.0),
+    "anthropic.claude-haiku-4": (1.0, 5.0),
+    "anthropic.claude-3-7-sonnet": (3.0, 15.0),
+    "anthropic.claude-sonnet-4": (3.0, 15.0),
+    "anthropic.claude-opus-4": (15.0, 75.0),
+    "amazon.nova-micro": (0.035, 0.14),
+    "amazon.nova-lite": (0.06, 0.24),
+    "amazon.nova-pro": (0.8, 3.2),
+    "amazon.nova-premier": (2.5, 12.5),
+}
+
+# Phase each agent's model calls belong to: specialists plan and run tool calls, the synthesis agent writes
+# the final root cause analysis of a parallel investigation from their findings
+AGENT_PHASES: Dict[str, str] = {
+    "diagnostic_agent": "planning",
+    "observability_agent": "planning",
+    "persistence_agent": "planning",
+    "synthesis_agent": "synthesis",
+}
+MODEL_PHASES = ("planning", "synthesis")
+
+# Cross-region inference profile prefixes, e.g. "us.anthropic.claude-sonnet-4-..."
+_INFERENCE_PROFILE_PREFIXES = ("us.", "eu.", "apac.", "us-gov.", "global.")
+
+
+def _base_model_id(model_id: str) -> str:
+    for prefix in _INFERENCE_PROFILE_PREFIXES:
+        if model_id.startswith(prefix):
+            return model_id[len(prefix):]
+    return model_id
+
+
+def prompt_cache_support(model_id: str) -> Dict[str, bool]:
+    """Return which prompt parts (system prompt, tools) the model can cache."""
+    base_model_id = _base_model_id(model_id)
+    for family, caches_tools in PROMPT_CACHE_MODELS.items():
+        if base_model_id.startswith(family):
+            return {"system": True, "tools": caches_tools}
+    return {"system": False, "tools": False}
+
+
+def create_bedrock_model(model_id: str, **model_config: Any) -> BedrockModel:
+    """Create a BedrockModel, placing cache points on the system prompt and tools when supported.
+
+    The swarm system prompts and MCP tool definitions are identical on every
+    model cycle, so caching them means later cycles bill that prefix as cheap
+    cache reads instead of full input tokens. Controlled by
+    ``SHERLOCK_PROMPT_CACHE`` ("auto" by default, "off" to disable).
+    """
+    if os.getenv("SHERLOCK_PROMPT_CACHE", "auto").lower() != "off":
+        support = prompt_cache_support(model_id)
+        if support["system"]:
+            model_config.setdefault("cache_prompt", "default")
+        if support["tools"]:
+            model_config.setdefault("cache_tools", "default")
+        if not support["system"]:
+            logger.info(f"Prompt caching not supported for {model_id}, sending full prompts")
+
+    return BedrockModel(model_id=model_id, **model_config)
+
+
+def estimate_cost(agent_usage: Dict[str, Dict[str, Any]]) -> Optional[float]:
+    """Approximate cost in USD of per-agent usage records carrying their ``modelId``, or None for an unpriced model."""
+    cost = 0.0
+    for usage in agent_usage.values():
+        base_model_id = _base_model_id(usage.get("modelId", ""))
+        prices = next((price for family, price in MODEL_PRICES.items() if base_model_id.startswith(family)), None)
+        if prices is None:
+            return None
+        input_price, output_price = prices
+        cost += (
+            usage.get("inputTokens", 0) * input_price
+            + usage.get("outputTokens", 0) * output_price
+            + usage.get("cacheReadInputTokens", 0) * input_price * 0.1
+            + usage.get("cacheWriteInputTokens", 0) * input_price * 1.25
+        ) / 1_000_000
+    return round(cost, 6)
+
+
+@dataclass
+class ModelRoutes:
+    """Which model each agent uses: its own route, else its phase's route, else the investigation's model."""
+    default: str
+    routes: Dict[str, str] = field(default_factory=dict)
+
+    def model_for(self, agent: str) -> str:
+        return self.routes.get(agent) or self.routes.get(AGENT_PHASES.get(agent, "")) or self.default
+
+    def assignments(self) -> Dict[str, str]:
+        """Model ID of every agent."""
+        return {agent: self.model_for(agent) for agent in AGENT_PHASES}
+
+    def cache_id(self) -> str:
+        """Identifies the routing in cache keys; just the model ID when nothing is routed elsewhere."""
+        assignments = self.assignments()
+        if all(model_id == self.default for model_id in assignments.values()):
+            return self.default
+        return json.dumps(assignments, sort_keys=True)
+
+
+def get_model_routes(model_id: str, routes: Optional[Dict[str, str]] = None) -> ModelRoutes:
+    """Model routes for an investigation: ``routes``, else SHERLOCK_MODEL_ROUTES, over ``model_id``.
+
+    Routes map an agent name (``diagnostic_agent``, ``observability_agent``,
+    ``persistence_agent``, ``synthesis_agent``) or a phase (``planning``,
+    ``synthesis``) to a Bedrock model ID, e.g. a small model for planning and
+    the persistence agent and a large one for synthesis. Agent routes win
+    over phase routes.
+    """
+    if routes is None:
+        routes = json.loads(os.getenv("SHERLOCK_MODEL_ROUTES") or "{}")
+    unknown = set(routes) - set(AGENT_PHASES) - set(MODEL_PHASES)
+    if unknown:
+        raise ValueError(f"Invalid model routes: {sorted(unknown)}. Keys must be agents {sorted(AGENT_PHASES)} or phases {MODEL_PHASES}")
+    return ModelRoutes(default=model_id, routes={key: value for key, value in routes.items() if value})
+
+
+_models: Dict[str, BedrockModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_bedrock_model(model_id: str) -> BedrockModel:
+    """Get the process-wide BedrockModel for a model ID.
+
+    A BedrockModel holds only configuration and a thread-safe boto3 client, so
+    concurrent investigations share one and reuse its connection pool instead
+    of building a client per investigation. The pool size is set by
+    ``SHERLOCK_BEDROCK_MAX_CONNECTIONS``.
+    """
+    with _models_lock:
+        if model_id not in _models:
+            _models[model_id] = create_bedrock_model(
+                model_id,
+                boto_client_config=BotocoreConfig(
+                    read_timeout=DEFAULT_READ_TIMEOUT,
+                    max_pool_connections=int(os.getenv("SHERLOCK_BEDROCK_MAX_CONNECTIONS", "50")),
+                ),
+            )
+        return _models[model_id]
+
+
+def usage_by_agent(agents: Iterable[Any]) -> Dict[str, Dict[str, int]]:
+    """Collect token usage, including cache reads and writes, for each agent that ran."""
+    report = {}
+    for agent in agents:
+        usage = agent.event_loop_metrics.accumulated_usage
+        if not usage.get("totalTokens"):
+            continue
+        report[agent.name] = {
+            "inputTokens": usage.get("inputTokens", 0),
+            "outputTokens": usage.get("outputTokens", 0),
+            "totalTokens": usage.get("totalTokens", 0),
+            "cacheReadInputTokens": usage.get("cacheReadInputTokens", 0),
+            "cacheWriteInputTokens": usage.get("cacheWriteInputTokens", 0),
+        }
+    return report
+
+
+def total_usage(agent_usage: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    """Sum per-agent usage into investigation totals."""
+    totals = {
+        "inputTokens": 0,
+        "outputTokens": 0,
+        "totalTokens": 0,
+        "cacheReadInputTokens": 0,
+        "cacheWriteInputTokens": 0,
+    }
+    for usage in agent_usage.values():
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+    return totals
@@ -1,21 +1,40 @@
 """SRE Agent Orchestrator for coordinating specialized agents."""
+import asyncio
 import logging
+import time
+from dataclasses import asdict
 from datetime import datetime
+from typing import Dict, Optional
 from strands import Agent
-from strands.models import BedrockModel
+from strands.multiagent.base import MultiAgentResult, NodeResult, Status
 from strands.multiagent.swarm import Swarm
 from langfuse import get_client
-from sherlock.agents.diagnostic_agent import get_eks_mcp_client
-from sherlock.agents.observability_agent import get_cloudwatch_mcp_client
-from sherlock.agents.persistence_agent import get_dynamodb_mcp_client
+from sherlock.anomaly import rank_metric_anomalies
+from sherlock.budgets import BudgetTracker, ExecutionBudget, get_execution_budget
+from sherlock.cache import get_investigation_cache
+from sherlock.cassette import Cassette, get_cassette
+from sherlock.coalescing import get_investigation_coalescer, investigation_key
+from sherlock.knowledge import knowledge_hooks
+from sherlock.log_templates import mine_log_templates, template_log_tools
+from sherlock.models import estimate_cost, get_bedrock_model, get_model_routes, total_usage, usage_by_agent
+from sherlock.progress import ProgressReporter
+from sherlock.sessions import open_sessions, release_sessions
+from sherlock.telemetry import PhaseTelemetryHook, TimedModel, phase, time_tools
+from sherlock.tool_cache import get_tool_result_cache, memoize_tools
+from sherlock.tool_reduction import get_tool_reduction_stats, reduce_tools
 from sherlock.prompts import (
     DIAGNOSTIC_AGENT_SWARM_PROMPT,
     OBSERVABILITY_AGENT_SWARM_PROMPT,
     PERSISTENCE_AGENT_SWARM_PROMPT,
+    PARALLEL_AGENT_INSTRUCTIONS,
+    SYNTHESIS_AGENT_PROMPT,
 )
 
 logger = logging.getLogger(__name__)
 
+# Supported execution modes: agents hand off to each other ("swarm") or all investigate at once ("parallel")
+INVESTIGATION_MODES = ("swarm", "parallel")
+
 def format_investigation_results(result: dict) -> str:
     """Format investigation results for display."""
     if isinstance(result, dict):
@@ -29,135 +48,412 @@ def format_investigation_results(result: dict) -> str:
     else:
         return str(result)
 
-async def orchestrate(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0"):
+def prepare_tools(tools: list, server: str, agent: str, memoize: bool = True) -> list:
+    """Layer timing, memoization, log template mining and result reduction over one MCP server's tools for an agent."""
+    # Every MCP round trip is traced and timed, read-only tools are memoized so repeated calls skip the
+    # round trip, large log results are grouped into templates, and every result is cut down to the
+    # agent's token budget
+    timed_tools = time_tools(tools, server)
+    if memoize:
+        timed_tools = memoize_tools(timed_tools, server)
+    return reduce_tools(template_log_tools(timed_tools, server), server, agent)
+
+async def run_parallel(agents: list, synthesis_agent: Agent, task: str, node_timeout: Optional[float] = None) -> MultiAgentResult:
+    """Run all specialists concurrently, then merge their findings with a synthesis agent."""
+    start_time = time.time()
+    specialist_task = f"{PARALLEL_AGENT_INSTRUCTIONS}\n\n{task}"
+    
+    async def run_node(agent: Agent, node_task: str) -> NodeResult:
+        node_start = time.time()
+        try:
+            agent_result = await asyncio.wait_for(agent.invoke_async(node_task), timeout=node_timeout)
+            status = Status.COMPLETED
+        except Exception as e:
+            logger.exception(f"{agent.name} failed during parallel investigation")
+            agent_result = e
+            status = Status.FAILED
+        return NodeResult(
+            result=agent_result,
+            execution_time=round((time.time() - node_start) * 1000),
+            status=status,
+            accumulated_usage=dict(agent.event_loop_metrics.accumulated_usage),
+            accumulated_metrics=dict(agent.event_loop_metrics.accumulated_metrics),
+            execution_count=1
+        )
+    
+    node_results = await asyncio.gather(*(run_node(agent, specialist_task) for agent in agents))
+    results = {agent.name: node_result for agent, node_result in zip(agents, node_results)}
+    
+    # Merge whatever the specialists found; skip synthesis only if every one of them failed
+    if any(node_result.status == Status.COMPLETED for node_result in node_results):
+        findings = "\n\n".join(
+            f"## Findings from {name}\n{node_result.result}" for name, node_result in results.items()
+        )
+        results[synthesis_agent.name] = await run_node(synthesis_agent, f"{task}\n\n{findings}")
+    
+    usage = {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0}
+    for node_result in results.values():
+        for key in usage:
+            usage[key] += node_result.accumulated_usage.get(key, 0)
+    
+    synthesis_result = results.get(synthesis_agent.name)
+    return MultiAgentResult(
+        status=synthesis_result.status if synthesis_result else Status.FAILED,
+        results=results,
+        accumulated_usage=usage,
+        execution_count=len(results),
+        execution_time=round((time.time() - start_time) * 1000)
+    )
+
+def coalescing_key(query: str, diagnostic_agent: str, model_id: str, mode: str, budget: Optional[ExecutionBudget] = None, model_routes: Optional[Dict[str, str]] = None) -> str:
+    """Key under which identical concurrent investigations share one run."""
+    routes = get_model_routes(model_id, model_routes)
+    return investigation_key(query, diagnostic_agent, routes.cache_id(), mode, budget=asdict(budget) if budget else None)
+
+async def orchestrate(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0", use_cache: bool = True, mode: str = "swarm", progress: Optional[ProgressReporter] = None, budget: Optional[ExecutionBudget] = None, cassette: Optional[Cassette] = None, model_routes: Optional[Dict[str, str]] = None):
     """Orchestrate a comprehensive investigation using specialized agents.
     
     Args:
         query: The investigation query
         diagnostic_agent: Which diagnostic agent to use ("eks-mcp")
         model_id: Bedrock model ID to use for all agents
+        use_cache: Serve repeated questions from the investigation cache
+        mode: "swarm" for sequential handoffs or "parallel" for concurrent specialists plus synthesis
+        progress: Receives phase, agent, handoff and tool events while the investigation runs
+        budget: Handoff, tool call, token and time limits (default: from SHERLOCK_BUDGET_* settings)
+        cassette: Record the investigation's tool calls and model turns, or replay them without AWS
+            (default: from SHERLOCK_CASSETTE_* settings)
+        model_routes: Model ID per agent or phase ("planning", "synthesis"), overriding model_id for them
+            (default: from SHERLOCK_MODEL_ROUTES)
+    """
+    final_result = await investigate(query, diagnostic_agent, model_id, use_cache=use_cache, mode=mode, progress=progress, budget=budget, cassette=cassette, model_routes=model_routes)
+    return final_result["results"]
+
+async def investigate(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0", use_cache: bool = True, mode: str = "swarm", progress: Optional[ProgressReporter] = None, budget: Optional[ExecutionBudget] = None, cassette: Optional[Cassette] = None, model_routes: Optional[Dict[str, str]] = None) -> dict:
+    """Run an investigation and return the full result record.
+    
+    Same as orchestrate() but returns status, timing and cache metadata alongside
+    the per-agent results. A request identical to one already running (same
+    normalized query, agent, model, mode and budget) joins it and shares its
+    progress events and result instead of starting another run.
     """
+    if mode not in INVESTIGATION_MODES:
+        raise ValueError(f"Invalid mode: {mode}. Must be one of {INVESTIGATION_MODES}")
+    
+    # A recorded or replayed investigation runs on its own, whether its cassette is passed or configured
+    cassette = cassette or get_cassette()
+    coalescer = get_investigation_coalescer()
+    if coalescer is None or cassette is not None:
+        try:
+            return await run_investigation(query, diagnostic_agent, model_id, use_cache=use_cache, mode=mode, progress=progress, budget=budget, cassette=cassette, model_routes=model_routes)
+        finally:
+            if cassette:
+                cassette.close()
+    
+    result = await coalescer.run(
+        coalescing_key(query, diagnostic_agent, model_id, mode, budget=budget, model_routes=model_routes),
+        lambda reporter: run_investigation(query, diagnostic_agent, model_id, use_cache=use_cache, mode=mode, progress=reporter, budget=budget, model_routes=model_routes),
+        progress
+    )
+    return {**result, "query": query}
+
+async def run_investigation(query: str, diagnostic_agent: str = "eks-mcp", model_id: str = "us.anthropic.claude-sonnet-4-20250514-v1:0", use_cache: bool = True, mode: str = "swarm", progress: Optional[ProgressReporter] = None, budget: Optional[ExecutionBudget] = None, cassette: Optional[Cassette] = None, model_routes: Optional[Dict[str, str]] = None) -> dict:
+    """Run one investigation from start to finish, without coalescing it with identical ones."""
     logger.info(f"Starting orchestration for query: {query}")
     logger.info(f"Using diagnostic agent: {diagnostic_agent}")
     logger.info(f"Using Bedrock model: {model_id}")
+    logger.info(f"Using execution mode: {mode}")
+    
+    if mode not in INVESTIGATION_MODES:
+        raise ValueError(f"Invalid mode: {mode}. Must be one of {INVESTIGATION_MODES}")
+    routes = get_model_routes(model_id, model_routes)
+    agent_models = routes.assignments()
+    if routes.routes:
+        logger.info(f"Using model routes: {agent_models}")
+    mode_tag = "Agent-Swarm" if mode == "swarm" else "Agent-Parallel"
+    
+    # A recorded or replayed investigation must actually run, so it never comes from the cache
+    if cassette:
+        use_cache = False
+        if cassette.recording:
+            cassette.set_meta(query=query, diagnostic_agent=diagnostic_agent, model_id=model_id, model_routes=routes.routes, mode=mode, recorded_at=datetime.now().isoformat())
+        elif cassette.meta().get("query") != query:
+            logger.warning(f"Replaying a cassette recorded for a different query: {cassette.meta().get('query')}")
     
     # Wrap entire orchestration in Langfuse span to control trace output
     langfuse = get_client()
     
     with langfuse.start_as_current_span(
         name="sherlock-investigation",
-        input={"query": query, "diagnostic_agent": diagnostic_agent, "model_id": model_id}
+        input={"query": query, "diagnostic_agent": diagnostic_agent, "model_id": model_id, "model_routes": routes.routes, "mode": mode}
     ) as investigation_span:
         try:
-            # Create multiple MCP clients for different services
+            # Serve repeated questions within the same time bucket from the cache
+            cache = get_investigation_cache() if use_cache else None
+            cache_key = cache.make_key(query, routes.cache_id(), diagnostic_agent, mode=mode) if cache else None
+            cached_result = cache.get(cache_key) if cache else None
+            if cached_result is not None:
+                logger.info(f"Investigation cache hit for query: {query} ({cache.stats()})")
+                final_result = {**cached_result, "query": query, "cached": True}
+                if progress:
+                    progress.emit("phase", "💾 Answered from the investigation cache", step="cache_hit")
+                investigation_span.update(
+                    output=format_investigation_results(final_result["results"]),
+                    metadata={"cached": True, "cache_stats": cache.stats()}
+                )
+                return final_result
+            
             if diagnostic_agent == "eks-mcp":
-                diagnostic_client = get_eks_mcp_client()
                 diagnostic_name = "EKS MCP"
             else:
                 raise ValueError(f"Invalid diagnostic agent: {diagnostic_agent}. Must be 'eks-mcp'")
-                
-            cloudwatch_client = get_cloudwatch_mcp_client()
-            dynamodb_client = get_dynamodb_mcp_client()
             
-            # Use all MCP clients together (as shown in MCP docs)
-            with diagnostic_client, cloudwatch_client, dynamodb_client:
-                # Get tools from all MCP servers
-                diagnostic_tools = diagnostic_client.list_tools_sync()
-                cloudwatch_tools = cloudwatch_client.list_tools_sync()
-                dynamodb_tools = dynamodb_client.list_tools_sync()
+            # Borrow warm MCP sessions from the process-wide pools and load their tools, all servers at once.
+            # A server that fails or is slow to start is reported and its specialist sits this investigation out.
+            servers = [diagnostic_agent, "cloudwatch", "dynamodb"]
+            if cassette and cassette.replaying:
+                sessions = cassette.sessions(servers)
+            else:
+                with phase("mcp_startup", servers=",".join(servers)):
+                    sessions = await open_sessions(servers)
+                if cassette:
+                    for session in sessions.values():
+                        session.tools = cassette.wrap_tools(session.server, session.tools)
+            startup_report = {server: session.report() for server, session in sessions.items()}
+            if progress:
+                ready = [server for server, session in sessions.items() if session.ready]
+                progress.emit("phase", f"🚀 MCP servers ready: {', '.join(ready) or 'none'}", step="mcp_ready", mcp_startup=startup_report)
+            
+            # Hold all MCP sessions together; they go back to the pool when the investigation finishes
+            try:
+                if not any(session.ready for session in sessions.values()):
+                    raise RuntimeError(f"No MCP server could be started: {startup_report}")
+                
+                # A cassette must see every tool call, so cached tool results are not used while one is in use
+                memoize = cassette is None
+                diagnostic_tools = prepare_tools(sessions[diagnostic_agent].tools, diagnostic_agent, "diagnostic_agent", memoize=memoize)
+                cloudwatch_tools = prepare_tools(sessions["cloudwatch"].tools, "cloudwatch", "observability_agent", memoize=memoize)
+                dynamodb_tools = prepare_tools(sessions["dynamodb"].tools, "dynamodb", "persistence_agent", memoize=memoize)
                 
                 logger.info(f"Retrieved {len(diagnostic_tools)} {diagnostic_name} tools, {len(cloudwatch_tools)} CloudWatch tools, {len(dynamodb_tools)} DynamoDB tools")
                 
-                # Create BedrockModel instance for all agents
-                bedrock_model = BedrockModel(model_id=model_id)
+                # Each specialist gets only the workload knowledge sections relevant to the query and its domain,
+                # and stops calling tools once the investigation or its own execution budget is spent
+                budget_tracker = BudgetTracker(budget or get_execution_budget())
+                knowledge_report = {}
+                agent_hooks = {}
+                for agent_name in ("diagnostic_agent", "observability_agent", "persistence_agent"):
+                    agent_hooks[agent_name], knowledge_report[agent_name] = knowledge_hooks(query, agent_name)
+                    agent_hooks[agent_name] += budget_tracker.hooks(agent_name)
+                    agent_hooks[agent_name].append(PhaseTelemetryHook(agent_name))
+                    if progress:
+                        agent_hooks[agent_name] += progress.hooks(agent_name)
+                
+                # One shared BedrockModel per routed model ID, with cache points after the static system prompts and tools
+                models = {}
+                for routed_model_id in set(agent_models.values()):
+                    if cassette and cassette.replaying:
+                        bedrock_model = cassette.model()
+                    elif cassette:
+                        bedrock_model = cassette.model(get_bedrock_model(routed_model_id))
+                    else:
+                        bedrock_model = get_bedrock_model(routed_model_id)
+                    # Time to first token is recorded per agent for every model call
+                    models[routed_model_id] = TimedModel(bedrock_model)
+                local_tools = [mine_log_templates, rank_metric_anomalies]
+                if cassette:
+                    local_tools = cassette.wrap_tools("local", local_tools)
+                log_template_tool, metric_anomaly_tool = local_tools
                 
                 # Create agents with MCP tools, BedrockModel, and trace attributes
                 diagnostic_agent_instance = Agent(
                     name="diagnostic_agent",
-                    model=bedrock_model,
+                    model=models[agent_models["diagnostic_agent"]],
                     system_prompt=DIAGNOSTIC_AGENT_SWARM_PROMPT,
-                    tools=diagnostic_tools,
+                    tools=[*diagnostic_tools, log_template_tool],
+                    hooks=agent_hooks["diagnostic_agent"],
                     trace_attributes={
                         "session.id": f"sherlock-{hash(query) % 10000}",
                         "user.id": "Sherlock",
                         "agent.type": "diagnostic",
-                        "model.id": model_id,
+                        "model.id": agent_models["diagnostic_agent"],
                         "trace.name": "AIOps-Sherlock-Diagnostics",
                         "langfuse.tags": [
                             "AIOps-K8s-Sherlock",
                             "Diagnostics",
-                            "Agent-Swarm"
+                            mode_tag
                         ]
                     }
                 )
                 
                 observability_agent = Agent(
                     name="observability_agent",
-                    model=bedrock_model,
+                    model=models[agent_models["observability_agent"]],
                     system_prompt=OBSERVABILITY_AGENT_SWARM_PROMPT,
-                    tools=cloudwatch_tools,
+                    tools=[*cloudwatch_tools, log_template_tool, metric_anomaly_tool],
+                    hooks=agent_hooks["observability_agent"],
                     trace_attributes={
                         "session.id": f"sherlock-{hash(query) % 10000}",
                         "user.id": "Sherlock",
                         "agent.type": "observability",
-                        "model.id": model_id,
+                        "model.id": agent_models["observability_agent"],
                         "trace.name": "AIOps-Sherlock-Observability",
                         "langfuse.tags": [
                             "AIOps-K8s-Sherlock",
                             "Observability",
-                            "Agent-Swarm"
+                            mode_tag
                         ]
                     }
                 )
                 
                 persistence_agent = Agent(
                     name="persistence_agent",
-                    model=bedrock_model,
+                    model=models[agent_models["persistence_agent"]],
                     system_prompt=PERSISTENCE_AGENT_SWARM_PROMPT,
                     tools=dynamodb_tools,
+                    hooks=agent_hooks["persistence_agent"],
                     trace_attributes={
                         "session.id": f"sherlock-{hash(query) % 10000}",
                         "user.id": "Sherlock",
                         "agent.type": "persistence",
-                        "model.id": model_id,
+                        "model.id": agent_models["persistence_agent"],
                         "trace.name": "AIOps-Sherlock-Persistence",
                         "langfuse.tags": [
                             "AIOps-K8s-Sherlock",
                             "Persistence",
-                            "Agent-Swarm"
+                            mode_tag
                         ]
                     }
                 )
                 
-                # Create and execute swarm
-                swarm = Swarm([diagnostic_agent_instance, observability_agent, persistence_agent])
-                logger.info("Running comprehensive SRE swarm analysis...")
+                # Only specialists whose MCP server came up take part
+                specialists = [
+                    agent for agent, server in (
+                        (diagnostic_agent_instance, diagnostic_agent),
+                        (observability_agent, "cloudwatch"),
+                        (persistence_agent, "dynamodb"),
+                    )
+                    if sessions[server].ready
+                ]
                 
                 # Enhance query with current time
                 current_time = datetime.now().strftime("%A, %Y-%m-%d %H:%M:%S UTC")
                 enhanced_query = f"Current time: {current_time}\n\nUser query: {query}"
                 
-                result = await swarm.invoke_async(enhanced_query)
+                if mode == "parallel":
+                    # Specialists investigate at the same time; a tool-less agent merges their findings
+                    synthesis_agent = Agent(
+                        name="synthesis_agent",
+                        model=models[agent_models["synthesis_agent"]],
+                        system_prompt=SYNTHESIS_AGENT_PROMPT,
+                        hooks=[PhaseTelemetryHook("synthesis_agent"), *(progress.hooks("synthesis_agent") if progress else [])],
+                        trace_attributes={
+                            "session.id": f"sherlock-{hash(query) % 10000}",
+                            "user.id": "Sherlock",
+                            "agent.type": "synthesis",
+                            "model.id": agent_models["synthesis_agent"],
+                            "trace.name": "AIOps-Sherlock-Synthesis",
+                            "langfuse.tags": [
+                                "AIOps-K8s-Sherlock",
+                                "Synthesis",
+                                mode_tag
+                            ]
+                        }
+                    )
+                    logger.info("Running parallel SRE fan-out analysis...")
+                    if progress:
+                        progress.emit("phase", f"🧭 Running {len(specialists)} specialists in parallel", step="agents_start")
+                    with phase("agents", mode=mode, specialists=len(specialists)):
+                        result = await run_parallel(
+                            specialists,
+                            synthesis_agent,
+                            enhanced_query,
+                            node_timeout=budget_tracker.hard_timeout
+                        )
+                    agents_used = list(result.results)
+                    agent_usage = usage_by_agent([*specialists, synthesis_agent])
+                else:
+                    # Create and execute swarm; its own limits are a hard backstop behind the budget hooks
+                    swarm = Swarm(
+                        specialists,
+                        max_handoffs=budget_tracker.budget.max_handoffs + 1,
+                        max_iterations=budget_tracker.budget.max_handoffs + 1,
+                        execution_timeout=budget_tracker.hard_timeout,
+                        node_timeout=budget_tracker.hard_timeout
+                    )
+                    logger.info("Running comprehensive SRE swarm analysis...")
+                    if progress:
+                        progress.emit("phase", f"🧭 Running SRE swarm with {len(specialists)} specialists", step="agents_start")
+                    
+                    with phase("agents", mode=mode, specialists=len(specialists)):
+                        result = await swarm.invoke_async(enhanced_query)
+                    agents_used = [node.node_id for node in result.node_history]
+                    agent_usage = usage_by_agent(specialists)
+            finally:
+                release_sessions(sessions)
+            
+            for agent_name, usage in agent_usage.items():
+                usage["modelId"] = agent_models[agent_name]
             
             final_result = {
                 "status": "success",
                 "query": query,
+                "mode": mode,
                 "cached": False,
                 "swarm_status": result.status.value,
                 "execution_time": result.execution_time,
-                "agents_used": [node.node_id for node in result.node_history],
+                "usage": total_usage(agent_usage),
+                "agent_usage": agent_usage,
+                "models": {name: agent_models[name] for name in agent_usage},
+                "estimated_cost_usd": estimate_cost(agent_usage),
+                "budget": budget_tracker.report(),
+                "mcp_startup": startup_report,
+                "cassette": cassette.stats() if cassette else None,
+                "agents_used": agents_used,
                 "results": {name: getattr(node_result.result, 'content', str(node_result.result)) for name, node_result in result.results.items()}
             }
             
+            if progress:
+                exhausted = final_result["budget"]["exhausted"]
+                progress.emit(
+                    "phase",
+                    f"🏁 Investigation {result.status.value} in {result.execution_time / 1000:.1f}s"
+                    + (f" (stopped early: {'; '.join(exhausted.values())})" if exhausted else ""),
+                    step="finished"
+                )
+            
+            # Only cache complete investigations with every specialist available, so a degraded run is retried next time;
+            # a run its budget stopped early would otherwise be served to requests with a larger budget or none
+            if (
+                cache
+                and result.status == Status.COMPLETED
+                and all(session.ready for session in sessions.values())
+                and not final_result["budget"]["exhausted"]
+            ):
+                cache.put(cache_key, final_result)
+            
             # Format results and update trace output within our controlled span
             formatted_output = format_investigation_results(final_result["results"])
             logger.info(f"Formatted output length: {len(formatted_output)} characters")
             
             # Update the investigation span with the formatted output
-            investigation_span.update(output=formatted_output)
+            investigation_span.update(
+                output=formatted_output,
+                metadata={
+                    "cached": False,
+                    "cache_stats": cache.stats() if cache else None,
+                    "mcp_startup": startup_report,
+                    "agent_usage": agent_usage,
+                    "budget": final_result["budget"],
+                    "cassette": final_result["cassette"],
+                    "knowledge": knowledge_report,
+                    "tool_cache_stats": tool_cache.stats() if (tool_cache := get_tool_result_cache()) else None,
+                    "tool_reduction_stats": reduction.stats() if (reduction := get_tool_reduction_stats()) else None
+                }
+            )
             logger.info("Successfully updated investigation span with output")
                     
-            return final_result["results"]
+            return final_result
             
         except Exception as e:
             logger.error(f"Orchestration failed: {str(e)}")
@@ -0,0 +1,122 @@
+"""Progress events emitted while an investigation runs."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterToolCallEvent,
+    BeforeInvocationEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+# Name of the tool Swarm gives every node for passing control to another agent
+HANDOFF_TOOL = "handoff_to_agent"
+
+
+@dataclass
+class ProgressEvent:
+    """One step of an investigation: a phase, agent start/finish, handoff or tool call."""
+    kind: str
+    message: str
+    agent: Optional[str] = None
+    elapsed: float = 0.0
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+
+def _latest_text(messages: List[Dict[str, Any]]) -> str:
+    """Text of the agent's most recent assistant message that has any."""
+    for message in reversed(messages):
+        if message["role"] != "assistant":
+            continue
+        text = "\n".join(block["text"] for block in message["content"] if "text" in block).strip()
+        if text:
+            return text
+    return ""
+
+
+class ProgressReporter:
+    """Collect progress events for one investigation and pass them to a sink.
+
+    The sink is called on the reporter's event loop, so it may touch asyncio
+    objects such as a Queue even when an event comes from a worker thread.
+    """
+
+    def __init__(self, sink: Callable[[ProgressEvent], None], loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.sink = sink
+        self.loop = loop or asyncio.get_running_loop()
+        self.start_time = time.monotonic()
+        self.events: List[ProgressEvent] = []
+
+    def emit(self, kind: str, message: str, agent: Optional[str] = None, **detail: Any) -> None:
+        event = ProgressEvent(kind, message, agent, round(time.monotonic() - self.start_time, 2), detail)
+        self.events.append(event)
+        self.loop.call_soon_threadsafe(self.sink, event)
+
+    def forward(self, event: ProgressEvent) -> None:
+        """Pass on an event reported elsewhere, e.g. by a queue worker, keeping its timing."""
+        self.events.append(event)
+        self.loop.call_soon_threadsafe(self.sink, event)
+
+    def hooks(self, agent_name: str) -> List[HookProvider]:
+        """Hooks that report one agent's activity."""
+        return [AgentProgressHook(self, agent_name)]
+
+    @classmethod
+    def to_queue(cls, queue: "asyncio.Queue[ProgressEvent]") -> "ProgressReporter":
+        """Reporter that puts every event on an asyncio queue."""
+        return cls(queue.put_nowait)
+
+
+class AgentProgressHook(HookProvider):
+    """Report an agent's start, tool calls, handoffs and findings as progress events."""
+
+    def __init__(self, reporter: ProgressReporter, agent_name: str):
+        self.reporter = reporter
+        self.agent_name = agent_name
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self.agent_started)
+        registry.add_callback(AfterInvocationEvent, self.agent_finished)
+        registry.add_callback(BeforeToolCallEvent, self.tool_started)
+        registry.add_callback(AfterToolCallEvent, self.tool_finished)
+
+    def agent_started(self, event: BeforeInvocationEvent) -> None:
+        self.reporter.emit("agent_start", f"🔎 {self.agent_name} is investigating", self.agent_name)
+
+    def agent_finished(self, event: AfterInvocationEvent) -> None:
+        findings = _latest_text(event.agent.messages)
+        self.reporter.emit("agent_done", f"✅ {self.agent_name} finished", self.agent_name, findings=findings)
+
+    def tool_started(self, event: BeforeToolCallEvent) -> None:
+        tool_name = event.tool_use["name"]
+        tool_input = event.tool_use.get("input") or {}
+        if tool_name == HANDOFF_TOOL:
+            target = tool_input.get("agent_name")
+            self.reporter.emit(
+                "handoff",
+                f"🤝 {self.agent_name} handed off to {target}: {tool_input.get('message', '')}",
+                self.agent_name,
+                target=target,
+            )
+        else:
+            self.reporter.emit("tool_start", f"🔧 {self.agent_name} → {tool_name}", self.agent_name, tool=tool_name)
+
+    def tool_finished(self, event: AfterToolCallEvent) -> None:
+        tool_name = event.tool_use["name"]
+        if tool_name == HANDOFF_TOOL:
+            return
+        status = event.result.get("status", "error") if event.result else "error"
+        self.reporter.emit(
+            "tool_done",
+            f"{'✔️' if status == 'success' else '⚠️'} {self.agent_name} ← {tool_name} ({status})",
+            self.agent_name,
+            tool=tool_name,
+            status=status,
+        )
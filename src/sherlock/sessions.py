@@ -0,0 +1,103 @@
+"""Concurrent startup of the MCP sessions an investigation needs."""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sherlock.mcp_pool import PooledClient, get_pool
+from sherlock.telemetry import phase
+from sherlock.tool_schema_cache import get_tool_schema_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServerSession:
+    """A borrowed MCP session plus its tools and startup timing."""
+    server: str
+    entry: Optional[PooledClient] = None
+    tools: List[Any] = field(default_factory=list)
+    status: str = "pending"
+    acquire_seconds: float = 0.0
+    list_tools_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def report(self) -> Dict[str, Any]:
+        """Startup summary for logs, spans and the investigation result."""
+        return {
+            "status": self.status,
+            "acquire_seconds": round(self.acquire_seconds, 3),
+            "list_tools_seconds": round(self.list_tools_seconds, 3),
+            "tools": len(self.tools),
+            "error": self.error,
+        }
+
+
+def _open_session(session: ServerSession) -> ServerSession:
+    """Borrow a pooled session and load its tools (runs in a worker thread)."""
+    start_time = time.monotonic()
+    try:
+        with phase("mcp_acquire", server=session.server):
+            session.entry = get_pool(session.server).acquire()
+        session.acquire_seconds = time.monotonic() - start_time
+
+        list_start = time.monotonic()
+        with phase("list_tools", server=session.server):
+            session.tools = get_tool_schema_cache().get_tools(session.server, session.entry.client)
+        session.list_tools_seconds = time.monotonic() - list_start
+        session.status = "ready"
+    except Exception as e:
+        session.acquire_seconds = session.acquire_seconds or time.monotonic() - start_time
+        session.status = "failed"
+        session.error = f"{type(e).__name__}: {e}"
+        if session.entry is not None:
+            get_pool(session.server).release(session.entry, healthy=False)
+            session.entry = None
+    return session
+
+
+async def open_sessions(servers: List[str], timeout: Optional[float] = None) -> Dict[str, ServerSession]:
+    """Start and initialize all MCP sessions at the same time.
+
+    Each server is brought up in its own thread. A server that fails is
+    reported and skipped, and one that is not ready within ``timeout`` seconds
+    is marked as timed out so the investigation can go ahead with the rest.
+    """
+    timeout = float(os.getenv("SHERLOCK_MCP_STARTUP_TIMEOUT", "60")) if timeout is None else timeout
+    sessions = {server: ServerSession(server) for server in servers}
+    tasks = {
+        asyncio.ensure_future(asyncio.to_thread(_open_session, session)): session
+        for session in sessions.values()
+    }
+
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        server = tasks[task].server
+        # The startup thread keeps running on its own session object; hand that back to the pool once it finishes
+        sessions[server] = ServerSession(server, status="timeout", error=f"not ready after {timeout:.0f}s")
+        task.add_done_callback(lambda done: release_sessions({"late": done.result()}))
+
+    for server, session in sessions.items():
+        report = session.report()
+        if session.ready:
+            logger.info(
+                f"MCP server {server} ready: acquire {report['acquire_seconds']}s, "
+                f"tools {report['list_tools_seconds']}s ({report['tools']} tools)"
+            )
+        else:
+            logger.error(f"MCP server {server} unavailable ({session.status}): {session.error}")
+    return sessions
+
+
+def release_sessions(sessions: Dict[str, ServerSession]) -> None:
+    """Return every borrowed session to its pool."""
+    for session in sessions.values():
+        if session.entry is not None:
+            get_pool(session.server).release(session.entry)
+            session.entry = None
@@ -0,0 +1,165 @@
+"""OpenTelemetry spans and latency histograms for the phases of an investigation."""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterable, Dict, Iterator, List, Optional
+
+from opentelemetry import metrics, trace
+from opentelemetry.trace import Status, StatusCode
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterModelCallEvent,
+    BeforeInvocationEvent,
+    BeforeModelCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+from strands.models.model import Model
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolSpec, ToolUse
+
+from sherlock.tool_wrappers import DelegatingTool
+
+logger = logging.getLogger(__name__)
+
+# The global providers are proxies until Config.setup_telemetry() installs the real ones,
+# so instruments created at import time start exporting once telemetry is configured
+tracer = trace.get_tracer("sherlock")
+meter = metrics.get_meter("sherlock")
+
+phase_duration = meter.create_histogram(
+    "sherlock.phase.duration",
+    unit="s",
+    description="Duration of an investigation phase (MCP startup, list tools, agent node, model call, ...)",
+)
+tool_duration = meter.create_histogram(
+    "sherlock.tool.duration",
+    unit="s",
+    description="Duration of an MCP tool call, by server and tool",
+)
+time_to_first_token = meter.create_histogram(
+    "sherlock.model.time_to_first_token",
+    unit="s",
+    description="Time from sending a model request to its first streamed token, by agent",
+)
+
+# Agent whose model call is in flight, so the shared model can label its metrics
+_current_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("sherlock_current_agent", default=None)
+
+
+@contextmanager
+def phase(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """Span ``sherlock.<name>`` around a block, with its duration recorded in the phase histogram."""
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    start_time = time.monotonic()
+    status = "ok"
+    with tracer.start_as_current_span(f"sherlock.{name}", attributes=attributes) as span:
+        try:
+            yield span
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            phase_duration.record(time.monotonic() - start_time, {**attributes, "phase": name, "status": status})
+
+
+def record_phase(name: str, start_ns: int, end_ns: int, error: Optional[str] = None, **attributes: Any) -> None:
+    """Span and histogram entry for a phase that was timed after the fact."""
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    span = tracer.start_span(f"sherlock.{name}", attributes=attributes, start_time=start_ns)
+    if error:
+        span.set_status(Status(StatusCode.ERROR, error))
+    span.end(end_time=end_ns)
+    phase_duration.record((end_ns - start_ns) / 1e9, {**attributes, "phase": name, "status": "error" if error else "ok"})
+
+
+class PhaseTelemetryHook(HookProvider):
+    """Record each agent invocation (a swarm node) and each model call as a phase."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.invocation_start: Optional[int] = None
+        self.model_call_start: Optional[int] = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self.before_invocation)
+        registry.add_callback(AfterInvocationEvent, self.after_invocation)
+        registry.add_callback(BeforeModelCallEvent, self.before_model_call)
+        registry.add_callback(AfterModelCallEvent, self.after_model_call)
+
+    def before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self.invocation_start = time.time_ns()
+
+    def after_invocation(self, event: AfterInvocationEvent) -> None:
+        if self.invocation_start is not None:
+            record_phase("agent", self.invocation_start, time.time_ns(), agent=self.agent)
+            self.invocation_start = None
+
+    def before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self.model_call_start = time.time_ns()
+        _current_agent.set(self.agent)
+
+    def after_model_call(self, event: AfterModelCallEvent) -> None:
+        if self.model_call_start is not None:
+            error = f"{type(event.exception).__name__}: {event.exception}" if event.exception else None
+            record_phase("model_call", self.model_call_start, time.time_ns(), error=error, agent=self.agent)
+            self.model_call_start = None
+
+
+class TimedTool(DelegatingTool):
+    """Span and duration histogram entry for every call of an MCP tool."""
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        attributes = {"server": self.server, "tool": self.tool_name}
+        start_time = time.monotonic()
+        status = "error"
+        # The span closes before yielding so its context never outlives this generator step
+        with tracer.start_as_current_span("sherlock.tool_call", attributes=attributes) as span:
+            try:
+                result = await self.call(tool_use, invocation_state, **kwargs)
+                status = (result or {}).get("status", "error")
+                if status == "error":
+                    span.set_status(Status(StatusCode.ERROR))
+            finally:
+                tool_duration.record(time.monotonic() - start_time, {**attributes, "status": status})
+        yield ToolResultEvent(result)
+
+
+def time_tools(tools: List[AgentTool], server: str) -> List[AgentTool]:
+    """Wrap one MCP server's tools so every call is traced and timed."""
+    return [TimedTool(tool, server) for tool in tools]
+
+
+class TimedModel(Model):
+    """Forward to a model and record the time to its first streamed token."""
+
+    def __init__(self, model: Model):
+        self.model = model
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[ToolSpec]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[Dict[str, Any]]:
+        start_time = time.monotonic()
+        first_token = False
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            if not first_token and ("contentBlockDelta" in event or "contentBlockStart" in event):
+                first_token = True
+                attributes = {"model_id": self.get_config().get("model_id", "unknown")}
+                if agent := _current_agent.get():
+                    attributes["agent"] = agent
+                time_to_first_token.record(time.monotonic() - start_time, attributes)
+            yield event
@@ -0,0 +1,214 @@
+"""Memoization of idempotent, read-only MCP tool calls."""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from opentelemetry import metrics
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolResult, ToolUse
+
+from sherlock.tool_wrappers import DelegatingTool
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter("sherlock.tool_cache")
+lookup_counter = meter.create_counter(
+    "sherlock.tool_cache.lookups",
+    description="MCP tool result cache lookups, by tool and outcome",
+)
+
+# Read-only tools that are safe to cache, keyed by "server:tool", with how many seconds a result stays fresh.
+# Keys include the server because another server may expose a tool of the same name with side effects.
+# Anything not listed here (apply_yaml, manage_eks_stacks, put_item, ...) always goes to the server, as do
+# Logs Insights queries: starting one is not idempotent and its results are polled until the query completes.
+DEFAULT_TOOL_TTLS: Dict[str, float] = {
+    # EKS MCP server
+    "eks-mcp:list_k8s_resources": 30,
+    "eks-mcp:list_api_versions": 3600,
+    "eks-mcp:get_k8s_events": 20,
+    "eks-mcp:get_pod_logs": 20,
+    "eks-mcp:get_cloudwatch_logs": 30,
+    "eks-mcp:get_cloudwatch_metrics": 60,
+    "eks-mcp:get_eks_metrics_guidance": 3600,
+    "eks-mcp:get_eks_insights": 120,
+    "eks-mcp:get_eks_vpc_config": 300,
+    "eks-mcp:get_policies_for_role": 300,
+    "eks-mcp:search_eks_troubleshoot_guide": 3600,
+    # CloudWatch MCP server
+    "cloudwatch:describe_log_groups": 300,
+    "cloudwatch:analyze_log_group": 60,
+    "cloudwatch:get_metric_data": 60,
+    "cloudwatch:get_metric_metadata": 3600,
+    "cloudwatch:get_recommended_metric_alarms": 3600,
+    "cloudwatch:get_active_alarms": 30,
+    "cloudwatch:get_alarm_history": 60,
+    "cloudwatch:describe_alarms": 30,
+    "cloudwatch:filter_log_events": 30,
+    # DynamoDB MCP server
+    "dynamodb:describe_table": 60,
+    "dynamodb:list_tables": 300,
+    "dynamodb:describe_limits": 3600,
+    "dynamodb:describe_time_to_live": 300,
+    "dynamodb:describe_continuous_backups": 300,
+    "dynamodb:get_item": 15,
+    "dynamodb:query": 15,
+    "dynamodb:scan": 15,
+}
+
+
+def _normalize(value: Any) -> Any:
+    """Drop unset arguments and surrounding whitespace so equivalent calls share a key."""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def tool_id(server: str, tool_name: str) -> str:
+    """Allow-list and statistics key of a server's tool, e.g. ``dynamodb:describe_table``."""
+    return f"{server}:{tool_name}"
+
+
+def make_cache_key(server: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Build a cache key from the server, tool and canonicalized arguments."""
+    canonical = json.dumps(_normalize(arguments or {}), sort_keys=True, separators=(",", ":"), default=str)
+    return f"{server}:{tool_name}:{canonical}"
+
+
+class ToolResultCache:
+    """Process-wide LRU cache of successful tool results with per-tool TTLs, keyed by ``server:tool``."""
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 1024):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, ToolResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def is_cacheable(self, server: str, tool_name: str) -> bool:
+        return self.ttls.get(tool_id(server, tool_name), 0) > 0
+
+    def get(self, key: str, tool: str) -> Optional[ToolResult]:
+        """Return a fresh cached result for a call to ``tool`` (``server:tool``), or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._record(tool, "hits")
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self._record(tool, "misses")
+            return None
+
+    def put(self, key: str, tool: str, result: ToolResult, elapsed: float) -> None:
+        """Cache a successful result for the TTL of ``tool`` (``server:tool``)."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttls[tool], copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            stats = self._stats.setdefault(tool, {"hits": 0, "misses": 0, "fetch_seconds": 0.0, "fetches": 0})
+            stats["fetch_seconds"] += elapsed
+            stats["fetches"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return overall and per-tool hit rates, plus an estimate of time saved by hits."""
+        with self._lock:
+            per_tool = {}
+            for tool_name, stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                average_fetch = stats["fetch_seconds"] / stats["fetches"] if stats["fetches"] else 0.0
+                per_tool[tool_name] = {
+                    "hits": stats["hits"],
+                    "misses": stats["misses"],
+                    "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+                    "saved_seconds": round(stats["hits"] * average_fetch, 3),
+                }
+            hits = sum(stats["hits"] for stats in per_tool.values())
+            misses = sum(stats["misses"] for stats in per_tool.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "entries": len(self._entries),
+                "tools": per_tool,
+            }
+
+    def _record(self, tool: str, outcome: str) -> None:
+        stats = self._stats.setdefault(tool, {"hits": 0, "misses": 0, "fetch_seconds": 0.0, "fetches": 0})
+        stats[outcome] += 1
+        lookup_counter.add(1, {"tool": tool, "outcome": "hit" if outcome == "hits" else "miss"})
+
+
+class MemoizedTool(DelegatingTool):
+    """Serve repeated read-only tool calls from the ToolResultCache."""
+
+    def __init__(self, tool: AgentTool, server: str, cache: ToolResultCache):
+        super().__init__(tool, server)
+        self.cache = cache
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        key = make_cache_key(self.server, self.tool_name, tool_use.get("input") or {})
+        cached = self.cache.get(key, tool_id(self.server, self.tool_name))
+        if cached is not None:
+            logger.debug(f"Tool cache hit: {self.tool_name}")
+            cached["toolUseId"] = tool_use["toolUseId"]
+            yield ToolResultEvent(cached)
+            return
+
+        start_time = time.monotonic()
+        result = await self.call(tool_use, invocation_state, **kwargs)
+        if result is not None and result.get("status") == "success":
+            self.cache.put(key, tool_id(self.server, self.tool_name), result, time.monotonic() - start_time)
+        yield ToolResultEvent(result)
+
+
+def memoize_tools(tools: List[AgentTool], server: str) -> List[AgentTool]:
+    """Wrap the cacheable tools of one MCP server with the process-wide result cache."""
+    cache = get_tool_result_cache()
+    if cache is None:
+        return tools
+    return [MemoizedTool(tool, server, cache) if cache.is_cacheable(server, tool.tool_name) else tool for tool in tools]
+
+
+_tool_cache: Optional[ToolResultCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_result_cache() -> Optional[ToolResultCache]:
+    """Get the process-wide tool result cache, or None when memoization is disabled.
+
+    ``SHERLOCK_TOOL_CACHE_TTLS`` takes a JSON object of ``server:tool`` to TTL
+    seconds that is merged over the defaults; a TTL of 0 removes a tool from the
+    allow-list. Raises ValueError for a key without a server.
+    """
+    global _tool_cache
+
+    if os.getenv("SHERLOCK_TOOL_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    with _tool_cache_lock:
+        if _tool_cache is None:
+            ttls = dict(DEFAULT_TOOL_TTLS)
+            overrides = os.getenv("SHERLOCK_TOOL_CACHE_TTLS")
+            if overrides:
+                overrides = json.loads(overrides)
+                unqualified = sorted(name for name in overrides if ":" not in name)
+                if unqualified:
+                    raise ValueError(f"Invalid SHERLOCK_TOOL_CACHE_TTLS keys: {unqualified}. Must be server:tool, e.g. dynamodb:describe_table")
+                ttls.update({name: float(ttl) for name, ttl in overrides.items()})
+            _tool_cache = ToolResultCache(
+                ttls=ttls,
+                max_entries=int(os.getenv("SHERLOCK_TOOL_CACHE_MAX_ENTRIES", "1024")),
+            )
+    return _tool_cache
@@ -0,0 +1,254 @@
+"""Token-budgeted reduction of oversized MCP tool results."""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from opentelemetry import metrics
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolUse
+
+from sherlock.tool_wrappers import DelegatingTool
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter("sherlock.tool_reduction")
+removed_tokens_counter = meter.create_counter(
+    "sherlock.tool_reduction.removed_tokens",
+    description="Approximate tokens removed from tool results before they reach the agents",
+)
+
+# Share of the budget kept from the start of an oversized output; the rest comes from the end,
+# where the most recent log lines and the tail of a listing usually are
+HEAD_FRACTION = 0.6
+
+# Lists in JSON results are cut to this many items before falling back to plain text trimming
+_JSON_LIST_LIMITS = (50, 20, 10, 4, 2)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _drop_repeated_lines(lines: List[str]) -> Tuple[List[str], int]:
+    """Keep the first occurrence of each non-blank line."""
+    seen = set()
+    kept = []
+    dropped = 0
+    for line in lines:
+        key = line.strip()
+        if key and key in seen:
+            dropped += 1
+            continue
+        seen.add(key)
+        kept.append(line)
+    return kept, dropped
+
+
+def _head_tail_lines(lines: List[str], budget_chars: int) -> Tuple[List[str], int]:
+    """Keep as many whole lines from the start and end as fit in the budget."""
+    head_chars = int(budget_chars * HEAD_FRACTION)
+    head, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > head_chars:
+            break
+        head.append(line)
+        used += len(line) + 1
+
+    tail, used = [], 0
+    for line in reversed(lines[len(head):]):
+        if used + len(line) + 1 > budget_chars - head_chars:
+            break
+        tail.append(line)
+        used += len(line) + 1
+    tail.reverse()
+
+    omitted = len(lines) - len(head) - len(tail)
+    if omitted <= 0:
+        return lines, 0
+    return [*head, f"... [{omitted} lines omitted] ...", *tail], omitted
+
+
+def _head_tail_chars(text: str, budget_chars: int) -> str:
+    head_chars = int(budget_chars * HEAD_FRACTION)
+    tail_chars = budget_chars - head_chars
+    omitted = len(text) - head_chars - tail_chars
+    return f"{text[:head_chars]} ... [{omitted} characters omitted] ... {text[-tail_chars:] if tail_chars else ''}"
+
+
+def _trim_json_lists(value: Any, max_items: int) -> Any:
+    """Keep the first and last items of every list longer than ``max_items``."""
+    if isinstance(value, dict):
+        return {key: _trim_json_lists(item, max_items) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [_trim_json_lists(item, max_items) for item in value]
+        if len(items) > max_items:
+            head = max_items - max_items // 2
+            tail = max_items // 2
+            return [*items[:head], f"... [{len(items) - max_items} items omitted] ...", *(items[-tail:] if tail else [])]
+        return items
+    return value
+
+
+def reduce_json(value: Any, budget_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """Render a JSON value compactly, trimming long lists until it fits the budget."""
+    text = json.dumps(value, separators=(",", ":"), default=str)
+    report = {"compacted_json": True, "trimmed_lists": False}
+    for max_items in _JSON_LIST_LIMITS:
+        if estimate_tokens(text) <= budget_tokens:
+            break
+        text = json.dumps(_trim_json_lists(value, max_items), separators=(",", ":"), default=str)
+        report["trimmed_lists"] = True
+    if estimate_tokens(text) > budget_tokens:
+        text = _head_tail_chars(text, budget_tokens * 4)
+    return text, report
+
+
+def reduce_text(text: str, budget_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """Shrink a tool output to roughly ``budget_tokens``.
+
+    JSON is re-serialized without whitespace (and long lists trimmed); other
+    text has repeated lines dropped, then whole lines kept from the head and
+    tail. Returns the reduced text and a report of what was removed.
+    """
+    original_tokens = estimate_tokens(text)
+    report: Dict[str, Any] = {"original_tokens": original_tokens, "reduced_tokens": original_tokens}
+    if original_tokens <= budget_tokens:
+        return text, report
+
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+    if isinstance(value, (dict, list)):
+        reduced, json_report = reduce_json(value, budget_tokens)
+        report.update(json_report)
+    else:
+        lines, report["repeated_lines_dropped"] = _drop_repeated_lines(text.splitlines())
+        reduced = "\n".join(lines)
+        if estimate_tokens(reduced) > budget_tokens:
+            lines, report["lines_omitted"] = _head_tail_lines(lines, budget_tokens * 4)
+            reduced = "\n".join(lines)
+        if estimate_tokens(reduced) > budget_tokens:
+            # A few very long lines; cut inside them
+            reduced = _head_tail_chars(reduced, budget_tokens * 4)
+
+    if estimate_tokens(reduced) >= original_tokens:
+        # Tiny budgets can make the omission markers longer than what they replace
+        return text, {"original_tokens": original_tokens, "reduced_tokens": original_tokens}
+    report["reduced_tokens"] = estimate_tokens(reduced)
+    return reduced, report
+
+
+class ToolReductionStats:
+    """Process-wide totals of what the reduction stage removed, per tool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tool_name: str, original_tokens: int, reduced_tokens: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                tool_name, {"results": 0, "reduced": 0, "original_tokens": 0, "removed_tokens": 0}
+            )
+            stats["results"] += 1
+            stats["original_tokens"] += original_tokens
+            if reduced_tokens < original_tokens:
+                stats["reduced"] += 1
+                stats["removed_tokens"] += original_tokens - reduced_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "removed_tokens": sum(stats["removed_tokens"] for stats in self._stats.values()),
+                "tools": {tool_name: dict(stats) for tool_name, stats in self._stats.items()},
+            }
+
+
+class ReducedTool(DelegatingTool):
+    """Fit each result of the wrapped tool into a token budget before the agent sees it."""
+
+    def __init__(self, tool: AgentTool, server: str, budget_tokens: int, stats: ToolReductionStats):
+        super().__init__(tool, server)
+        self.budget_tokens = budget_tokens
+        self.reduction_stats = stats
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        result = await self.call(tool_use, invocation_state, **kwargs)
+        if result is None:
+            yield ToolResultEvent(result)
+            return
+
+        content = []
+        original_tokens = reduced_tokens = 0
+        for block in result.get("content", []):
+            if "text" in block:
+                text, report = reduce_text(block["text"], self.budget_tokens)
+            elif "json" in block:
+                text, report = reduce_text(json.dumps(block["json"], default=str), self.budget_tokens)
+            else:
+                content.append(block)
+                continue
+            original_tokens += report["original_tokens"]
+            reduced_tokens += report["reduced_tokens"]
+            if report["reduced_tokens"] == report["original_tokens"]:
+                content.append(block)
+                continue
+            details = ", ".join(
+                f"{key.replace('_', ' ')}: {value}" for key, value in report.items()
+                if key not in ("original_tokens", "reduced_tokens") and value
+            )
+            content.append({"text": (
+                f"{text}\n[sherlock: output reduced from ~{report['original_tokens']} to "
+                f"~{report['reduced_tokens']} tokens; {details}]"
+            )})
+
+        self.reduction_stats.record(self.tool_name, original_tokens, reduced_tokens)
+        if reduced_tokens < original_tokens:
+            logger.info(f"Reduced {self.tool_name} result from ~{original_tokens} to ~{reduced_tokens} tokens")
+            removed_tokens_counter.add(original_tokens - reduced_tokens, {"tool": self.tool_name})
+            result = {**result, "content": content}
+        yield ToolResultEvent(result)
+
+
+def tool_result_budget(tool_name: str, agent: str) -> int:
+    """Token budget for one tool result: tool override, then agent override, then the default.
+
+    ``SHERLOCK_TOOL_RESULT_BUDGETS`` takes a JSON object keyed by tool name or
+    agent name (e.g. ``{"get_pod_logs": 2000, "observability_agent": 3000}``).
+    """
+    budgets = _budget_overrides()
+    if tool_name in budgets:
+        return budgets[tool_name]
+    if agent in budgets:
+        return budgets[agent]
+    return int(os.getenv("SHERLOCK_TOOL_RESULT_BUDGET", "4000"))
+
+
+def reduce_tools(tools: List[AgentTool], server: str, agent: str) -> List[AgentTool]:
+    """Wrap one agent's MCP tools so every result fits its token budget."""
+    stats = get_tool_reduction_stats()
+    if stats is None:
+        return tools
+    return [ReducedTool(tool, server, tool_result_budget(tool.tool_name, agent), stats) for tool in tools]
+
+
+def _budget_overrides() -> Dict[str, int]:
+    overrides = os.getenv("SHERLOCK_TOOL_RESULT_BUDGETS")
+    return {name: int(budget) for name, budget in json.loads(overrides).items()} if overrides else {}
+
+
+_reduction_stats: Optional[ToolReductionStats] = None
+
+
+def get_tool_reduction_stats() -> Optional[ToolReductionStats]:
+    """Get the process-wide reduction stats, or None when tool result reduction is disabled."""
+    global _reduction_stats
+
+    if os.getenv("SHERLOCK_TOOL_REDUCTION_ENABLED", "true").lower() != "true":
+        return None
+    if _reduction_stats is None:
+        _reduction_stats = ToolReductionStats()
+    return _reduction_stats
@@ -0,0 +1,195 @@
+"""Cache of MCP tool schemas, fingerprinted by server image."""
+import functools
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp.types import Tool as MCPTool
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+from strands.tools.mcp.mcp_client import MCPClient
+
+from sherlock.mcp_pool import server_image
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def image_fingerprint(image: str) -> str:
+    """Fingerprint a server image by its local docker image ID.
+
+    Falls back to the image reference itself when docker is unavailable, in
+    which case the cache ``max_age`` is what catches upgrades.
+    """
+    try:
+        completed = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{.Id}}", image],
+            capture_output=True, text=True, timeout=10
+        )
+        if completed.returncode == 0 and completed.stdout.strip():
+            return completed.stdout.strip()
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug(f"Could not inspect image {image}: {e}")
+    return image
+
+
+def list_all_tools(client: MCPClient) -> List[MCPAgentTool]:
+    """List every tool of an MCP server, following pagination."""
+    tools: List[MCPAgentTool] = []
+    pagination_token = None
+    while True:
+        page = client.list_tools_sync(pagination_token=pagination_token)
+        tools.extend(page)
+        pagination_token = page.pagination_token
+        if not pagination_token:
+            return tools
+
+
+def schema_size(schemas: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Summarize how much context a tool catalog costs the agents."""
+    payload = json.dumps(schemas, separators=(",", ":"))
+    return {
+        "tools": len(schemas),
+        "bytes": len(payload),
+        "approx_tokens": len(payload) // 4,
+    }
+
+
+def schema_drift(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Compare two tool catalogs by tool name and definition."""
+    old_by_name = {schema["name"]: schema for schema in old}
+    new_by_name = {schema["name"]: schema for schema in new}
+    return {
+        "added": sorted(set(new_by_name) - set(old_by_name)),
+        "removed": sorted(set(old_by_name) - set(new_by_name)),
+        "changed": sorted(
+            name for name in set(old_by_name) & set(new_by_name)
+            if old_by_name[name] != new_by_name[name]
+        ),
+    }
+
+
+class ToolSchemaCache:
+    """Memory and on-disk cache of MCP tool definitions.
+
+    Tool catalogs only change when a server image changes, so discovery is done
+    once per image fingerprint and shared across investigations and processes.
+    Cached schemas are re-bound to whichever client session is in use. Servers
+    that do not run from a docker image are not cached.
+    """
+
+    def __init__(self, directory: str, max_age: float = 86400.0):
+        self.directory = Path(directory).expanduser()
+        self.max_age = max_age
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "uncached": 0}
+
+    def get_tools(self, server: str, client: MCPClient) -> List[MCPAgentTool]:
+        """Return the server's tools bound to ``client``, listing them only on a cache miss."""
+        entry = self.load(server)
+        if entry is None:
+            listed = list_all_tools(client)
+            entry = self.store(server, [tool.mcp_tool.model_dump(mode="json", exclude_none=True) for tool in listed])
+            return listed
+
+        return [MCPAgentTool(MCPTool.model_validate(schema), client) for schema in entry["tools"]]
+
+    def load(self, server: str) -> Optional[Dict[str, Any]]:
+        """Load the cached catalog entry for a server, or None on a miss."""
+        key = self._key(server)
+        if key is None:
+            with self._lock:
+                self._stats["uncached"] += 1
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._is_fresh(entry):
+                self._stats["memory_hits"] += 1
+                return entry
+
+        entry = self._read(key)
+        with self._lock:
+            if entry is not None and self._is_fresh(entry):
+                self._memory[key] = entry
+                self._stats["disk_hits"] += 1
+                return entry
+            self._stats["misses"] += 1
+        return None
+
+    def store(self, server: str, schemas: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Cache a freshly listed catalog in memory and on disk."""
+        key = self._key(server)
+        image = server_image(server)
+        entry = {
+            "server": server,
+            "image": image,
+            "fingerprint": image_fingerprint(image) if image else None,
+            "created_at": time.time(),
+            "tools": schemas,
+        }
+        if key is None:
+            return entry
+        with self._lock:
+            self._memory[key] = entry
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path(key).with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entry, indent=2))
+            tmp_path.replace(self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not persist tool schemas for {server}: {e}")
+
+        logger.info(f"Cached {len(schemas)} tool schemas for {server} ({schema_size(schemas)['approx_tokens']} tokens)")
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        """Return memory/disk hit and miss counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _key(self, server: str) -> Optional[str]:
+        image = server_image(server)
+        if image is None:
+            return None
+        fingerprint = image_fingerprint(image)
+        digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+        return f"{server}-{digest}"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(key).read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool schema cache {self._path(key)}: {e}")
+            return None
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("created_at", 0) <= self.max_age
+
+
+_schema_cache: Optional[ToolSchemaCache] = None
+_schema_cache_lock = threading.Lock()
+
+
+def get_tool_schema_cache() -> ToolSchemaCache:
+    """Get the process-wide tool schema cache."""
+    global _schema_cache
+
+    with _schema_cache_lock:
+        if _schema_cache is None:
+            _schema_cache = ToolSchemaCache(
+                directory=os.getenv("SHERLOCK_TOOL_SCHEMA_CACHE_DIR", "~/.cache/sherlock/tool-schemas"),
+                max_age=float(os.getenv("SHERLOCK_TOOL_SCHEMA_MAX_AGE", "86400")),
+            )
+    return _schema_cache
@@ -0,0 +1,41 @@
+"""Base class for layers that sit between the agents and their MCP tools."""
+from typing import Any
+
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolResult, ToolSpec, ToolUse
+
+
+class DelegatingTool(AgentTool):
+    """An AgentTool that exposes another tool's name and spec and forwards calls to it.
+
+    Subclasses override ``stream`` to add behaviour around the wrapped tool,
+    typically by awaiting ``call`` and yielding a transformed result.
+    """
+
+    def __init__(self, tool: AgentTool, server: str):
+        super().__init__()
+        self.tool = tool
+        self.server = server
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def call(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolResult:
+        """Run the wrapped tool to completion and return its final result."""
+        result = None
+        async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+            if isinstance(event, ToolResultEvent):
+                result = event.tool_result
+        return result
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        yield ToolResultEvent(await self.call(tool_use, invocation_state, **kwargs))
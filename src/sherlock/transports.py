@@ -0,0 +1,106 @@
+"""Transports for reaching MCP servers: docker containers, long-running HTTP servers or local processes."""
+import logging
+import os
+import shlex
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from mcp import StdioServerParameters, stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from strands.tools.mcp.mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+# "docker" starts a container per session, "http" connects to an already running server over
+# streamable HTTP, and "process" starts the server as a local process without docker
+MCP_TRANSPORTS = ("docker", "http", "process")
+
+
+@dataclass(frozen=True)
+class MCPServerSpec:
+    """How to run one MCP server: its docker image, Python package and extra arguments."""
+    name: str
+    image: str
+    package: str
+    args: Tuple[str, ...] = ()
+
+    @property
+    def env_prefix(self) -> str:
+        """Prefix of this server's settings, e.g. SHERLOCK_EKS for eks-mcp."""
+        return "SHERLOCK_" + self.name.upper().replace("-MCP", "").replace("-", "_")
+
+
+def get_transport(spec: MCPServerSpec) -> str:
+    """Transport configured for a server: SHERLOCK_<SERVER>_MCP_TRANSPORT, else SHERLOCK_MCP_TRANSPORT, else docker."""
+    transport = os.getenv(f"{spec.env_prefix}_MCP_TRANSPORT") or os.getenv("SHERLOCK_MCP_TRANSPORT", "docker")
+    transport = transport.lower()
+    if transport not in MCP_TRANSPORTS:
+        raise ValueError(f"Invalid MCP transport for {spec.name}: {transport}. Must be one of {MCP_TRANSPORTS}")
+    return transport
+
+
+def get_server_url(spec: MCPServerSpec) -> str:
+    url = os.getenv(f"{spec.env_prefix}_MCP_URL")
+    if not url:
+        raise ValueError(f"{spec.env_prefix}_MCP_URL must be set to use the http transport for {spec.name}")
+    return url
+
+
+def get_server_command(spec: MCPServerSpec) -> list:
+    """Command that starts a server locally: SHERLOCK_<SERVER>_MCP_COMMAND, else the package run through uvx."""
+    command = os.getenv(f"{spec.env_prefix}_MCP_COMMAND")
+    return shlex.split(command) if command else ["uvx", f"{spec.package}@latest"]
+
+
+def docker_transport(spec: MCPServerSpec) -> Callable:
+    """Start the server's image with ``docker run`` for every session and talk to it over stdio."""
+    aws_region = os.getenv("AWS_REGION", "us-east-1")
+    return lambda: stdio_client(
+        StdioServerParameters(
+            command="docker",
+            args=[
+                "run",
+                "--rm",
+                "--interactive",
+                "--env", f"AWS_REGION={aws_region}",
+                "--env", f"AWS_ACCESS_KEY_ID={os.getenv('AWS_ACCESS_KEY_ID', '')}",
+                "--env", f"AWS_SECRET_ACCESS_KEY={os.getenv('AWS_SECRET_ACCESS_KEY', '')}",
+                "--env", f"AWS_SESSION_TOKEN={os.getenv('AWS_SESSION_TOKEN', '')}",
+                "--env", "FASTMCP_LOG_LEVEL=ERROR",
+                "--volume", f"{os.path.expanduser('~')}/.aws:/root/.aws:ro",
+                spec.image,
+                *spec.args
+            ],
+            env={},
+            timeout=30
+        )
+    )
+
+
+def http_transport(spec: MCPServerSpec) -> Callable:
+    """Connect to a long-running server over streamable HTTP; no process is started per session."""
+    url = get_server_url(spec)
+    return lambda: streamablehttp_client(url, timeout=30)
+
+
+def process_transport(spec: MCPServerSpec) -> Callable:
+    """Start the server as a local process with this process's AWS settings and talk to it over stdio."""
+    command = get_server_command(spec)
+    env = {**os.environ, "AWS_REGION": os.getenv("AWS_REGION", "us-east-1"), "FASTMCP_LOG_LEVEL": "ERROR"}
+    return lambda: stdio_client(
+        StdioServerParameters(command=command[0], args=[*command[1:], *spec.args], env=env)
+    )
+
+
+TRANSPORT_FACTORIES = {
+    "docker": docker_transport,
+    "http": http_transport,
+    "process": process_transport,
+}
+
+
+def create_mcp_client(spec: MCPServerSpec, transport: Optional[str] = None) -> MCPClient:
+    """MCP client for a server over the given transport, or the one configured for it."""
+    transport = transport or get_transport(spec)
+    logger.debug(f"Connecting to {spec.name} MCP server over {transport}")
+    return MCPClient(TRANSPORT_FACTORIES[transport](spec))
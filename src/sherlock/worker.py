@@ -0,0 +1,225 @@
+"""Worker process that runs queued investigations with its own warm MCP sessions."""
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional, Set
+
+from sherlock.config import Config
+from sherlock.job_queue import Job, JobQueue, open_job_queue
+from sherlock.mcp_pool import close_all_pools, prewarm
+from sherlock.orchestrator import investigate
+from sherlock.progress import ProgressEvent, ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+
+# Seconds between deletions of expired jobs by each worker
+PRUNE_INTERVAL = 600
+
+
+async def publish_events(queue: JobQueue, job_id: str, events: "asyncio.Queue[Optional[ProgressEvent]]") -> None:
+    """Write a job's progress events to the queue in batches, off the event loop, until None arrives."""
+    while True:
+        batch = [await events.get()]
+        while not events.empty():
+            batch.append(events.get_nowait())
+        done = batch[-1] is None
+        batch = [event for event in batch if event is not None]
+        if batch:
+            await asyncio.to_thread(queue.publish_many, job_id, batch)
+        if done:
+            return
+
+
+async def run_job(queue: JobQueue, job: Job, worker: str, lease_seconds: float) -> None:
+    """Run one claimed investigation, publishing its progress and renewing its lease until it finishes."""
+    request = job.request
+    # Agents report progress from the event loop; the queue writes happen in a background task
+    events: asyncio.Queue = asyncio.Queue()
+    progress = ProgressReporter.to_queue(events)
+    publisher = asyncio.ensure_future(publish_events(queue, job.id, events))
+    owned = True
+
+    async def keep_lease() -> None:
+        nonlocal owned
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if not await asyncio.to_thread(queue.renew, job.id, worker, lease_seconds):
+                # Cancelled by its producer, or reclaimed by another worker after the lease expired
+                logger.warning(f"Lost the lease on job {job.id}; stopping its investigation")
+                owned = False
+                investigation.cancel()
+                return
+
+    async def finish_publishing() -> None:
+        # Events are put on the queue with call_soon_threadsafe; let pending ones land before the sentinel
+        await asyncio.sleep(0)
+        if not publisher.done():
+            events.put_nowait(None)
+        try:
+            await publisher
+        except Exception as e:
+            logger.warning(f"Could not store progress events of job {job.id}: {e}")
+
+    investigation = asyncio.ensure_future(investigate(
+        request["query"],
+        request.get("diagnostic_agent", "eks-mcp"),
+        request.get("model_id", DEFAULT_MODEL_ID),
+        use_cache=request.get("use_cache", True),
+        mode=request.get("mode", "swarm"),
+        progress=progress,
+    ))
+    lease = asyncio.ensure_future(keep_lease())
+    logger.info(f"Worker {worker} running job {job.id} (attempt {job.attempts}): {request.get('query')}")
+    try:
+        result = await investigation
+        if owned:
+            # Every progress event is stored before the result, so a waiting producer sees them all
+            await finish_publishing()
+            await asyncio.to_thread(queue.complete, job.id, worker, result)
+    except asyncio.CancelledError:
+        if owned:
+            raise
+        # The job is no longer this worker's: its owner (or its producer) decides how it ends
+        logger.info(f"Stopped job {job.id} after losing its lease")
+    except Exception as e:
+        logger.exception(f"Job {job.id} failed")
+        if owned:
+            await finish_publishing()
+            await asyncio.to_thread(queue.fail, job.id, worker, f"{type(e).__name__}: {e}")
+    finally:
+        investigation.cancel()
+        lease.cancel()
+        publisher.cancel()
+
+
+async def run_worker(
+    queue: JobQueue,
+    worker: Optional[str] = None,
+    concurrency: int = 2,
+    poll_interval: float = 1.0,
+    lease_seconds: float = 60.0,
+    stop: Optional[asyncio.Event] = None,
+    exit_when_idle: bool = False,
+    retention_seconds: Optional[float] = None,
+) -> int:
+    """Claim and run jobs, up to ``concurrency`` at once, until ``stop`` is set; returns the number of jobs run.
+
+    Running jobs are finished before returning, so a worker being scaled
+    down does not abandon an investigation halfway. With ``retention_seconds``,
+    finished jobs older than that are deleted every few minutes.
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    stop = stop or asyncio.Event()
+    slots = asyncio.Semaphore(concurrency)
+    running: Set[asyncio.Future] = set()
+    jobs_run = 0
+
+    logger.info(f"Worker {worker} polling {queue.stats().get('path', 'queue')} with {concurrency} slots")
+    last_prune = 0.0
+    while not stop.is_set():
+        if retention_seconds and time.monotonic() - last_prune >= PRUNE_INTERVAL:
+            last_prune = time.monotonic()
+            pruned = await asyncio.to_thread(queue.prune, retention_seconds)
+            if pruned:
+                logger.info(f"Deleted {pruned} finished jobs older than {retention_seconds:.0f}s")
+        await slots.acquire()
+        job = await asyncio.to_thread(queue.claim, worker, lease_seconds)
+        if job is None:
+            slots.release()
+            if exit_when_idle and not running:
+                break
+            # Wake up early when asked to stop
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        jobs_run += 1
+        task = asyncio.ensure_future(run_job(queue, job, worker, lease_seconds))
+        running.add(task)
+        task.add_done_callback(running.discard)
+        task.add_done_callback(lambda _: slots.release())
+
+    if running:
+        logger.info(f"Worker {worker} finishing {len(running)} running job(s) before exiting")
+        await asyncio.gather(*running)
+    return jobs_run
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Warm the MCP pools and run the worker until SIGINT or SIGTERM."""
+    queue = open_job_queue(args.queue)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    # Agents stream their text to stdout; a worker has nobody to show it to
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            if args.prewarm:
+                await asyncio.to_thread(prewarm)
+            await run_worker(queue, concurrency=args.concurrency, poll_interval=args.poll_interval, lease_seconds=args.lease_seconds, stop=stop, retention_seconds=args.retention_seconds)
+        finally:
+            await asyncio.to_thread(close_all_pools)
+            queue.close()
+
+
+def main():
+    """Entry point of ``sherlock-worker``."""
+    parser = argparse.ArgumentParser(
+        prog="sherlock-worker",
+        description="Run investigations queued by the sherlock MCP tool, sherlock-cli or alert webhooks",
+    )
+    parser.add_argument("--queue", default=os.getenv("SHERLOCK_JOB_QUEUE"), help="Job queue URL, e.g. sqlite:///var/lib/sherlock/jobs.db (default: SHERLOCK_JOB_QUEUE)")
+    parser.add_argument("--concurrency", "-c", type=int, default=int(os.getenv("SHERLOCK_MAX_CONCURRENT_INVESTIGATIONS", "2")), help="Investigations run at once by each worker process (default: 2)")
+    parser.add_argument("--processes", "-p", type=int, default=1, help="Worker processes to start, each with its own MCP sessions (default: 1)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls of an empty queue (default: 1)")
+    parser.add_argument("--lease-seconds", type=float, default=60.0, help="Seconds before a job of an unresponsive worker is handed to another one (default: 60)")
+    parser.add_argument("--retention-seconds", type=float, default=float(os.getenv("SHERLOCK_JOB_RETENTION", "604800")), help="Seconds finished jobs and their progress events are kept before being deleted; 0 keeps them forever (default: 604800, one week)")
+    parser.add_argument("--no-prewarm", dest="prewarm", action="store_false", help="Do not start MCP sessions before the first job")
+    parser.add_argument("--log-level", default="INFO", help="Log level (default: INFO)")
+    args = parser.parse_args()
+    if not args.queue:
+        parser.error("--queue or SHERLOCK_JOB_QUEUE is required")
+
+    if args.processes > 1:
+        # Each child is a full worker; they share nothing but the queue
+        child_args = [
+            "--queue", args.queue,
+            "--concurrency", str(args.concurrency),
+            "--poll-interval", str(args.poll_interval),
+            "--lease-seconds", str(args.lease_seconds),
+            "--retention-seconds", str(args.retention_seconds),
+            "--log-level", args.log_level,
+            *([] if args.prewarm else ["--no-prewarm"]),
+        ]
+        children = [subprocess.Popen([sys.executable, "-m", "sherlock.worker", *child_args]) for _ in range(args.processes)]
+        signal.signal(signal.SIGTERM, lambda *_: [child.terminate() for child in children])
+        try:
+            sys.exit(max(child.wait() for child in children))
+        except KeyboardInterrupt:
+            sys.exit(max(child.wait() for child in children))
+
+    # One warm MCP session per concurrent investigation and server, unless configured otherwise
+    os.environ.setdefault("SHERLOCK_MCP_POOL_MAX_SIZE", str(args.concurrency))
+    Config.setup_logging(log_level=args.log_level)
+    enable_langfuse = bool(os.getenv("LANGFUSE_PUBLIC_KEY") and os.getenv("LANGFUSE_SECRET_KEY"))
+    Config.setup_telemetry(enable_langfuse=enable_langfuse)
+    Config.setup_environment()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()